@@ -0,0 +1,45 @@
+"""
+Overhead of Quantity against the plain NumPy equivalent: array conversion and
+arithmetic, large-array ufuncs, mixed-unit rows, string parsing and registry lookups. Scalar
+operations are in bench_scalar, registry construction in bench_startup.
+"""
+import numpy as np
+
+from dimpy import MixedQuantity, RunningStats, UnitRegistry
+
+from .harness import Case, run_cases
+
+ARRAY_SIZE = 1_000_000
+
+
+def cases():
+    reg = UnitRegistry()
+    arr = np.random.default_rng(0).random(ARRAY_SIZE)
+    q = reg.Quantity(arr, 'km')
+    q_m = reg.Quantity(arr, 'm')
+    yield Case(f'array to(), {ARRAY_SIZE} elements', lambda: q.to('m'), baseline=lambda: arr * 1000.0)
+    yield Case(f'array add, km + m, {ARRAY_SIZE}', lambda: q + q_m, baseline=lambda: arr + arr * 1e-3)
+    yield Case(f'np.sqrt(q * q), {ARRAY_SIZE}', lambda: np.sqrt(q * q), baseline=lambda: np.sqrt(arr * arr))
+    yield Case(f'np.add(q, q), {ARRAY_SIZE}', lambda: np.add(q, q), baseline=lambda: np.add(arr, arr))
+    yield Case(f'np.sum(q), {ARRAY_SIZE}', lambda: np.sum(q), baseline=lambda: np.sum(arr))
+    yield Case(f'RunningStats.update, {ARRAY_SIZE}', lambda: RunningStats().update(q_m),
+               baseline=lambda: (arr.mean(), arr.var()))
+
+    # Mixed units per row: one gather instead of a Quantity per row
+    ids = np.random.default_rng(1).integers(0, 3, ARRAY_SIZE)
+    factors = np.array([6894.757293168361, 1000.0, 133.3223684])
+    unit_ids = np.array([reg.unit_id(u) for u in ('psi', 'kPa', 'mmHg')])
+    mixed = MixedQuantity(arr, unit_ids[ids], reg)
+    yield Case(f'mixed-unit to(), {ARRAY_SIZE}', lambda: mixed.to('Pa'), baseline=lambda: arr * factors[ids])
+
+    yield Case('parse "9.81 m/s^2"', lambda: reg.parse('9.81 m/s^2'), baseline=lambda: float('9.81'))
+
+    def parse_uncached():
+        reg._parse_cache.clear()
+        reg.parse_units('kg m^2/(s^3 A)')
+    yield Case('parse_units, uncached', parse_uncached)
+    yield Case('attribute lookup reg.km', lambda: reg.km)
+
+
+if __name__ == '__main__':
+    run_cases(cases())
@@ -0,0 +1,37 @@
+"""Streaming CSV ingestion with read_csv versus plain NumPy loading, in rows per second"""
+import os
+import tempfile
+
+import numpy as np
+
+from dimpy import UnitRegistry, read_csv
+
+from .harness import Case, run_cases
+
+ROWS = 200_000
+
+
+def _write_csv(path):
+    rng = np.random.default_rng(0)
+    data = np.column_stack([rng.random(ROWS) * 10, rng.random(ROWS) * 100, rng.random(ROWS)])
+    np.savetxt(path, data, delimiter=',', fmt='%.6f',
+               header='flow [L/s],T [degC],P [kPa]', comments='')
+
+
+def cases():
+    reg = UnitRegistry()
+    path = os.path.join(tempfile.mkdtemp(), 'bench.csv')
+    _write_csv(path)
+
+    def stream():
+        for chunk in read_csv(path, reg, units={'flow': 'm^3/s', 'T': 'K'}):
+            pass
+
+    yield Case(f'read_csv with conversion, {ROWS} rows', stream,
+               baseline=lambda: np.loadtxt(path, delimiter=',', skiprows=1))
+
+
+if __name__ == '__main__':
+    results = run_cases(cases())
+    for name, seconds in results.items():
+        print(f"{name}: {ROWS / seconds:,.0f} rows/s")
@@ -0,0 +1,47 @@
+"""
+Thread scaling of large-array conversions and arithmetic.
+
+Times q.to(), q + q and a fused lazy expression on a multi-hundred-MB array
+for 1, 2, 4, ... worker threads up to the core count. Set DIMPY_BENCH_SIZE
+(elements) to change the array size.
+"""
+import os
+
+import numpy as np
+
+from dimpy import UnitRegistry
+
+from .harness import Case, format_time, time_per_call
+
+SIZE = int(os.environ.get('DIMPY_BENCH_SIZE', 40_000_000))
+
+
+def _worker_counts():
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def cases(workers):
+    reg = UnitRegistry()
+    reg.set_parallel(workers)
+    q = reg.Quantity(np.random.default_rng(0).random(SIZE), 'degC')
+    d = reg.Quantity(q.value, 'm')
+
+    yield Case('degC -> K', lambda: q.to('K'))
+    yield Case('m + m', lambda: d + d)
+    yield Case('lazy (d * 2 + d) -> km', lambda: (d.defer() * 2 + d).to('km').evaluate())
+
+
+if __name__ == '__main__':
+    print(f"{SIZE:,} float64 elements ({SIZE * 8 / 2 ** 20:.0f} MB), {os.cpu_count()} cores")
+    serial = {}
+    for workers in _worker_counts():
+        for case in cases(workers):
+            t = time_per_call(case.func, min_time=1.0, repeat=3)
+            serial.setdefault(case.name, t)
+            print(f"{case.name:<28} workers={workers:<3} {format_time(t)}   speedup x{serial[case.name] / t:5.2f}")
@@ -0,0 +1,29 @@
+"""String ingestion: per-row UnitRegistry.parse versus batched parse_many"""
+import random
+
+import numpy as np
+
+from dimpy import UnitRegistry
+
+from .harness import Case, run_cases
+
+ROWS = 100_000
+UNITS = ['km/hr', 'm/s', 'mile/hr', 'ft/s']
+
+
+def cases():
+    reg = UnitRegistry()
+    rng = random.Random(0)
+    rows = [f"{rng.random() * 100:.3f} {rng.choice(UNITS)}" for _ in range(ROWS)]
+    numbers = [row.split()[0] for row in rows]
+
+    yield Case(f'parse + to, {ROWS} rows', lambda: [reg.parse(row).to('m/s') for row in rows],
+               baseline=lambda: [float(x) for x in numbers])
+    yield Case(f'parse_many(target=), {ROWS} rows', lambda: reg.parse_many(rows, target='m/s'),
+               baseline=lambda: np.array(numbers).astype(np.float64))
+    yield Case('parse single string', lambda: reg.parse('12.5 km/hr'),
+               baseline=lambda: float('12.5'))
+
+
+if __name__ == '__main__':
+    run_cases(cases())
@@ -0,0 +1,35 @@
+"""Throughput of UnitRegistry.resolve_unit on the hit, miss and dynamic-definition paths"""
+import itertools
+
+from dimpy import UnitRegistry
+
+from .harness import Case, run_cases
+
+
+def cases():
+    reg = UnitRegistry()
+    reg.resolve_unit('kilometer')
+
+    yield Case('resolve_unit hit (defined)', lambda: reg.resolve_unit('meter'))
+    yield Case('resolve_unit hit (prefixed, cached)', lambda: reg.resolve_unit('kilometer'))
+    yield Case('resolve_unit miss (negative cache)', lambda: reg.resolve_unit('furlong'))
+
+    def miss_uncached():
+        reg._unresolved.clear()
+        reg.resolve_unit('megafurlong')
+    yield Case('resolve_unit miss (full scan)', miss_uncached)
+
+    # Every call defines a brand new prefixed unit
+    fresh = UnitRegistry()
+    names = itertools.cycle([p + u for p in fresh._prefixes for u in ('meter', 'gram', 'second', 'watt', 'pascal')])
+
+    def dynamic_definition():
+        name = next(names)
+        fresh._units.pop(name, None)
+        fresh._prefixed.discard(name)
+        fresh.resolve_unit(name)
+    yield Case('resolve_unit dynamic definition', dynamic_definition)
+
+
+if __name__ == '__main__':
+    run_cases(cases())
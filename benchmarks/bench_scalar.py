@@ -0,0 +1,62 @@
+"""
+Scalar Quantity fast path: + - * / ** and to() on float Quantities against
+the same float operation.
+
+TARGETS are the per-op overhead limits listed in the README: the median
+time per call divided by the time of the bare float expression, both called
+through a lambda. They are regression checks with headroom for noise (runs
+differ by 10-40%), not typical values; running this module prints the
+measured ratios, their spread between rounds and whether each limit holds.
+"""
+from dimpy import UnitRegistry
+
+from .harness import Case, format_time, measure
+
+# case name -> maximum median overhead ratio
+TARGETS = {
+    'a + b': 12,
+    'a - b': 12,
+    'a * b': 16,
+    'a / b': 16,
+    'a ** 2': 16,
+    'a * 2.0': 12,
+    'a + b, km + m': 20,
+    "a.to('m')": 20,
+    "a.to(m), Unit target": 20,
+    "degC.to('degF')": 20,
+}
+
+
+def cases():
+    reg = UnitRegistry()
+    a = reg.Quantity(3.0, 'km')
+    b = reg.Quantity(4.0, 'km')
+    b_m = reg.Quantity(4.0, 'm')
+    t = reg.Quantity(2.0, 'hr')
+    temp = reg.Quantity(20.0, 'degC')
+    m = reg.parse_units('m')
+    x, y = 3.0, 4.0
+
+    yield Case('a + b', lambda: a + b, baseline=lambda: x + y)
+    yield Case('a - b', lambda: a - b, baseline=lambda: x - y)
+    yield Case('a * b', lambda: a * t, baseline=lambda: x * y)
+    yield Case('a / b', lambda: a / t, baseline=lambda: x / y)
+    yield Case('a ** 2', lambda: a ** 2, baseline=lambda: x ** 2)
+    yield Case('a * 2.0', lambda: a * 2.0, baseline=lambda: x * 2.0)
+    yield Case('a + b, km + m', lambda: a + b_m, baseline=lambda: x + y * 1e-3)
+    yield Case("a.to('m')", lambda: a.to('m'), baseline=lambda: x * 1000.0)
+    yield Case("a.to(m), Unit target", lambda: a.to(m), baseline=lambda: x * 1000.0)
+    yield Case("degC.to('degF')", lambda: temp.to('degF'), baseline=lambda: x * 1.8 + 32.0)
+
+
+if __name__ == '__main__':
+    failed = 0
+    for case in cases():
+        r = measure(case, min_time=0.3, repeat=5, rounds=5)
+        ratio = r.ratio
+        target = TARGETS[case.name]
+        ok = ratio <= target
+        failed += not ok
+        print(f"{case.name:<24} {format_time(r.time)}   float {format_time(r.baseline_time)}   "
+              f"x{ratio:5.1f} ±{r.noise / 2:.0%} (limit x{target}) {'ok' if ok else 'MISSED'}")
+    print(f"\n{len(TARGETS) - failed}/{len(TARGETS)} limits met")
@@ -0,0 +1,69 @@
+"""
+Start-up cost: `import dimpy` in a fresh interpreter, UnitRegistry() creation
+and first access to a constant. NumPy must not be imported by any of them.
+
+The tracked import case re-imports dimpy in this process (its modules are
+taken out of sys.modules and put back afterwards) against re-importing the
+json package, so run.py can compare an overhead ratio for it.
+"""
+import importlib
+import subprocess
+import sys
+
+from dimpy import UnitRegistry
+
+from .harness import Case, format_time, run_cases
+
+_IMPORT_SCRIPT = """
+import sys, time
+t = time.perf_counter()
+import dimpy
+t_import = time.perf_counter() - t
+t = time.perf_counter()
+from dimpy import constants
+constants.c
+t_const = time.perf_counter() - t
+print(t_import, t_const, 'numpy' in sys.modules)
+"""
+
+
+def fresh_interpreter(runs=10):
+    """Best (import time, first constant time) over fresh interpreters, and whether NumPy got loaded"""
+    best = None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', _IMPORT_SCRIPT], capture_output=True,
+                             text=True, check=True).stdout.split()
+        times = (float(out[0]), float(out[1]))
+        best = times if best is None else tuple(map(min, best, times))
+        numpy_loaded = out[2] == 'True'
+    return best, numpy_loaded
+
+
+def reimport(package):
+    """Import package and its submodules anew, then restore the loaded ones"""
+    def owned(name):
+        return name == package or name.startswith(package + '.')
+
+    saved = {name: module for name, module in sys.modules.items() if owned(name)}
+    for name in saved:
+        del sys.modules[name]
+    try:
+        importlib.import_module(package)
+    finally:
+        for name in [name for name in sys.modules if owned(name)]:
+            del sys.modules[name]
+        sys.modules.update(saved)
+
+
+def cases():
+    yield Case('import dimpy', lambda: reimport('dimpy'), baseline=lambda: reimport('json'))
+    yield Case('UnitRegistry()', UnitRegistry)
+    yield Case('UnitRegistry() + first lookup', lambda: UnitRegistry().kilometer)
+
+
+if __name__ == '__main__':
+    (t_import, t_const), numpy_loaded = fresh_interpreter()
+    print(f"{'import dimpy (fresh interpreter)':<40} {format_time(t_import)}")
+    print(f"{'first constant access':<40} {format_time(t_const)}")
+    print(f"{'numpy imported':<40} {numpy_loaded}")
+    run_cases(cases())
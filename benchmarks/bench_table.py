@@ -0,0 +1,50 @@
+"""
+QuantityTable against the same work on five plain NumPy arrays: row filters,
+derived columns and whole-table unit conversion, with peak memory.
+"""
+import numpy as np
+
+from dimpy import QuantityTable, UnitRegistry
+
+from .harness import Case, run_cases
+
+ROWS = 1_000_000
+
+
+def cases():
+    reg = UnitRegistry()
+    rng = np.random.default_rng(0)
+    arrays = {
+        'h': rng.random(ROWS) * 100,
+        'rho': 990 + rng.random(ROWS) * 20,
+        'T': rng.random(ROWS) * 90,
+        'p': 90 + rng.random(ROWS) * 20,
+        'flow': rng.random(ROWS) * 5,
+    }
+    units = {'h': 'm', 'rho': 'kg/m^3', 'T': 'degC', 'p': 'kPa', 'flow': 'L/s'}
+    table = QuantityTable({name: (values, units[name]) for name, values in arrays.items()}, reg)
+    threshold = reg.Quantity(50.0, 'degC')
+
+    def numpy_filter():
+        mask = arrays['T'] > 50.0
+        return [values[mask] for values in arrays.values()]
+
+    def table_filter():
+        selected = table[table['T'] > threshold]
+        return [selected[name] for name in selected.names]
+
+    yield Case(f'filter by mask (selection only), {ROWS} rows', lambda: table[table['T'] > threshold],
+               baseline=lambda: np.flatnonzero(arrays['T'] > 50.0))
+    yield Case(f'filter and read 5 columns, {ROWS} rows', table_filter, baseline=numpy_filter)
+    yield Case(f'slice rows 1000:-1000, {ROWS} rows', lambda: table[1000:-1000]['h'],
+               baseline=lambda: arrays['h'][1000:-1000])
+    yield Case(f'with_column rho * g * h in kPa, {ROWS} rows',
+               lambda: table.with_column('p_h', 'rho * 9.81 * m/s^2 * h', unit='kPa'),
+               baseline=lambda: arrays['rho'] * 9.81 * arrays['h'] / 1000.0)
+    yield Case(f'to_system ft/lb/degF, 5 columns x {ROWS}',
+               lambda: table.to_system({'length': 'ft', 'mass': 'lb', 'temperature': 'degF'}),
+               baseline=lambda: [values * 1.5 + 0.5 for values in arrays.values()])
+
+
+if __name__ == '__main__':
+    run_cases(cases())
@@ -0,0 +1,105 @@
+"""
+Minimal timing helpers shared by the benchmark modules.
+
+Each benchmark module exposes cases() yielding Case objects. A case may carry
+a baseline callable doing the equivalent work with plain floats/NumPy.
+Run a module directly, e.g. `python -m benchmarks.bench_registry`, or the
+whole suite with baselines via `python -m benchmarks.run`.
+"""
+import statistics
+import time
+import tracemalloc
+from collections import namedtuple
+
+Case = namedtuple('Case', ['name', 'func', 'baseline'])
+Case.__new__.__defaults__ = (None,)
+
+# Seconds per call and peak bytes of one call, for a case and its baseline.
+# ratio is time / baseline_time and noise the relative spread (max - min) /
+# median of the per-round ratios (of the times without a baseline).
+Result = namedtuple('Result', ['time', 'peak', 'baseline_time', 'baseline_peak', 'ratio', 'noise'])
+
+
+def time_per_call(func, min_time=0.2, repeat=5):
+    """Best wall time per call in seconds, auto-ranging the loop count"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1 << 24:
+            break
+        number *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def peak_memory(func):
+    """Peak bytes allocated (tracemalloc) while running func once"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(case, min_time=0.2, repeat=5, rounds=5):
+    """
+    Time and peak memory of a case and of its baseline, if any. Each of the
+    rounds times the case and then the baseline (best of repeat each), so
+    both see the same machine state; the medians over rounds are returned.
+    """
+    times, base_times, ratios = [], [], []
+    for _ in range(rounds):
+        times.append(time_per_call(case.func, min_time, repeat))
+        if case.baseline is not None:
+            base_times.append(time_per_call(case.baseline, min_time, repeat))
+            ratios.append(times[-1] / base_times[-1])
+    t = statistics.median(times)
+    peak = peak_memory(case.func)
+    if case.baseline is None:
+        return Result(t, peak, None, None, None, _spread(times))
+    ratio = statistics.median(ratios)
+    return Result(t, peak, statistics.median(base_times), peak_memory(case.baseline), ratio,
+                  _spread(ratios))
+
+
+def _spread(values):
+    middle = statistics.median(values)
+    return (max(values) - min(values)) / middle if middle else 0.0
+
+
+def format_bytes(n):
+    for unit, scale in (('GB', 1 << 30), ('MB', 1 << 20), ('KB', 1 << 10)):
+        if n >= scale:
+            return f"{n / scale:7.1f} {unit}"
+    return f"{n:7d} B "
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.1f} ns"
+
+
+def run_cases(cases):
+    """Time every case and print one line per case"""
+    results = {}
+    for case in cases:
+        t = time_per_call(case.func)
+        line = f"{case.name:<40} {format_time(t)}"
+        if case.baseline is not None:
+            t_base = time_per_call(case.baseline)
+            line += f"   baseline {format_time(t_base)}   x{t / t_base:7.1f}"
+        print(line)
+        results[case.name] = t
+    return results
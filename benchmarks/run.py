@@ -0,0 +1,143 @@
+"""
+Run the benchmark suite, save baselines and flag regressions.
+
+    python -m benchmarks.run                          run and print
+    python -m benchmarks.run --save                   also write benchmarks/baselines.json
+    python -m benchmarks.run --compare                compare against it, exit 1 on regressions
+    python -m benchmarks.run --compare --threshold 0.5 core parse
+
+Each case is timed in several rounds, alternating with its plain float/NumPy
+baseline, and the median overhead ratio (dimpy time / baseline time) is
+what --compare checks: it is far less machine dependent than raw times.
+A case only counts as a regression when it exceeds the threshold and the
+round-to-round noise measured in this run and in the baseline run. Cases
+without a baseline have only raw times, which move by 30-50% between runs
+on a busy machine, so their times are compared only with --raw. Peak memory
+comes from tracemalloc and is compared for every case.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+
+from .harness import format_bytes, format_time, measure
+
+MODULES = ['scalar', 'core', 'registry', 'parse', 'io', 'table', 'startup']
+BASELINES = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+
+def run(modules, min_time=0.2, repeat=5, rounds=5):
+    """Measure every case of the given modules; returns {case name: result dict}"""
+    results = {}
+    for name in modules:
+        module = importlib.import_module(f'.bench_{name}', __package__)
+        for case in module.cases():
+            r = measure(case, min_time, repeat, rounds)
+            entry = {'module': name, 'time': r.time, 'peak': r.peak, 'noise': r.noise}
+            if r.baseline_time is not None:
+                entry['ratio'] = r.ratio
+                entry['baseline_time'] = r.baseline_time
+                entry['baseline_peak'] = r.baseline_peak
+                if r.baseline_peak:
+                    entry['peak_ratio'] = r.peak / r.baseline_peak
+            results[f'{name}: {case.name}'] = entry
+            _print(f'{name}: {case.name}', entry)
+    return results
+
+
+def _print(name, entry):
+    line = f"{name:<52} {format_time(entry['time'])} {format_bytes(entry['peak'])}"
+    if 'ratio' in entry:
+        line += f"   x{entry['ratio']:7.1f} time"
+        if 'peak_ratio' in entry:
+            line += f"  x{entry['peak_ratio']:5.2f} mem"
+    line += f"   ±{entry['noise'] / 2:.0%}"
+    print(line, flush=True)
+
+
+def _metric(entry, key):
+    """Overhead ratio when the case has a baseline, else the raw value"""
+    ratio_key = 'ratio' if key == 'time' else 'peak_ratio'
+    return entry.get(ratio_key, entry[key]), ratio_key in entry
+
+
+def compare(results, baselines, threshold, raw=False):
+    """
+    Return a list of regression messages (more than threshold slower or
+    bigger). Times must also move by more than the measured noise; raw
+    times of cases without a baseline are skipped unless raw is true.
+    """
+    regressions = []
+    for name, entry in results.items():
+        old = baselines.get(name)
+        if old is None:
+            continue
+        for key in ('time', 'peak'):
+            new_value, is_ratio = _metric(entry, key)
+            old_value, was_ratio = _metric(old, key)
+            # Tiny allocations are noise, not regressions
+            if is_ratio != was_ratio or (key == 'peak' and max(entry['peak'], old['peak']) < 4096):
+                continue
+            allowed = threshold
+            if key == 'time':
+                if not is_ratio and not raw:
+                    continue
+                # Spread between rounds, in either run (older baselines have none)
+                allowed = max(threshold, entry.get('noise', 0.0), old.get('noise', 0.0))
+            if old_value > 0 and new_value > old_value * (1 + allowed):
+                kind = 'overhead ratio' if is_ratio else ('time' if key == 'time' else 'peak memory')
+                regressions.append(f"{name}: {key} {kind} {old_value:.3g} -> {new_value:.3g} "
+                                   f"(+{new_value / old_value - 1:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('modules', nargs='*', default=MODULES, help=f"subset of {MODULES}")
+    parser.add_argument('--save', action='store_true', help="write results as the new baselines")
+    parser.add_argument('--compare', action='store_true', help="compare with the saved baselines")
+    parser.add_argument('--baselines', default=BASELINES, help="baselines file")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown before flagging, as a fraction (default 0.25); "
+                             "raised to the measured noise where that is larger")
+    parser.add_argument('--raw', action='store_true',
+                        help="also compare raw times of cases without a baseline")
+    parser.add_argument('--quick', action='store_true', help="shorter timing loops, noisier")
+    args = parser.parse_args(argv)
+
+    min_time, repeat, rounds = (0.05, 3, 3) if args.quick else (0.2, 5, 5)
+    results = run(args.modules, min_time, repeat, rounds)
+
+    status = 0
+    if args.compare:
+        with open(args.baselines, 'r', encoding='utf-8') as f:
+            baselines = json.load(f)['results']
+        regressions = compare(results, baselines, args.threshold, args.raw)
+        print()
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for message in regressions:
+                print(f"  {message}")
+            status = 1
+        else:
+            print(f"No regressions beyond {args.threshold:.0%} against {args.baselines}")
+
+    if args.save:
+        # Keep entries of modules that were not run this time
+        saved = {}
+        if os.path.exists(args.baselines):
+            with open(args.baselines, 'r', encoding='utf-8') as f:
+                saved = json.load(f)['results']
+        saved.update(results)
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump({'machine': f"{platform.machine()} {platform.python_implementation()} "
+                                  f"{platform.python_version()}",
+                       'results': saved}, f, indent=1, sort_keys=True)
+        print(f"Saved baselines to {args.baselines}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
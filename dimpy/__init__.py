@@ -1,2 +1,8 @@
 from .registry import UnitRegistry
 from .quantity import Quantity
+from .mixed import MixedQuantity
+from .aggregate import RunningStats, MinMax, Histogram
+from .table import QuantityTable
+from .unit import Unit
+from .errors import DimensionalityError, RegistryFrozenError
+from .io import read_csv, save, savez, load
@@ -0,0 +1,229 @@
+"""
+Streaming statistics over chunks of Quantities.
+
+Each aggregator keeps O(1) state (O(bins) for Histogram) and takes chunks,
+scalar or array Quantities, one at a time through update(). A chunk may be
+in any unit compatible with the aggregator's unit, which is the unit of the
+first chunk unless given up front. It is converted with one cached plan.
+Results are Quantities in that unit.
+
+    stats = RunningStats()
+    for chunk in sensor_chunks:
+        stats.update(chunk)
+    stats.mean, stats.std()
+
+Aggregators of the same kind can be combined with merge(), e.g. after
+feeding separate chunks to one aggregator per worker.
+"""
+from .numpy_compat import np, HAS_NUMPY
+from .quantity import Quantity
+
+
+class _Aggregator:
+    def __init__(self, unit=None, registry=None):
+        if not HAS_NUMPY:
+            raise TypeError("Install Numpy for streaming aggregators")
+        if unit is not None and registry is None:
+            if not isinstance(unit, Quantity):
+                raise TypeError("Pass registry= with a unit string or Unit")
+            registry = unit.registry
+            unit = unit.unit
+        self.registry = registry
+        self.unit = registry.unit(unit) if unit is not None else None
+
+    def _magnitudes(self, chunk):
+        """Flat float64 magnitudes of chunk in the aggregator unit"""
+        if not isinstance(chunk, Quantity):
+            raise TypeError(f"Chunks must be Quantities, got {type(chunk).__name__}")
+        if self.unit is None:
+            self.registry, self.unit = chunk.registry, chunk.unit
+        elif chunk.registry is not self.registry:
+            raise ValueError("Cannot aggregate Quantities from different registries")
+        values = np.asarray(chunk.value, dtype=np.float64).reshape(-1)
+        if chunk.unit is not self.unit:
+            values = self.registry.conversion_plan(chunk.unit, self.unit).apply(values)
+        return values
+
+    def _merge_plan(self, other):
+        """ConversionPlan from other's unit into ours, or None when other has no data"""
+        if type(other) is not type(self):
+            raise TypeError(f"Cannot merge {type(other).__name__} into {type(self).__name__}")
+        if other.unit is None:
+            return None
+        if self.unit is None:
+            self.registry, self.unit = other.registry, other.unit
+        elif other.registry is not self.registry:
+            raise ValueError("Cannot merge aggregators from different registries")
+        plan = self.registry.conversion_plan(other.unit, self.unit)
+        plan.check()
+        return plan
+
+    def _quantity(self, value, unit=None):
+        if self.unit is None:
+            raise ValueError(f"{type(self).__name__} has no data yet")
+        return Quantity(value, unit or self.unit, self.registry)
+
+
+class RunningStats(_Aggregator):
+    """
+    Count, mean and variance by Welford's method. Each chunk is reduced with
+    NumPy and folded in with the pairwise update of Chan et al., which is
+    as stable as the per-sample recurrence and O(chunk) without Python loops.
+    """
+
+    def __init__(self, unit=None, registry=None):
+        super().__init__(unit, registry)
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, chunk):
+        values = self._magnitudes(chunk)
+        n = values.size
+        if not n:
+            return self
+        mean = float(values.mean())
+        m2 = 0.0
+        if n > 1:
+            deviations = values - mean
+            m2 = float(np.dot(deviations, deviations))
+        self._combine(n, mean, m2)
+        return self
+
+    def _combine(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self._mean
+        self._mean += delta * n / total
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    def merge(self, other):
+        plan = self._merge_plan(other)
+        if plan is not None and other.count:
+            self._combine(other.count, plan.apply(other._mean), other._m2 * plan.scale ** 2)
+        return self
+
+    @property
+    def mean(self):
+        return self._quantity(self._mean if self.count else float('nan'))
+
+    def var(self, ddof=0):
+        """Variance in the squared unit (of the delta unit for absolute temperatures)"""
+        unit, scale = self.registry._difference_unit(self.unit) if self.unit is not None else (None, 1.0)
+        value = self._m2 / (self.count - ddof) if self.count > ddof else float('nan')
+        return self._quantity(value * scale ** 2, unit ** 2 if unit is not None else None)
+
+    def std(self, ddof=0):
+        unit, scale = self.registry._difference_unit(self.unit) if self.unit is not None else (None, 1.0)
+        value = (self._m2 / (self.count - ddof)) ** 0.5 if self.count > ddof else float('nan')
+        return self._quantity(value * scale, unit)
+
+    def __repr__(self):
+        if not self.count:
+            return "<RunningStats(empty)>"
+        return f"<RunningStats(count={self.count}, mean={self.mean}, std={self.std()})>"
+
+
+class MinMax(_Aggregator):
+    """Running minimum and maximum; NaNs are skipped"""
+
+    def __init__(self, unit=None, registry=None):
+        super().__init__(unit, registry)
+        self.count = 0
+        self._min = float('inf')
+        self._max = float('-inf')
+
+    def update(self, chunk):
+        values = self._magnitudes(chunk)
+        if values.size:
+            finite = values[~np.isnan(values)] if np.isnan(values).any() else values
+            if finite.size:
+                self._min = min(self._min, float(finite.min()))
+                self._max = max(self._max, float(finite.max()))
+            self.count += finite.size
+        return self
+
+    def merge(self, other):
+        plan = self._merge_plan(other)
+        if plan is not None and other.count:
+            # Conversions have positive scales, so they keep the order
+            self._min = min(self._min, plan.apply(other._min))
+            self._max = max(self._max, plan.apply(other._max))
+            self.count += other.count
+        return self
+
+    @property
+    def min(self):
+        return self._quantity(self._min if self.count else float('nan'))
+
+    @property
+    def max(self):
+        return self._quantity(self._max if self.count else float('nan'))
+
+    def __repr__(self):
+        if not self.count:
+            return "<MinMax(empty)>"
+        return f"<MinMax(min={self.min}, max={self.max})>"
+
+
+class Histogram(_Aggregator):
+    """
+    Counts per bin for edges given as a Quantity array (or low, high and a
+    number of bins, which uses NumPy's faster equal-width path). Values
+    outside the edges are counted in underflow/overflow, NaNs are dropped.
+    """
+
+    def __init__(self, edges=None, low=None, high=None, bins=None):
+        if edges is not None:
+            if not isinstance(edges, Quantity):
+                raise TypeError("edges must be a Quantity array")
+            super().__init__(edges.unit, edges.registry)
+            self._edges = np.asarray(edges.value, dtype=np.float64)
+            if self._edges.ndim != 1 or self._edges.size < 2 or np.any(np.diff(self._edges) <= 0):
+                raise ValueError("edges must be a strictly increasing 1-D array of at least two values")
+            self._range = None
+        else:
+            if not isinstance(low, Quantity) or not isinstance(high, Quantity) or not bins:
+                raise TypeError("Histogram needs edges= or low=, high= (Quantities) and bins=")
+            super().__init__(low.unit, low.registry)
+            high_value = float(self._magnitudes(high)[0])
+            self._range = (float(low.value), high_value)
+            if not self._range[0] < self._range[1]:
+                raise ValueError("low must be below high")
+            self._edges = np.linspace(self._range[0], self._range[1], int(bins) + 1)
+        self.counts = np.zeros(self._edges.size - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    @property
+    def edges(self):
+        return self._quantity(self._edges.copy())
+
+    def update(self, chunk):
+        values = self._magnitudes(chunk)
+        low, high = self._edges[0], self._edges[-1]
+        self.underflow += int(np.count_nonzero(values < low))
+        self.overflow += int(np.count_nonzero(values > high))
+        if self._range is not None:
+            counts, _ = np.histogram(values, bins=self.counts.size, range=self._range)
+        else:
+            counts, _ = np.histogram(values, bins=self._edges)
+        self.counts += counts
+        return self
+
+    def merge(self, other):
+        plan = self._merge_plan(other)
+        if plan is not None:
+            if not np.allclose(self._edges, plan.apply(other._edges), rtol=1e-12, atol=0):
+                raise ValueError("Cannot merge histograms with different edges")
+            self.counts += other.counts
+            self.underflow += other.underflow
+            self.overflow += other.overflow
+        return self
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def __repr__(self):
+        return f"<Histogram({self.counts.size} bins in {self.unit}, count={self.count})>"
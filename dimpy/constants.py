@@ -1,23 +1,39 @@
-from .registry import UnitRegistry
+"""
+Physical constants as Quantities of the shared default registry (the one
+unpickled Quantities fall back to). They combine with Quantities of any
+other registry, e.g. constants.h * constants.c / (500 * reg.nm).
 
-# Create a shared registry for constants? 
-# Or should constants be attached to a specific registry instance?
-# Usually constants are universal. 
-# But our Quantity needs a 'registry' instance to work.
-# If we instantiate a new UnitRegistry here, it's fine.
-_reg = UnitRegistry(autoload=True)
+Constants are built on first attribute access (PEP 562 module __getattr__),
+so importing this module costs nothing until a constant is actually used.
+"""
+from .registry import default_registry
 
-# Define constants
-c = 299792458 * _reg.m / _reg.s
-G = 6.67430e-11 * _reg.m**3 / (_reg.kg * _reg.s**2)
-g_0 = 9.80665 * _reg.m / _reg.s**2
-h = 6.62607015e-34 * _reg.J * _reg.s
-angle_degree = _reg.parse("0.017453292519943295 rad") # If rad was defined...
-# We haven't defined radians.
-# Let's stick to core mechanical/EM constants.
+# name -> (value, unit)
+_DEFINITIONS = {
+    'c': (299792458, 'm/s'),
+    'G': (6.67430e-11, 'm^3/(kg s^2)'),
+    'g_0': (9.80665, 'm/s^2'),
+    'h': (6.62607015e-34, 'J s'),
+    'angle_degree': (0.017453292519943295, 'rad'),
+    # Boltzmann
+    'k_B': (1.380649e-23, 'J/K'),
+}
 
-# Boltzmann
-k_B = 1.380649e-23 * _reg.J / _reg.K
+_reg = None
 
-# Electron charge?
-# need coulomb
+
+def __getattr__(name):
+    global _reg
+    if name not in _DEFINITIONS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _reg is None:
+        _reg = default_registry()
+    value, unit = _DEFINITIONS[name]
+    constant = _reg.Quantity(value, unit)
+    # Cache as a real module attribute so __getattr__ is not hit again
+    globals()[name] = constant
+    return constant
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_DEFINITIONS))
@@ -0,0 +1,149 @@
+from collections import OrderedDict, namedtuple
+
+from .errors import DimensionalityError
+from . import kernels
+from .numpy_compat import np, HAS_NUMPY, is_ndarray
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class ConversionPlan:
+    """
+    Compiled conversion between two units: target = value * scale + offset.
+
+    A plan for incompatible units keeps the error message instead, so failed
+    lookups are cached too and raise on apply().
+    """
+    __slots__ = ('scale', 'offset', 'error')
+
+    def __init__(self, scale=1.0, offset=0.0, error=None):
+        self.scale = scale
+        self.offset = offset
+        self.error = error
+
+    @property
+    def kind(self):
+        """'identity', 'scale' or 'affine' (has an offset)"""
+        if self.offset:
+            return 'affine'
+        return 'identity' if self.scale == 1 else 'scale'
+
+    def check(self):
+        if self.error is not None:
+            raise DimensionalityError(self.error)
+
+    def apply(self, value, workers=1, executor=None):
+        """
+        Convert a scalar, list or array in a single step. Arrays are split
+        across worker threads when workers > 1.
+        """
+        if self.error is not None:
+            raise DimensionalityError(self.error)
+
+        scale, offset = self.scale, self.offset
+        if isinstance(value, list):
+            if HAS_NUMPY:
+                return self.apply(np.array(value)).tolist()
+            if offset:
+                return [v * scale + offset for v in value]
+            return [v * scale for v in value]
+
+        if workers > 1 and is_ndarray(value) and value.ndim:
+            out = np.empty(value.shape, np.result_type(value, scale, offset))
+            return self.apply_into(value, out, workers, executor)
+
+        if offset:
+            return value * scale + offset
+        return value * scale
+
+    def apply_into(self, value, out, workers=1, executor=None):
+        """
+        Convert an array into a preallocated buffer in one blockwise pass.
+        out may be value itself for an in-place conversion.
+        """
+        if self.error is not None:
+            raise DimensionalityError(self.error)
+        if out.shape != np.shape(value):
+            raise ValueError(f"Output buffer has shape {out.shape}, expected {np.shape(value)}")
+        kernels.check_integer_conversion(value, self.scale, self.offset, out.dtype)
+
+        if np.issubdtype(out.dtype, np.integer):
+            scale, offset = int(self.scale), int(self.offset)
+            if not np.issubdtype(value.dtype, np.integer):
+                # Checked integral above, so the cast is exact; the
+                # kernels then stay within integers
+                np.copyto(out, value, casting='unsafe')
+                value = out
+        else:
+            scale, offset = self.scale, self.offset
+        if scale == 1 and not offset:
+            if out is not value:
+                np.copyto(out, value, casting='same_kind')
+            return out
+        if workers > 1:
+            return kernels.parallel_affine(value, scale, offset, out, workers, executor)
+        return kernels.affine(value, scale, offset, out)
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"<ConversionPlan(error={self.error!r})>"
+        return f"<ConversionPlan(scale={self.scale}, offset={self.offset})>"
+
+
+class LRUCache:
+    """
+    Small bounded mapping that evicts the least recently used entry.
+
+    Safe to share between threads without a lock: every step is a single
+    OrderedDict call, and losing a race (an entry evicted between lookup and
+    move_to_end) only costs a recompute. hits/misses may undercount then.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        data = self._data
+        value = data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        try:
+            data.move_to_end(key)
+        except KeyError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        try:
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        except KeyError:
+            pass
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        while len(self._data) > max(maxsize, 0):
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
@@ -0,0 +1,183 @@
+"""
+Unit definitions from plain-text files.
+
+One definition per line, '#' starts a comment:
+
+    @prefix kibi = 1024
+    meter = [length] = m                 new base unit of a dimension, alias m
+    gram = 1e-3 [mass] = g               base unit with a factor
+    inch = 0.0254 meter                  factor times a unit
+    newton = kg*m/s^2 = N                unit expression
+    celsius = kelvin; offset: 273.15 = degC
+    oz = 1/16 lb
+
+Everything after the definition, separated by '=', is an alias. Offsets are
+in units of the right-hand side, exactly like UnitRegistry.define().
+
+Loading a file compiles it into the registry's definition table, which is
+cached with marshal in __pycache__ next to the file. The cache is keyed by
+the file contents and by the registry state it was loaded on top of; any
+change to either makes it stale and it is rebuilt on the next load.
+"""
+import hashlib
+import marshal
+import os
+import re
+
+# Bump when the cached state layout changes
+CACHE_VERSION = 1
+
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+# Optional leading factor ('12', '1e-3', '1/16') followed by whitespace or the end
+_FACTOR_RE = re.compile(rf'^({_NUMBER}(?:/{_NUMBER})?)(?:\s+|$)(.*)$', re.DOTALL)
+_DIMENSION_RE = re.compile(r'^\[\s*(\w+)\s*\]$')
+_OFFSET_RE = re.compile(rf'^offset\s*:\s*({_NUMBER})$')
+_NAME_RE = re.compile(r'^[^\W\d][\w°µΩ]*$')
+
+
+def _number(text):
+    if '/' in text:
+        num, den = text.split('/')
+        return float(num) / float(den)
+    return float(text)
+
+
+def parse_definitions(text, source='<string>'):
+    """
+    Parse definitions text into a list of statements:
+      ('prefix', name, factor)
+      ('unit', name, base_unit, factor, offset, dimension, aliases)
+    base_unit is None for new base units; raises ValueError with the line number.
+    """
+    statements = []
+    for lineno, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+
+        def error(message):
+            return ValueError(f"{source}:{lineno}: {message}: '{line}'")
+
+        if line.startswith('@prefix'):
+            name, sep, factor = line[len('@prefix'):].partition('=')
+            name = name.strip()
+            if not sep or not _NAME_RE.match(name):
+                raise error("expected '@prefix name = factor'")
+            try:
+                statements.append(('prefix', name, _number(factor.strip())))
+            except ValueError:
+                raise error("invalid prefix factor")
+            continue
+
+        parts = [part.strip() for part in line.split('=')]
+        if len(parts) < 2 or not all(parts):
+            raise error("expected 'name = definition'")
+        name, definition, aliases = parts[0], parts[1], parts[2:]
+        for n in [name] + aliases:
+            if not _NAME_RE.match(n):
+                raise error(f"invalid unit name '{n}'")
+
+        definition, _, modifier = definition.partition(';')
+        offset = 0.0
+        if modifier:
+            match = _OFFSET_RE.match(modifier.strip())
+            if match is None:
+                raise error("expected '; offset: <number>'")
+            offset = float(match.group(1))
+
+        factor = 1.0
+        match = _FACTOR_RE.match(definition.strip())
+        if match is not None:
+            factor = _number(match.group(1))
+            definition = match.group(2)
+        definition = definition.strip()
+
+        dimension = _DIMENSION_RE.match(definition)
+        if dimension is not None:
+            statements.append(('unit', name, None, factor, offset, dimension.group(1), aliases))
+        elif definition:
+            statements.append(('unit', name, definition, factor, offset, None, aliases))
+        else:
+            raise error("missing base unit")
+    return statements
+
+
+def apply_definitions(registry, statements):
+    """Run parsed statements through define()/define_prefix()"""
+    for statement in statements:
+        if statement[0] == 'prefix':
+            registry.define_prefix(statement[1], statement[2])
+            continue
+        _, name, base_unit, factor, offset, dimension, aliases = statement
+        registry.define(name, base_unit, factor, offset, dimension=dimension)
+        for alias in aliases:
+            registry.alias(alias, name)
+
+
+def cache_path_for(path):
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, '__pycache__', f"{filename}.dimpy-{CACHE_VERSION}.marshal")
+
+
+def _read_cache(cache_path, key):
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cached, dict) or cached.get('key') != key:
+        return None
+    return cached
+
+
+def _write_cache(cache_path, data):
+    # Write to a temporary file and rename, so readers never see half a cache
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            marshal.dump(data, f)
+        os.replace(tmp, cache_path)
+    except (OSError, ValueError):
+        # Read-only location or a value marshal cannot store: just skip caching
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def load_definitions(registry, source, cache=True, cache_path=None):
+    """
+    Load a definitions file (path or open text file) into registry.
+
+    With cache=True a path source gets a compiled cache (see cache_path_for);
+    pass cache_path to cache a file object too, or to put the cache elsewhere.
+    Returns True when the definitions came from the cache.
+    """
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        path = os.fsdecode(source)
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        if cache and cache_path is None:
+            cache_path = cache_path_for(path)
+    else:
+        path = getattr(source, 'name', '<file>')
+        text = source.read()
+
+    if not cache or cache_path is None:
+        apply_definitions(registry, parse_definitions(text, path))
+        return False
+
+    digest = hashlib.sha256(text.encode('utf-8'))
+    digest.update(registry.fingerprint.encode())
+    digest.update(f"{CACHE_VERSION}/{marshal.version}".encode())
+    key = digest.hexdigest()
+
+    cached = _read_cache(cache_path, key)
+    if cached is not None:
+        registry._restore(cached['state'], cached['fingerprint'])
+        return True
+
+    apply_definitions(registry, parse_definitions(text, path))
+    _write_cache(cache_path, {'key': key, 'state': registry._state(), 'fingerprint': registry.fingerprint})
+    return False
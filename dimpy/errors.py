@@ -0,0 +1,8 @@
+class DimensionalityError(ValueError):
+    """Raised when converting or combining quantities with incompatible dimensions"""
+    pass
+
+
+class RegistryFrozenError(RuntimeError):
+    """Raised when defining units or prefixes on a frozen UnitRegistry"""
+    pass
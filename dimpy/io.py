@@ -0,0 +1,160 @@
+"""
+Reading and writing Quantities.
+
+read_csv streams a CSV/text file whose headers carry units, like
+'flow [L/s],T [degC]', and yields one dict of column Quantities per chunk,
+so memory stays bounded by the chunk size whatever the file size.
+
+save/savez/load store array Quantities in standard .npy/.npz files. The
+unit goes in a small JSON sidecar next to a .npy file (so the .npy stays
+readable by plain NumPy and can be memory-mapped), or in a '__units__'
+entry inside a .npz archive.
+"""
+import csv
+import io as _io
+import itertools
+import json
+import os
+import re
+
+from .quantity import Quantity
+from .numpy_compat import np, HAS_NUMPY
+
+# 'name [unit]' or 'name (unit)'
+_HEADER_RE = re.compile(r'^\s*(.*?)\s*(?:\[(.*)\]|\((.*)\))\s*$')
+
+CHUNK_ROWS = 65536
+
+
+def parse_header(field, registry):
+    """Split a header field into (column name, Unit); no unit means dimensionless"""
+    match = _HEADER_RE.match(field)
+    if match is None:
+        return field.strip(), registry.dimensionless
+    unit = match.group(2) if match.group(2) is not None else match.group(3)
+    return match.group(1), registry.parse_units(unit.strip())
+
+
+def read_csv(source, registry, units=None, chunk_size=CHUNK_ROWS, delimiter=',', columns=None,
+             comments='#', encoding='utf-8'):
+    """
+    Stream a numeric CSV file with unit-annotated headers.
+
+    source     path or open text file
+    units      optional {column name: target unit}; values are converted as they are read.
+               Names that match no column raise KeyError
+    chunk_size rows per yielded chunk
+    columns    optional list of column names to keep; unknown names raise KeyError
+
+    Yields {column name: array Quantity} for every chunk of rows.
+    """
+    if not HAS_NUMPY:
+        raise TypeError("Install Numpy for read_csv")
+
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        with open(source, 'r', encoding=encoding, newline='') as f:
+            yield from read_csv(f, registry, units, chunk_size, delimiter, columns, comments)
+        return
+
+    lines = iter(source)
+    for header in lines:
+        if header.strip() and not (comments and header.lstrip().startswith(comments)):
+            break
+    else:
+        return
+    fields = next(csv.reader(_io.StringIO(header), delimiter=delimiter))
+    parsed = [parse_header(field, registry) for field in fields]
+
+    names = [name for name, _ in parsed]
+    units = units or {}
+    for option, requested in (('columns', columns or ()), ('units', units)):
+        unknown = [name for name in requested if name not in names]
+        if unknown:
+            raise KeyError(f"No column named {unknown[0]!r} for {option}=; columns are {names}")
+    keep = range(len(parsed)) if columns is None else [
+        i for i, name in enumerate(names) if name in columns
+    ]
+
+    # Resolve the per-column conversion once, not per chunk
+    layout = []
+    for i in keep:
+        name, unit = parsed[i]
+        if name in units:
+            target = registry.unit(units[name])
+            layout.append((i, name, target, registry.conversion_plan(unit, target)))
+        else:
+            layout.append((i, name, unit, None))
+    usecols = [i for i, _, _, _ in layout]
+
+    while True:
+        block = list(itertools.islice(lines, chunk_size))
+        if not block:
+            return
+        data = np.loadtxt(block, delimiter=delimiter, comments=comments, usecols=usecols,
+                          ndmin=2, dtype=np.float64)
+        if not len(data):
+            continue
+        # One transposing copy makes every column contiguous for in-place conversion
+        data = np.array(data.T, order='C')
+        chunk = {}
+        for row, (i, name, unit, plan) in enumerate(layout):
+            values = data[row]
+            if plan is not None:
+                plan.apply_into(values, values)
+            chunk[name] = Quantity(values, unit, registry)
+        yield chunk
+
+
+UNITS_SUFFIX = '.units.json'
+_NPZ_UNITS_KEY = '__units__'
+
+
+def _sidecar(path):
+    return os.fspath(path) + UNITS_SUFFIX
+
+
+def save(path, quantity):
+    """Write an array Quantity to a .npy file plus a '<path>.units.json' sidecar"""
+    path = os.fspath(path)
+    if not path.endswith('.npy'):
+        path += '.npy'
+    np.save(path, np.asarray(quantity.value), allow_pickle=False)
+    with open(_sidecar(path), 'w', encoding='utf-8') as f:
+        json.dump({'unit': str(quantity.unit)}, f)
+
+
+def savez(path, compressed=False, **quantities):
+    """Write several named Quantities to one .npz archive"""
+    path = os.fspath(path)
+    if not path.endswith('.npz'):
+        path += '.npz'
+    units = {name: str(q.unit) for name, q in quantities.items()}
+    arrays = {name: np.asarray(q.value) for name, q in quantities.items()}
+    arrays[_NPZ_UNITS_KEY] = np.array(json.dumps(units))
+    (np.savez_compressed if compressed else np.savez)(path, **arrays)
+
+
+def load(path, registry, mmap=False):
+    """
+    Load a file written by save() or savez().
+
+    For .npy files mmap=True returns a Quantity backed by a read-only memory
+    map, so nothing is read until it is sliced. .npz archives return a dict
+    {name: Quantity}. A path without a suffix gets the one save() or savez()
+    added: '.npy' if that file exists, else '.npz'.
+    """
+    path = os.fspath(path)
+    if not path.endswith(('.npy', '.npz')):
+        path += '.npy' if os.path.exists(path + '.npy') else '.npz'
+    if path.endswith('.npz'):
+        if mmap:
+            raise ValueError("mmap is only supported for .npy files")
+        with np.load(path, allow_pickle=False) as archive:
+            units = json.loads(str(archive[_NPZ_UNITS_KEY]))
+            return {name: Quantity(archive[name], registry.parse_units(unit), registry)
+                    for name, unit in units.items()}
+
+    with open(_sidecar(path), 'r', encoding='utf-8') as f:
+        unit = json.load(f)['unit']
+    value = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+    return Quantity(value, registry.parse_units(unit), registry)
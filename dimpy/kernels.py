@@ -0,0 +1,217 @@
+"""
+Array kernels used by conversions and mixed-unit arithmetic.
+
+The affine kernel walks the array in cache-sized blocks so the multiply and
+the add of a conversion touch each block while it is still in cache, which
+costs one pass over main memory and no temporaries.
+
+The parallel_* variants split large arrays into one contiguous span per
+worker and run the same kernels on a thread pool. NumPy releases the GIL in
+its inner loops, so threads scale with memory bandwidth.
+"""
+import threading
+
+from .numpy_compat import np
+
+# Elements per block; 32k doubles (256 KB) fits comfortably in L2
+BLOCK_SIZE = 1 << 15
+
+# Below this many elements parallel requests run serially: dispatching to
+# threads costs more than it saves on arrays of a few MB
+PARALLEL_THRESHOLD = 1 << 21
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _flat_view(array):
+    """1-D view of a contiguous array, or None if a view is not possible"""
+    if array.flags.c_contiguous or array.flags.f_contiguous:
+        return array.ravel(order='K')
+    return None
+
+
+def affine(src, scale, offset, out, block_size=BLOCK_SIZE):
+    """out = src * scale + offset, blockwise, writing only into out"""
+    flat_src = _flat_view(src)
+    flat_out = _flat_view(out)
+    same_order = src.flags.c_contiguous == out.flags.c_contiguous
+    if flat_src is None or flat_out is None or not same_order:
+        # Strided arrays: still no temporaries, just two whole-array passes
+        np.multiply(src, scale, out=out, casting='same_kind')
+        if offset:
+            np.add(out, offset, out=out, casting='same_kind')
+        return out
+
+    n = flat_src.size
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        dst = flat_out[start:stop]
+        np.multiply(flat_src[start:stop], scale, out=dst, casting='same_kind')
+        if offset:
+            np.add(dst, offset, out=dst, casting='same_kind')
+    return out
+
+
+def check_integer_conversion(array, scale, offset, dtype):
+    """Raise TypeError unless converting data into integer dtype is exact and fits"""
+    if not np.issubdtype(dtype, np.integer):
+        return
+    if not (float(scale).is_integer() and float(offset).is_integer()):
+        raise TypeError(
+            f"Conversion factor {scale} (offset {offset}) is not integral, so it cannot be stored "
+            f"in an {dtype} array; convert with .to() or cast to float first"
+        )
+    if array.dtype.kind == 'f' and array.size:
+        # Float data only goes in when nothing would be truncated
+        if not all_integral(array):
+            raise TypeError(
+                f"Values are not integral, so they cannot be stored in an {dtype} array "
+                f"without truncation; convert with .to() or round first"
+            )
+    if array.size:
+        info = np.iinfo(dtype)
+        bounds = (array.min() * scale + offset, array.max() * scale + offset)
+        if min(bounds) < info.min or max(bounds) > info.max:
+            raise OverflowError(f"Converted values do not fit in {dtype}")
+
+
+def all_integral(array, block_size=BLOCK_SIZE):
+    """True when every value of a float array is a whole number, checked blockwise"""
+    scratch = np.empty(min(array.size, block_size), dtype=array.dtype)
+    mask = np.empty(scratch.size, dtype=bool)
+    # A buffered iterator hands out contiguous blocks (views where possible),
+    # so strided arrays need no whole-array copy either
+    with np.nditer(array, flags=['external_loop', 'buffered', 'zerosize_ok'],
+                   buffersize=block_size) as blocks:
+        for block in blocks:
+            n = block.size
+            np.trunc(block, out=scratch[:n])
+            # NaN != NaN, so NaNs count as not integral; infinities are left
+            # to the range check
+            np.not_equal(scratch[:n], block, out=mask[:n])
+            if mask[:n].any():
+                return False
+    return True
+
+
+def get_executor(workers):
+    """Shared thread pool with the given number of workers"""
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = _executors[workers] = ThreadPoolExecutor(workers, thread_name_prefix='dimpy')
+        return executor
+
+
+def _spans(n, parts):
+    """Split range(n) into at most parts spans whose bounds are block aligned"""
+    step = -(-n // parts)
+    step = -(-step // BLOCK_SIZE) * BLOCK_SIZE
+    return [(start, min(start + step, n)) for start in range(0, n, step)]
+
+
+def map_spans(func, n, workers, executor=None):
+    """Call func(start, stop) for spans of range(n), one per worker thread"""
+    spans = _spans(n, workers)
+    if len(spans) == 1:
+        func(0, n)
+        return
+    executor = executor or get_executor(workers)
+    for future in [executor.submit(func, start, stop) for start, stop in spans]:
+        future.result()
+
+
+def parallel_affine(src, scale, offset, out, workers, executor=None):
+    """affine() with the array split across worker threads"""
+    flat_src = _flat_view(src)
+    flat_out = _flat_view(out)
+    if (workers <= 1 or flat_src is None or flat_out is None
+            or src.flags.c_contiguous != out.flags.c_contiguous):
+        return affine(src, scale, offset, out)
+
+    def run(start, stop):
+        affine(flat_src[start:stop], scale, offset, flat_out[start:stop])
+
+    map_spans(run, flat_src.size, workers, executor)
+    return out
+
+
+def parallel_ufunc(ufunc, a, b, workers, executor=None):
+    """
+    ufunc(a, b) for a large array and an array of the same shape or a scalar,
+    computed span by span on worker threads. Broadcasting or strided operands
+    run serially.
+    """
+    arrays = [x for x in (a, b) if np.ndim(x)]
+    shape = arrays[0].shape if arrays else ()
+    flat = []
+    for x in (a, b):
+        if not np.ndim(x):
+            flat.append(x)
+        elif isinstance(x, np.ndarray) and x.shape == shape and x.flags.c_contiguous:
+            flat.append(x.reshape(-1))
+        else:
+            return ufunc(a, b)
+    if workers <= 1 or not shape:
+        return ufunc(a, b)
+
+    x, y = flat
+    # The dtype of a one element result is the dtype of the whole result
+    dtype = ufunc(x[:1] if np.ndim(x) else x, y[:1] if np.ndim(y) else y).dtype
+    out = np.empty(shape, dtype)
+    flat_out = out.reshape(-1)
+
+    def run(start, stop):
+        ufunc(x[start:stop] if np.ndim(x) else x, y[start:stop] if np.ndim(y) else y,
+              out=flat_out[start:stop])
+
+    map_spans(run, flat_out.size, workers, executor)
+    return out
+
+
+def scaled_add(a, b, scale, offset=0.0, subtract=False, workers=1, executor=None):
+    """
+    a + (b * scale + offset), or a - (b * scale + offset) with subtract=True.
+
+    Mixed-unit add/sub: b is converted block by block straight into the
+    result array, so the result is the only allocation and each block is
+    still in cache for the add. Broadcasting or strided operands fall back
+    to whole-array passes over the same single buffer.
+    """
+    a = np.asarray(a)
+    b = np.asarray(b)
+    shape = np.broadcast_shapes(a.shape, b.shape)
+    op = np.subtract if subtract else np.add
+    out = np.empty(shape, np.result_type(a, b, 1.0))
+
+    flat = []
+    for x in (a, b):
+        if x.ndim == 0:
+            flat.append(x)
+        elif x.shape == shape and x.flags.c_contiguous:
+            flat.append(x.reshape(-1))
+        else:
+            np.multiply(b, scale, out=out)
+            if offset:
+                np.add(out, offset, out=out)
+            op(a, out, out=out)
+            return out
+    x, y = flat
+    flat_out = out.reshape(-1)
+
+    def run(start, stop):
+        for lo in range(start, stop, BLOCK_SIZE):
+            hi = min(lo + BLOCK_SIZE, stop)
+            dst = flat_out[lo:hi]
+            np.multiply(y[lo:hi] if y.ndim else y, scale, out=dst)
+            if offset:
+                np.add(dst, offset, out=dst)
+            op(x[lo:hi] if x.ndim else x, dst, out=dst)
+
+    if workers > 1 and flat_out.size:
+        map_spans(run, flat_out.size, workers, executor)
+    else:
+        run(0, flat_out.size)
+    return out
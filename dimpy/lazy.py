@@ -0,0 +1,332 @@
+"""
+Deferred evaluation of array Quantity expressions.
+
+q.defer() (or registry.lazy(q)) returns a LazyQuantity. Arithmetic on it
+builds an expression graph instead of computing: units and dimensions are
+checked as the graph is built, and unit conversion factors are folded into
+a single scale/offset per node. evaluate() then runs the whole expression
+chunk by chunk through a small pool of reused scratch buffers, so a formula
+like rho * g * h + P0 makes one pass over memory and allocates only the
+result.
+"""
+import numbers
+
+from . import kernels, quantity as _q
+from .errors import DimensionalityError
+from .numpy_compat import np, is_ndarray
+
+# Elements per chunk; 16k doubles is 128 KB per scratch buffer
+CHUNK_SIZE = 1 << 14
+
+_UFUNCS = {'+': 'add', '-': 'subtract', '*': 'multiply', '/': 'true_divide'}
+
+
+class _Node:
+    __slots__ = ('op', 'args', 'unit')
+
+    def __init__(self, op, args, unit):
+        # op is 'leaf' (args: (Quantity,)), 'const' (args: (value,)),
+        # 'affine' (args: (node, scale, offset)), '**' (args: (node, power))
+        # or a binary operator '+', '-', '*', '/' (args: (lhs, rhs))
+        self.op = op
+        self.args = args
+        self.unit = unit
+
+
+def _const(value, unit):
+    return _Node('const', (value,), unit)
+
+
+def _affine(node, scale, offset=0.0, unit=None):
+    """node * scale + offset, merged into node when it is already affine or constant"""
+    unit = node.unit if unit is None else unit
+    if scale == 1 and not offset:
+        return node if node.unit is unit else _Node(node.op, node.args, unit)
+    if node.op == 'const':
+        return _const(node.args[0] * scale + offset, unit)
+    if node.op == 'affine':
+        inner, s, o = node.args
+        return _Node('affine', (inner, s * scale, o * scale + offset), unit)
+    return _Node('affine', (node, scale, offset), unit)
+
+
+def _split_scale(node):
+    """Return (node without a pure scale factor, factor)"""
+    if node.op == 'affine' and not node.args[2]:
+        return node.args[0], node.args[1]
+    return node, 1.0
+
+
+class LazyQuantity:
+    """A Quantity expression that is evaluated on demand"""
+
+    def __init__(self, node, registry):
+        self._node = node
+        self.registry = registry
+
+    @property
+    def unit(self):
+        return self._node.unit
+
+    def _wrap(self, other):
+        if isinstance(other, LazyQuantity):
+            return other._node
+        if isinstance(other, _q.Quantity):
+            if not is_ndarray(other.value) or other.value.ndim == 0:
+                return _const(other.value, other.unit)
+            return _Node('leaf', (other,), other.unit)
+        if isinstance(other, numbers.Number):
+            return _const(other, self.registry.dimensionless)
+        if is_ndarray(other):
+            return _Node('leaf', (_q.Quantity(other, self.registry.dimensionless, self.registry),),
+                         self.registry.dimensionless)
+        return None
+
+    def _add_sub(self, lhs, rhs, op):
+        # Dimensions (and the absolute temperature rules of Quantity +/-) are
+        # checked now; the conversions become constant factors
+        left, right, unit = self.registry._add_sub_rule(lhs.unit, rhs.unit, op == '-')
+        lhs = _affine(lhs, left[0], left[1], unit)
+        rhs = _affine(rhs, right[0], right[1], unit)
+        if rhs.op == 'const':
+            value = rhs.args[0] if op == '+' else -rhs.args[0]
+            return _affine(lhs, 1.0, value)
+        if lhs.op == 'const' and op == '+':
+            return _affine(rhs, 1.0, lhs.args[0])
+        return _Node(op, (lhs, rhs), unit)
+
+    def _mul_div(self, lhs, rhs, op):
+        unit = lhs.unit * rhs.unit if op == '*' else lhs.unit / rhs.unit
+        if rhs.op == 'const':
+            value = rhs.args[0]
+            return _affine(lhs, value if op == '*' else 1.0 / value, 0.0, unit)
+        if lhs.op == 'const' and op == '*':
+            return _affine(rhs, lhs.args[0], 0.0, unit)
+        # Pull pure scale factors up so they merge into one constant
+        lhs, a = _split_scale(lhs)
+        rhs, b = _split_scale(rhs)
+        node = _Node(op, (lhs, rhs), unit)
+        return _affine(node, a * b if op == '*' else a / b, 0.0, unit)
+
+    def _binary(self, other, op, reflected=False):
+        rhs = self._wrap(other)
+        if rhs is None:
+            return NotImplemented
+        lhs = self._node
+        if reflected:
+            lhs, rhs = rhs, lhs
+        if op in ('+', '-'):
+            node = self._add_sub(lhs, rhs, op)
+        else:
+            node = self._mul_div(lhs, rhs, op)
+        return LazyQuantity(node, self.registry)
+
+    def __add__(self, other):
+        return self._binary(other, '+')
+
+    def __radd__(self, other):
+        return self._binary(other, '+', reflected=True)
+
+    def __sub__(self, other):
+        return self._binary(other, '-')
+
+    def __rsub__(self, other):
+        return self._binary(other, '-', reflected=True)
+
+    def __mul__(self, other):
+        return self._binary(other, '*')
+
+    def __rmul__(self, other):
+        return self._binary(other, '*', reflected=True)
+
+    def __truediv__(self, other):
+        return self._binary(other, '/')
+
+    def __rtruediv__(self, other):
+        return self._binary(other, '/', reflected=True)
+
+    def __neg__(self):
+        return LazyQuantity(_affine(self._node, -1.0), self.registry)
+
+    def __pow__(self, power):
+        if not isinstance(power, numbers.Real):
+            raise TypeError("Power must be a number")
+        node = self._node
+        if node.op == 'const':
+            return LazyQuantity(_const(node.args[0] ** power, node.unit ** power), self.registry)
+        node, scale = _split_scale(node)
+        node = _Node('**', (node, power), node.unit ** power)
+        return LazyQuantity(_affine(node, scale ** power), self.registry)
+
+    def to(self, target_unit):
+        """Convert lazily; the factor is folded into the expression"""
+        target = self.registry.unit(target_unit)
+        plan = self.registry.conversion_plan(self.unit, target)
+        if plan.error is not None:
+            raise DimensionalityError(plan.error)
+        return LazyQuantity(_affine(self._node, plan.scale, plan.offset, target), self.registry)
+
+    def evaluate(self, chunk_size=CHUNK_SIZE, out=None, workers=None):
+        """
+        Compute the expression and return a Quantity. Large expressions are
+        split across threads like Quantity arithmetic (see
+        UnitRegistry.set_parallel); workers= overrides the thread count.
+        """
+        program, leaves = _compile(self._node)
+        size = max((leaf.size for leaf in leaves), default=0)
+        workers = self.registry._workers_for(size, workers)
+        value = _execute(program, leaves, chunk_size, out, workers, self.registry.executor)
+        stats = self.registry._stats
+        if stats is not None:
+            stats.count('lazy.evaluate')
+            if out is None:
+                stats.count_array(value)
+        return _q.Quantity(value, self.unit, self.registry)
+
+    compute = evaluate
+
+    def __repr__(self):
+        return f"<LazyQuantity({_format(self._node)}, '{self.unit}')>"
+
+
+def _format(node):
+    if node.op == 'leaf':
+        return f"array{np.shape(node.args[0].value)}"
+    if node.op == 'const':
+        return repr(node.args[0])
+    if node.op == 'affine':
+        inner, scale, offset = node.args
+        text = f"{_format(inner)} * {scale!r}"
+        return f"({text} + {offset!r})" if offset else text
+    if node.op == '**':
+        return f"({_format(node.args[0])}) ** {node.args[1]!r}"
+    return f"({_format(node.args[0])} {node.op} {_format(node.args[1])})"
+
+
+def _compile(root):
+    """Flatten the graph into a postfix program; identical leaves share an index"""
+    program = []
+    leaves = []
+    index = {}
+
+    def visit(node):
+        if node.op == 'leaf':
+            q = node.args[0]
+            key = id(q)
+            if key not in index:
+                index[key] = len(leaves)
+                leaves.append(np.asarray(q.value))
+            program.append(('leaf', index[key]))
+        elif node.op == 'const':
+            program.append(('const', node.args[0]))
+        elif node.op == 'affine':
+            visit(node.args[0])
+            program.append(('affine', node.args[1], node.args[2]))
+        elif node.op == '**':
+            visit(node.args[0])
+            program.append(('power', node.args[1]))
+        else:
+            visit(node.args[0])
+            visit(node.args[1])
+            program.append(('binary', getattr(np, _UFUNCS[node.op])))
+
+    visit(root)
+    return program, leaves
+
+
+class _BufferPool:
+    """Scratch buffers of one chunk shape, reused across ops and chunks"""
+
+    def __init__(self, shape, dtype):
+        self.shape = shape
+        self.dtype = dtype
+        self.free = []
+
+    def take(self):
+        if self.free:
+            return self.free.pop()
+        return np.empty(self.shape, self.dtype)
+
+    def give(self, buf):
+        self.free.append(buf)
+
+
+def _run(program, views, pool):
+    stack = []  # (array, owned by pool)
+    for instr in program:
+        kind = instr[0]
+        if kind == 'leaf':
+            stack.append((views[instr[1]], False))
+        elif kind == 'const':
+            stack.append((instr[1], False))
+        elif kind in ('affine', 'power'):
+            x, owned = stack.pop()
+            dst = x if owned else pool.take()
+            if kind == 'affine':
+                np.multiply(x, instr[1], out=dst)
+                if instr[2]:
+                    np.add(dst, instr[2], out=dst)
+            else:
+                np.power(x, instr[1], out=dst)
+            stack.append((dst, True))
+        else:
+            b, b_owned = stack.pop()
+            a, a_owned = stack.pop()
+            if a_owned:
+                dst = a
+            elif b_owned:
+                dst = b
+            else:
+                dst = pool.take()
+            instr[1](a, b, out=dst)
+            if a_owned and b_owned:
+                pool.give(b)
+            stack.append((dst, True))
+    return stack.pop()
+
+
+def _execute(program, leaves, chunk_size, out, workers=1, executor=None):
+    shape = np.broadcast_shapes(*[leaf.shape for leaf in leaves]) if leaves else ()
+    dtype = np.result_type(float, *leaves)
+    if out is None:
+        out = np.empty(shape, dtype)
+    elif out.shape != shape:
+        raise ValueError(f"Output buffer has shape {out.shape}, expected {shape}")
+
+    # Chunk over the flattened arrays when every array leaf has the full shape
+    # and a flat view; broadcasting expressions run whole-array instead.
+    size = out.size
+    flat_out = out.reshape(-1) if out.flags.c_contiguous else None
+    flat_leaves = []
+    for leaf in leaves:
+        if leaf.ndim == 0:
+            flat_leaves.append(leaf[()])
+        elif leaf.shape == shape and leaf.flags.c_contiguous:
+            flat_leaves.append(leaf.reshape(-1))
+        else:
+            flat_leaves = None
+            break
+
+    if flat_out is None or flat_leaves is None or not shape:
+        result, _ = _run(program, leaves, _BufferPool(shape, dtype))
+        np.copyto(out, result, casting='unsafe')
+        return out
+
+    def run_span(begin, end):
+        # Every thread walks its own span with its own scratch buffers
+        pool = _BufferPool((min(chunk_size, end - begin),), dtype)
+        for start in range(begin, end, chunk_size):
+            stop = min(start + chunk_size, end)
+            views = [leaf[start:stop] if isinstance(leaf, np.ndarray) else leaf for leaf in flat_leaves]
+            if stop - start != pool.shape[0]:
+                pool = _BufferPool((stop - start,), dtype)
+            result, owned = _run(program, views, pool)
+            flat_out[start:stop] = result
+            if owned:
+                pool.give(result)
+
+    if workers > 1:
+        kernels.map_spans(run_span, size, workers, executor)
+    else:
+        run_span(0, size)
+    return out
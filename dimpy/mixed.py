@@ -0,0 +1,149 @@
+"""
+Arrays whose rows each carry their own unit.
+
+A MixedQuantity stores a float64 values array plus an integer array of
+registry unit IDs (see UnitRegistry.unit_id). Conversions never loop over
+rows in Python: the registry keeps factor, offset and dimension arrays
+indexed by unit ID, so converting every row is one gather
+
+    values * factor[ids] + offset[ids]
+
+with the per-ID tables already folded with the target unit.
+"""
+from .errors import DimensionalityError
+from .numpy_compat import np, HAS_NUMPY, is_ndarray
+from .quantity import Quantity
+
+
+class MixedQuantity:
+    """
+    A 1-D array of values with one unit per row. Build one with
+    registry.stack([...]); convert with to(), which returns a Quantity.
+    """
+    __slots__ = ('values', 'ids', 'registry', '_used')
+
+    def __init__(self, values, ids, registry):
+        if not HAS_NUMPY:
+            raise TypeError("Install Numpy for mixed-unit arrays")
+        self.values = np.asarray(values, dtype=np.float64)
+        self.ids = np.asarray(ids, dtype=np.intp)
+        if self.values.shape != self.ids.shape or self.values.ndim != 1:
+            raise ValueError("values and ids must be 1-D arrays of the same length")
+        self.registry = registry
+        self._used = None
+
+    @classmethod
+    def stack(cls, quantities, registry):
+        """Rows of quantities in order; see UnitRegistry.stack"""
+        if not HAS_NUMPY:
+            raise TypeError("Install Numpy for mixed-unit arrays")
+        ids_of = {}  # Unit -> ID, saves the registry lookup for repeated units
+        values = []
+        ids = []
+        sizes = None
+        for i, q in enumerate(quantities):
+            if not isinstance(q, Quantity):
+                raise TypeError(f"Row {i} is not a Quantity: {q!r}")
+            if q.registry is not registry:
+                raise ValueError("Cannot stack Quantities from different registries")
+            uid = ids_of.get(q.unit)
+            if uid is None:
+                uid = ids_of[q.unit] = registry.unit_id(q.unit)
+            value = q.value
+            if is_ndarray(value) and value.ndim:
+                if sizes is None:
+                    sizes = [1] * len(values)
+                value = value.ravel()
+                sizes.append(value.size)
+            elif sizes is not None:
+                sizes.append(1)
+            values.append(value)
+            ids.append(uid)
+
+        if sizes is None:
+            return cls(np.array(values, dtype=np.float64), np.array(ids, dtype=np.intp), registry)
+        values = np.concatenate([np.ravel(v).astype(np.float64, copy=False) for v in values])
+        return cls(values, np.repeat(np.array(ids, dtype=np.intp), sizes), registry)
+
+    def __len__(self):
+        return self.values.size
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def units(self):
+        """The distinct Units present, in ID order"""
+        id_units = self.registry._id_units
+        return [id_units[uid] for uid in self._used_ids()]
+
+    def unit_at(self, index):
+        return self.registry._id_units[self.ids[index]]
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return Quantity(float(self.values[key]), self.unit_at(key), self.registry)
+        return MixedQuantity(self.values[key], self.ids[key], self.registry)
+
+    def _used_ids(self):
+        # values/ids are not meant to be mutated, so the distinct IDs are cached
+        if self._used is None:
+            counts = np.bincount(self.ids, minlength=len(self.registry._id_units))
+            self._used = np.flatnonzero(counts)
+        return self._used
+
+    def to(self, target_unit):
+        """All rows in one unit, as an array Quantity. Rows of other dimensions raise DimensionalityError."""
+        registry = self.registry
+        target = registry.unit(target_unit)
+        factor, offset, dims = registry._id_arrays()
+        t_scale, t_dims = registry._reduce(target)
+        t_offset = registry._units[target._single].offset if target._single is not None else 0.0
+
+        used = self._used_ids()
+        wanted = np.zeros(dims.shape[1])
+        wanted[:len(t_dims)] = [float(d) for d in t_dims]
+        bad = used[np.any(dims[used] != wanted, axis=1)]
+        if bad.size:
+            names = ", ".join(str(registry._id_units[uid]) for uid in bad[:5])
+            raise DimensionalityError(f"Cannot convert rows in {names} to {target}")
+
+        # Fold the target into the per-ID tables (a handful of entries), then
+        # gather once per row
+        out = np.take(factor / t_scale, self.ids)
+        out *= self.values
+        shift = (offset - t_offset) / t_scale
+        if shift[used].any():
+            out += np.take(shift, self.ids)
+        if registry._stats is not None:
+            registry._stats.count_array(out)
+        return Quantity(out, target, registry)
+
+    def to_base(self):
+        """Every row in the base units of its own dimensions, still mixed where dimensions differ"""
+        registry = self.registry
+        factor, offset, _ = registry._id_arrays()
+        used = self._used_ids()
+        remap = np.arange(len(factor))
+        for uid in used:
+            remap[uid] = registry.unit_id(registry.to_base_unit(registry._id_units[uid]))
+        values = self.values * np.take(factor, self.ids)
+        if offset[used].any():
+            values += np.take(offset, self.ids)
+        return MixedQuantity(values, np.take(remap, self.ids), registry)
+
+    def groups(self):
+        """{Unit: (row indices, array Quantity)}, the same shape as parse_many() returns"""
+        order = np.argsort(self.ids, kind='stable')
+        counts = np.bincount(self.ids)
+        result = {}
+        start = 0
+        for uid in self._used_ids():
+            rows = order[start:start + counts[uid]]
+            start += counts[uid]
+            result[self.registry._id_units[uid]] = (rows, Quantity(self.values[rows], self.registry._id_units[uid], self.registry))
+        return result
+
+    def __repr__(self):
+        units = ", ".join(str(u) for u in self.units()[:5])
+        return f"<MixedQuantity({len(self)} rows, units: {units})>"
@@ -0,0 +1,39 @@
+"""
+Lazy access to NumPy.
+
+Importing NumPy costs more than the rest of dimpy together, and many users
+(CLI tools, short-lived handlers) only ever touch scalars. Modules therefore
+use the np proxy below, which imports NumPy on first attribute access, and
+is_ndarray(), which never imports it: if NumPy has not been imported yet, no
+value can be an ndarray.
+"""
+import importlib.util
+import sys
+
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+
+class _LazyNumpy:
+    """Stand-in for the numpy module that imports it when first used"""
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        import numpy
+        value = getattr(numpy, name)
+        # Cache on the proxy so later lookups are plain attribute hits
+        setattr(self, name, value)
+        return value
+
+    def __repr__(self):
+        state = 'loaded' if 'numpy' in sys.modules else 'not loaded'
+        return f"<lazy numpy module ({state})>"
+
+
+np = _LazyNumpy()
+
+
+def is_ndarray(value):
+    """isinstance(value, numpy.ndarray) without importing NumPy"""
+    numpy = sys.modules.get('numpy')
+    return numpy is not None and isinstance(value, numpy.ndarray)
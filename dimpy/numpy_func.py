@@ -0,0 +1,613 @@
+"""
+Unit propagation for NumPy ufuncs (__array_ufunc__) and array functions
+(__array_function__).
+
+Rules are keyed by function name so this module never needs NumPy itself.
+Inputs that must share a unit are converted to the unit of the first
+Quantity with one cached ConversionPlan, then the raw NumPy function runs
+on the magnitudes and the result is wrapped once.
+"""
+from functools import reduce
+import operator
+
+from . import quantity as _q
+from .errors import DimensionalityError
+
+
+def _is_quantity(x):
+    return isinstance(x, _q.Quantity)
+
+
+def _first_quantity(args):
+    for arg in args:
+        if _is_quantity(arg):
+            return arg
+        if isinstance(arg, (list, tuple)):
+            found = _first_quantity(arg)
+            if found is not None:
+                return found
+    return None
+
+
+def _unit(x, registry):
+    return x.unit if _is_quantity(x) else registry.dimensionless
+
+
+def _magnitude(x):
+    return x.value if _is_quantity(x) else x
+
+
+def _convert(x, unit, registry):
+    """Magnitude of x expressed in unit (no copy when already in unit)"""
+    if _is_quantity(x):
+        if x.unit is unit:
+            return x.value
+        return registry.conversion_plan(x.unit, unit).apply(x.value)
+    if x is None or unit.dimensionless:
+        return x
+    raise DimensionalityError(f"Cannot combine a plain number with a quantity in '{unit}'")
+
+
+def _convert_sequence(seq, unit, registry):
+    return [_convert(x, unit, registry) for x in seq]
+
+
+def _wrap(value, unit, registry):
+    if unit is None:
+        return value
+    return _q.Quantity(value, unit, registry)
+
+
+def _require_dimensionless(x, registry, name):
+    if _is_quantity(x):
+        if x.unit.dimensionless:
+            return x.value
+        plan = registry.conversion_plan(x.unit, registry.dimensionless)
+        if plan.error is not None:
+            raise DimensionalityError(f"{name}() requires a dimensionless argument, got '{x.unit}'")
+        return plan.apply(x.value)
+    return x
+
+
+def _angle(x, registry, name):
+    """Magnitude in radians of an angle (or dimensionless) argument"""
+    if _is_quantity(x) and not x.unit.dimensionless:
+        plan = registry.conversion_plan(x.unit, registry.unit('radian'))
+        if plan.error is None:
+            return plan.apply(x.value)
+    return _require_dimensionless(x, registry, name)
+
+
+# --- ufunc rules --------------------------------------------------------------
+# Each rule maps (registry, inputs) to (magnitudes, output units); an output
+# unit of None means the result is returned without units.
+
+def _rule_same(registry, inputs):
+    unit = _first_quantity(inputs).unit
+    return [_convert(x, unit, registry) for x in inputs], (unit,)
+
+
+def _rule_add_sub(registry, inputs, subtract):
+    """add/subtract with the delta rules of Quantity + and - (see UnitRegistry._add_sub_rule)"""
+    a, b = inputs
+    a_unit, b_unit = _unit(a, registry), _unit(b, registry)
+    if a_unit not in registry._offset_units and b_unit not in registry._offset_units:
+        return _rule_same(registry, inputs)
+    left, right, unit = registry._add_sub_rule(a_unit, b_unit, subtract)
+    return [_affine_value(a, *left), _affine_value(b, *right)], (unit,)
+
+
+def _affine_value(x, scale, offset):
+    value = _magnitude(x)
+    if scale == 1.0 and not offset:
+        return value
+    return value * scale + offset
+
+
+def _rule_add(registry, inputs):
+    return _rule_add_sub(registry, inputs, False)
+
+
+def _rule_subtract(registry, inputs):
+    return _rule_add_sub(registry, inputs, True)
+
+
+def _scaled(x, unit, registry):
+    """Magnitude of a difference x in unit, scaling only (no offset)"""
+    if not _is_quantity(x):
+        return _convert(x, unit, registry)
+    scale = registry._scale_between(x.unit, unit)
+    return x.value * scale if scale != 1.0 else x.value
+
+
+def _rule_same_bool(registry, inputs):
+    values, _ = _rule_same(registry, inputs)
+    return values, (None,)
+
+
+def _rule_first(registry, inputs):
+    # Output keeps the unit of the first argument, the others are used as-is
+    return [_magnitude(x) for x in inputs], (_unit(inputs[0], registry),)
+
+
+def _rule_raw(registry, inputs):
+    return [_magnitude(x) for x in inputs], (None,)
+
+
+def _rule_dimensionless(registry, inputs):
+    return [_require_dimensionless(x, registry, 'exp/log') for x in inputs], (registry.dimensionless,)
+
+
+def _rule_sign(registry, inputs):
+    return [_magnitude(x) for x in inputs], (registry.dimensionless,)
+
+
+def _rule_multiply(registry, inputs):
+    a, b = inputs
+    return [_magnitude(a), _magnitude(b)], (_unit(a, registry) * _unit(b, registry),)
+
+
+def _rule_divide(registry, inputs):
+    a, b = inputs
+    return [_magnitude(a), _magnitude(b)], (_unit(a, registry) / _unit(b, registry),)
+
+
+def _rule_floor_divide(registry, inputs):
+    values, _ = _rule_same(registry, inputs)
+    return values, (registry.dimensionless,)
+
+
+def _rule_divmod(registry, inputs):
+    values, (unit,) = _rule_same(registry, inputs)
+    return values, (registry.dimensionless, unit)
+
+
+def _rule_modf(registry, inputs):
+    unit = _unit(inputs[0], registry)
+    return [_magnitude(inputs[0])], (unit, unit)
+
+
+def _power_rule(exponent):
+    def rule(registry, inputs):
+        (x,) = inputs
+        return [_magnitude(x)], (_unit(x, registry) ** exponent,)
+    return rule
+
+
+def _rule_reciprocal(registry, inputs):
+    (x,) = inputs
+    return [_magnitude(x)], (registry.dimensionless / _unit(x, registry),)
+
+
+def _rule_power(registry, inputs):
+    base, exponent = inputs
+    exponent = _require_dimensionless(exponent, registry, 'power')
+    base_unit = _unit(base, registry)
+    if base_unit.dimensionless:
+        return [_magnitude(base), exponent], (base_unit,)
+
+    # The result unit must be the same for every element
+    exp = exponent
+    if hasattr(exp, 'ndim'):
+        flat = exp.ravel()
+        if flat.size == 0 or (flat != flat[0]).any():
+            raise DimensionalityError("Array exponents must be uniform for quantities with units")
+        exp = flat[0].item()
+    return [base.value, exponent], (base_unit ** exp,)
+
+
+def _rule_trig(registry, inputs):
+    return [_angle(x, registry, 'trigonometric function') for x in inputs], (registry.dimensionless,)
+
+
+def _rule_inverse_trig(registry, inputs):
+    return [_require_dimensionless(x, registry, 'inverse trigonometric function') for x in inputs], \
+        (registry.unit('radian'),)
+
+
+def _rule_arctan2(registry, inputs):
+    values, _ = _rule_same(registry, inputs)
+    return values, (registry.unit('radian'),)
+
+
+def _convert_angle_rule(source, target):
+    # deg2rad/rad2deg: the input is read in `source` and labelled `target`
+    def rule(registry, inputs):
+        (x,) = inputs
+        if _is_quantity(x) and not x.unit.dimensionless:
+            return [_convert(x, registry.unit(source), registry)], (registry.unit(target),)
+        return [x], (registry.dimensionless if _is_quantity(x) else None,)
+    return rule
+
+
+_UFUNC_RULES = {}
+
+
+def _register(rule, names):
+    for name in names.split():
+        _UFUNC_RULES[name] = rule
+
+
+_register(_rule_add, "add")
+_register(_rule_subtract, "subtract")
+_register(_rule_same, "maximum minimum fmax fmin hypot remainder fmod nextafter "
+                      "absolute fabs negative positive conjugate conj rint floor ceil trunc spacing")
+_register(_rule_same_bool, "equal not_equal less less_equal greater greater_equal")
+_register(_rule_first, "copysign ldexp")
+_register(_rule_raw, "isfinite isinf isnan isnat signbit")
+_register(_rule_sign, "sign")
+_register(_rule_dimensionless, "exp exp2 expm1 log log2 log10 log1p logaddexp logaddexp2")
+_register(_rule_multiply, "multiply matmul")
+_register(_rule_divide, "divide true_divide")
+_register(_rule_floor_divide, "floor_divide")
+_register(_rule_divmod, "divmod")
+_register(_rule_modf, "modf")
+_register(_power_rule(2), "square")
+_register(_power_rule(0.5), "sqrt")
+_register(_power_rule(1 / 3), "cbrt")
+_register(_rule_reciprocal, "reciprocal")
+_register(_rule_power, "power float_power")
+_register(_rule_trig, "sin cos tan sinh cosh tanh")
+_register(_rule_inverse_trig, "arcsin arccos arctan arcsinh arccosh arctanh")
+_register(_rule_arctan2, "arctan2")
+_register(_convert_angle_rule('degree', 'radian'), "deg2rad radians")
+_register(_convert_angle_rule('radian', 'degree'), "rad2deg degrees")
+
+# ufunc.reduce/accumulate/reduceat keep the input unit for these
+_SAME_UNIT_REDUCTIONS = set("add subtract maximum minimum fmax fmin".split())
+
+
+def _unwrap_out(kwargs):
+    out = kwargs.get('out')
+    if out is None:
+        return None
+    kwargs['out'] = tuple(_magnitude(o) for o in out)
+    return out
+
+
+def _wrap_outputs(result, units, out, registry):
+    if not isinstance(result, tuple):
+        result = (result,)
+    wrapped = []
+    for i, (value, unit) in enumerate(zip(result, units)):
+        target = out[i] if out is not None and i < len(out) else None
+        if _is_quantity(target):
+            # Results were written straight into the caller's buffer
+            if unit is not None:
+                target.unit = unit
+            wrapped.append(target)
+        else:
+            wrapped.append(_wrap(value, unit, registry))
+    return wrapped[0] if len(wrapped) == 1 else tuple(wrapped)
+
+
+def _reduced_count(array, axis):
+    shape = getattr(array, 'shape', ())
+    if axis is None:
+        return reduce(operator.mul, shape, 1)
+    if isinstance(axis, tuple):
+        return reduce(operator.mul, (shape[a] for a in axis), 1)
+    return shape[axis]
+
+
+def implement_ufunc(ufunc, method, inputs, kwargs):
+    quantity = _first_quantity(inputs)
+    if quantity is None:
+        quantity = _first_quantity(kwargs.get('out', ()))
+    registry = quantity.registry
+    name = ufunc.__name__
+
+    if method == 'at':
+        # In-place on the first operand; its unit cannot change per element
+        target, indices = inputs[0], inputs[1]
+        operands = [_magnitude(target), indices]
+        if len(inputs) > 2:
+            if name in ('add', 'subtract') and _unit(target, registry) in registry._offset_units:
+                # Shifting absolute temperatures in place: the operand must be a difference
+                if _unit(inputs[2], registry) in registry._offset_units:
+                    raise DimensionalityError(
+                        f"{name}.at on absolute temperatures takes a difference, not '{inputs[2].unit}'")
+                operands.append(_scaled(inputs[2], target.unit, registry))
+            elif name in _SAME_UNIT_REDUCTIONS:
+                operands.append(_convert(inputs[2], _unit(target, registry), registry))
+            elif _UFUNC_RULES.get(name) in (_rule_multiply, _rule_divide):
+                operands.append(_require_dimensionless(inputs[2], registry, name + '.at'))
+            else:
+                return NotImplemented
+        elif _UFUNC_RULES.get(name) is not _rule_same:
+            return NotImplemented
+        ufunc.at(*operands)
+        return None
+
+    out = _unwrap_out(kwargs)
+
+    if method in ('reduce', 'accumulate', 'reduceat'):
+        x = inputs[0]
+        unit = _unit(x, registry)
+        if name in ('add', 'subtract') and unit in registry._offset_units:
+            raise DimensionalityError(
+                f"Cannot sum absolute temperatures in '{unit}'; convert to K or a delta unit first")
+        if name in _SAME_UNIT_REDUCTIONS:
+            result_unit = unit
+        elif name == 'multiply' and method == 'reduce':
+            result_unit = unit ** _reduced_count(_magnitude(x), kwargs.get('axis', 0))
+        elif unit.dimensionless and name in _UFUNC_RULES:
+            result_unit = unit
+        else:
+            return NotImplemented
+        result = getattr(ufunc, method)(_magnitude(x), *inputs[1:], **kwargs)
+        return _wrap_outputs(result, (result_unit,), out, registry)
+
+    rule = _UFUNC_RULES.get(name)
+    if rule is None or method not in ('__call__', 'outer'):
+        return NotImplemented
+    if _first_quantity(inputs) is None:
+        # Only the out= buffer is a Quantity: plain numbers give plain results
+        rule = _rule_dimensionless
+
+    values, units = rule(registry, list(inputs))
+    result = getattr(ufunc, method)(*values, **kwargs)
+    return _wrap_outputs(result, units, out, registry)
+
+
+# --- array functions ----------------------------------------------------------
+
+_FUNCTIONS = {}
+
+
+def implements(*names):
+    """Register an __array_function__ implementation for the given NumPy function names"""
+    def decorator(func):
+        for name in names:
+            _FUNCTIONS[name] = func
+        return func
+    return decorator
+
+
+def implement_function(func, types, args, kwargs):
+    impl = _FUNCTIONS.get(func.__name__)
+    if impl is None:
+        return NotImplemented
+    quantity = _first_quantity(args)
+    if quantity is None:
+        quantity = _first_quantity(list(kwargs.values()))
+    registry = quantity.registry
+    return impl(func, registry, *args, **kwargs)
+
+
+def _out_kwarg(kwargs):
+    out = kwargs.get('out')
+    if _is_quantity(out):
+        kwargs['out'] = out.value
+    return out
+
+
+def _finish(result, unit, out, registry):
+    if _is_quantity(out):
+        out.unit = unit
+        return out
+    return _wrap(result, unit, registry)
+
+
+@implements('concatenate', 'stack', 'hstack', 'vstack', 'dstack', 'column_stack', 'row_stack',
+            'block')
+def _join(func, registry, arrays, *args, **kwargs):
+    unit = _first_quantity(arrays).unit
+    out = _out_kwarg(kwargs)
+    values = _convert_sequence(arrays, unit, registry)
+    return _finish(func(values, *args, **kwargs), unit, out, registry)
+
+
+@implements('append')
+def _append(func, registry, arr, values, *args, **kwargs):
+    unit = _first_quantity([arr, values]).unit
+    return _wrap(func(_convert(arr, unit, registry), _convert(values, unit, registry), *args, **kwargs),
+                 unit, registry)
+
+
+@implements('where')
+def _where(func, registry, condition, *args):
+    if not args:
+        return func(_magnitude(condition))
+    unit = _first_quantity(args).unit
+    return _wrap(func(_magnitude(condition), *_convert_sequence(args, unit, registry)), unit, registry)
+
+
+@implements('clip')
+def _clip(func, registry, a, *bounds, **kwargs):
+    unit = a.unit
+    out = _out_kwarg(kwargs)
+    for key in ('a_min', 'a_max', 'min', 'max'):
+        if key in kwargs:
+            kwargs[key] = _convert(kwargs[key], unit, registry)
+    result = func(a.value, *_convert_sequence(bounds, unit, registry), **kwargs)
+    return _finish(result, unit, out, registry)
+
+
+@implements('compress', 'extract')
+def _select(func, registry, condition, *args, **kwargs):
+    # The condition comes first, the Quantity second (compress(cond, a), extract(cond, arr))
+    out = _out_kwarg(kwargs)
+    if args:
+        a, args = args[0], args[1:]
+    else:
+        a = kwargs.pop('a' if 'a' in kwargs else 'arr')
+    return _finish(func(_magnitude(condition), _magnitude(a), *args, **kwargs), _unit(a, registry),
+                   out, registry)
+
+
+# Functions whose result keeps the unit of the first argument
+@implements('sort', 'partition', 'flip', 'fliplr', 'flipud', 'roll', 'rot90', 'reshape', 'ravel',
+            'transpose', 'squeeze', 'expand_dims', 'moveaxis', 'swapaxes', 'rollaxis',
+            'broadcast_to', 'copy', 'tile', 'repeat', 'take', 'take_along_axis', 'diagonal', 'diag',
+            'trim_zeros', 'delete', 'resize', 'round', 'around', 'round_', 'fix', 'real', 'imag',
+            'mean', 'nanmean', 'median', 'nanmedian', 'max', 'amax', 'min', 'amin', 'nanmax', 'nanmin',
+            'percentile', 'nanpercentile', 'quantile', 'nanquantile', 'sort_complex', 'zeros_like',
+            'empty_like', 'asarray_chkfinite', 'nan_to_num', 'norm',
+            'atleast_1d', 'atleast_2d', 'atleast_3d')
+def _keep_unit(func, registry, a, *args, **kwargs):
+    out = _out_kwarg(kwargs)
+    if func.__name__.startswith('atleast_') and args:
+        return tuple(_wrap(func(_magnitude(x)), _unit(x, registry), registry) for x in (a,) + args)
+    if func.__name__ == 'nan_to_num':
+        for key in ('nan', 'posinf', 'neginf'):
+            if _is_quantity(kwargs.get(key)):
+                kwargs[key] = _convert(kwargs[key], a.unit, registry)
+    return _finish(func(a.value, *args, **kwargs), a.unit, out, registry)
+
+
+# Sums and differences follow Quantity.sum()/std()/var() for absolute
+# temperatures: sums raise, differences come out in the delta unit
+
+@implements('sum', 'nansum', 'cumsum', 'nancumsum')
+def _sum(func, registry, a, *args, **kwargs):
+    if a.unit in registry._offset_units:
+        raise DimensionalityError(
+            f"Cannot sum absolute temperatures in '{a.unit}'; convert to K or a delta unit first")
+    return _keep_unit(func, registry, a, *args, **kwargs)
+
+
+def _scale_result(result, scale, out):
+    if scale == 1.0:
+        return result
+    if out is not None:
+        result *= scale
+        return result
+    return result * scale
+
+
+@implements('diff', 'ediff1d', 'ptp', 'std', 'nanstd')
+def _difference(func, registry, a, *args, **kwargs):
+    out = _out_kwarg(kwargs)
+    unit, scale = registry._difference_unit(a.unit)
+    result = _scale_result(func(a.value, *args, **kwargs), scale, out)
+    return _finish(result, unit, out, registry)
+
+
+@implements('var', 'nanvar')
+def _variance(func, registry, a, *args, **kwargs):
+    out = _out_kwarg(kwargs)
+    unit, scale = registry._difference_unit(a.unit)
+    result = _scale_result(func(a.value, *args, **kwargs), scale ** 2, out)
+    return _finish(result, unit ** 2, out, registry)
+
+
+@implements('prod', 'nanprod')
+def _product(func, registry, a, axis=None, *args, **kwargs):
+    out = _out_kwarg(kwargs)
+    result = func(a.value, axis, *args, **kwargs)
+    return _finish(result, a.unit ** _reduced_count(a.value, axis), out, registry)
+
+
+@implements('average')
+def _average(func, registry, a, axis=None, weights=None, *args, **kwargs):
+    result = func(a.value, axis, _magnitude(weights), *args, **kwargs)
+    if isinstance(result, tuple):
+        return _wrap(result[0], a.unit, registry), result[1]
+    return _wrap(result, a.unit, registry)
+
+
+# Functions that return indices, booleans or shapes; other arguments share a unit
+@implements('argsort', 'argmax', 'argmin', 'nanargmax', 'nanargmin', 'argwhere', 'nonzero',
+            'flatnonzero', 'count_nonzero', 'argpartition', 'shape', 'ndim', 'size', 'isreal',
+            'iscomplex', 'isclose', 'allclose', 'array_equal', 'array_equiv', 'searchsorted',
+            'lexsort', 'in1d', 'isin', 'alen')
+def _raw_result(func, registry, *args, **kwargs):
+    if func.__name__ not in _COMPARING:
+        return func(*[_magnitude(x) for x in args], **{k: _magnitude(v) for k, v in kwargs.items()})
+    # The two operands (and atol) go into the unit of the first Quantity,
+    # whether they were passed by position or by keyword
+    unit = _first_quantity(list(args) + list(kwargs.values())).unit
+    args = [_convert(x, unit, registry) if i < 2 else x for i, x in enumerate(args)]
+    for key in _OPERAND_KEYWORDS:
+        if key in kwargs:
+            kwargs[key] = _convert(kwargs[key], unit, registry)
+    return func(*args, **kwargs)
+
+
+_COMPARING = {'isclose', 'allclose', 'array_equal', 'array_equiv', 'searchsorted', 'in1d', 'isin'}
+_OPERAND_KEYWORDS = ('a', 'b', 'v', 'a1', 'a2', 'ar1', 'ar2', 'element', 'test_elements', 'atol')
+
+
+@implements('unique')
+def _unique(func, registry, ar, *args, **kwargs):
+    result = func(ar.value, *args, **kwargs)
+    if isinstance(result, tuple):
+        return (_wrap(result[0], ar.unit, registry),) + tuple(result[1:])
+    return _wrap(result, ar.unit, registry)
+
+
+@implements('insert')
+def _insert(func, registry, arr, obj, values, *args, **kwargs):
+    return _wrap(func(arr.value, obj, _convert(values, arr.unit, registry), *args, **kwargs),
+                 arr.unit, registry)
+
+
+@implements('full_like')
+def _full_like(func, registry, a, fill_value, *args, **kwargs):
+    if _is_quantity(a):
+        unit = a.unit
+    else:
+        unit = fill_value.unit
+    return _wrap(func(_magnitude(a), _convert(fill_value, unit, registry), *args, **kwargs),
+                 unit, registry)
+
+
+@implements('ones_like')
+def _ones_like(func, registry, a, *args, **kwargs):
+    return func(_magnitude(a), *args, **kwargs)
+
+
+@implements('linspace')
+def _linspace(func, registry, start, stop, *args, **kwargs):
+    unit = _first_quantity([start, stop]).unit
+    result = func(_convert(start, unit, registry), _convert(stop, unit, registry), *args, **kwargs)
+    if isinstance(result, tuple):
+        return tuple(_wrap(r, unit, registry) for r in result)
+    return _wrap(result, unit, registry)
+
+
+@implements('dot', 'inner', 'outer', 'cross', 'tensordot', 'kron', 'vdot', 'matmul')
+def _product_unit(func, registry, a, b, *args, **kwargs):
+    out = _out_kwarg(kwargs)
+    unit = _unit(a, registry) * _unit(b, registry)
+    return _finish(func(_magnitude(a), _magnitude(b), *args, **kwargs), unit, out, registry)
+
+
+@implements('trapz', 'trapezoid')
+def _trapezoid(func, registry, y, x=None, *args, **kwargs):
+    unit = _unit(y, registry)
+    if _is_quantity(x):
+        unit = unit * x.unit
+    elif _is_quantity(kwargs.get('dx')):
+        unit = unit * kwargs['dx'].unit
+        kwargs['dx'] = kwargs['dx'].value
+    return _wrap(func(_magnitude(y), _magnitude(x), *args, **kwargs), unit, registry)
+
+
+@implements('interp')
+def _interp(func, registry, x, xp, fp, *args, **kwargs):
+    x_unit = _first_quantity([x, xp])
+    x_unit = x_unit.unit if x_unit is not None else registry.dimensionless
+    for key in ('left', 'right'):
+        if key in kwargs and _is_quantity(fp):
+            kwargs[key] = _convert(kwargs[key], fp.unit, registry)
+    result = func(_convert(x, x_unit, registry), _convert(xp, x_unit, registry), _magnitude(fp),
+                  *args, **kwargs)
+    return _wrap(result, fp.unit, registry) if _is_quantity(fp) else result
+
+
+@implements('histogram')
+def _histogram(func, registry, a, bins=10, *args, **kwargs):
+    if _is_quantity(bins):
+        bins = _convert(bins, a.unit, registry)
+    if kwargs.get('range') is not None:
+        kwargs['range'] = tuple(_convert(r, a.unit, registry) for r in kwargs['range'])
+    counts, edges = func(a.value, bins, *args, **kwargs)
+    return counts, _wrap(edges, a.unit, registry)
+
+
+@implements('meshgrid')
+def _meshgrid(func, registry, *xi, **kwargs):
+    grids = func(*[_magnitude(x) for x in xi], **kwargs)
+    return type(grids)(_wrap(g, x.unit, registry) if _is_quantity(x) else g for g, x in zip(grids, xi))
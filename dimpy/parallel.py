@@ -0,0 +1,103 @@
+"""
+Process-pool helpers for large array Quantities.
+
+map_chunks copies the input array into shared memory once, lets every
+worker process read its slice from there and write its result into a
+shared output buffer, so no array data is pickled. Workers rebind the
+unit to their own registry through the registry fingerprint; registries
+with custom definitions must be created in each worker (pass an
+initializer) before they can be found.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .quantity import Quantity
+from .registry import get_registry
+from .numpy_compat import np
+
+
+def _attach(name, shape, dtype):
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _run_chunk(func, fingerprint, source, target, start, stop):
+    registry = get_registry(fingerprint)
+    if registry is None:
+        raise ValueError(f"No UnitRegistry with fingerprint {fingerprint} in this worker")
+    in_name, in_shape, in_dtype, in_unit = source
+    out_name, out_shape, out_dtype, out_unit = target
+
+    in_shm, in_array = _attach(in_name, in_shape, in_dtype)
+    out_shm, out_array = _attach(out_name, out_shape, out_dtype)
+    try:
+        chunk = Quantity(in_array[start:stop], registry.parse_units(in_unit), registry)
+        result = func(chunk)
+        dst = out_array[start:stop]
+        if isinstance(result, Quantity):
+            result.to(registry.parse_units(out_unit), out=dst)
+        else:
+            dst[...] = result
+        del chunk, result, dst
+    finally:
+        del in_array, out_array
+        in_shm.close()
+        out_shm.close()
+
+
+def map_chunks(func, quantity, chunks=None, max_workers=None, executor=None, initializer=None,
+               initargs=()):
+    """
+    Apply func to slices of an array Quantity along axis 0 in worker processes.
+
+    func must be a picklable (module level) function mapping a Quantity chunk
+    to a Quantity (or array) with the same length. The result unit and dtype
+    are taken from func applied to the first element. Returns one Quantity.
+    The array is cut into chunks slices, by default max_workers or else
+    os.cpu_count(); pass max_workers along with your own executor to match
+    its size.
+    """
+    from multiprocessing import shared_memory
+
+    value = np.asarray(quantity.value)
+    registry = quantity.registry
+    n = len(value)
+    workers = max_workers or os.cpu_count() or 1
+    chunks = chunks or workers
+    bounds = np.linspace(0, n, chunks + 1).astype(int)
+
+    # Probe the output unit, dtype and trailing shape on a single row
+    probe = func(Quantity(value[:1], quantity.unit, registry))
+    probe_value = np.asarray(probe.value if isinstance(probe, Quantity) else probe)
+    out_unit = probe.unit if isinstance(probe, Quantity) else registry.dimensionless
+    out_shape = (n,) + probe_value.shape[1:]
+
+    in_shm = shared_memory.SharedMemory(create=True, size=max(value.nbytes, 1))
+    out_shm = shared_memory.SharedMemory(create=True, size=max(probe_value.dtype.itemsize * int(np.prod(out_shape)), 1))
+    try:
+        np.ndarray(value.shape, value.dtype, buffer=in_shm.buf)[...] = value
+        source = (in_shm.name, value.shape, value.dtype.str, str(quantity.unit))
+        target = (out_shm.name, out_shape, probe_value.dtype.str, str(out_unit))
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+        try:
+            futures = [executor.submit(_run_chunk, func, registry.fingerprint, source, target, start, stop)
+                       for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+            for future in futures:
+                future.result()
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        shared_out = np.ndarray(out_shape, probe_value.dtype, buffer=out_shm.buf)
+        result = shared_out.copy()
+        del shared_out
+    finally:
+        in_shm.close()
+        in_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+    return Quantity(result, out_unit, registry)
@@ -0,0 +1,162 @@
+import re
+from fractions import Fraction
+
+from .unit import canonical_exponent
+
+# Tokens of a unit expression like 'kg·m²/(s^2 K)'
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)
+  | (?P<name>(?![\d⁰¹²³⁴⁵⁶⁷⁸⁹])[\w°µΩ](?:(?![⁰¹²³⁴⁵⁶⁷⁸⁹])[\w°µΩ])*)
+  | (?P<superscript>[⁺⁻]?[⁰¹²³⁴⁵⁶⁷⁸⁹]+(?:[ᐟ⸍/][⁰¹²³⁴⁵⁶⁷⁸⁹]+)?)
+  | (?P<power>\*\*|\^)
+  | (?P<op>[*/·×⋅()+\-])
+""", re.VERBOSE)
+
+_SUPERSCRIPTS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻ᐟ⸍', '0123456789+-//')
+
+
+def tokenize(text):
+    """Split a unit expression into (kind, text) tokens"""
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None:
+            raise ValueError(f"Invalid unit expression '{text}': unexpected '{text[pos]}'")
+        kind = match.lastgroup
+        if kind != 'space':
+            token = match.group()
+            if kind == 'op' and token in '·×⋅':
+                token = '*'
+            tokens.append((kind, token))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent parser for unit expressions.
+
+    Precedence, from loosest to tightest:
+      '*' and '/'   left associative: 'm/s*kg' is m kg/s
+      juxtaposition 'm/s kg' is m/(s kg)
+      '^' or '**'   exponents, optionally signed or fractional: 's^-2', 'm^(1/2)'
+    Unicode superscripts ('m²', 's⁻¹') act like '^'.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def error(self, message):
+        return ValueError(f"Invalid unit expression '{self.text}': {message}")
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, text):
+        kind, token = self.take()
+        if token != text:
+            raise self.error(f"expected '{text}'")
+
+    def parse(self):
+        if not self.tokens:
+            return {}
+        units = self.expression()
+        if self.pos != len(self.tokens):
+            raise self.error(f"unexpected '{self.peek()[1]}'")
+        return units
+
+    def expression(self):
+        units = self.product()
+        while self.peek()[1] in ('*', '/'):
+            op = self.take()[1]
+            rhs = self.product()
+            units = _combine(units, rhs, 1 if op == '*' else -1)
+        return units
+
+    def product(self):
+        units = self.power()
+        while self.peek()[0] in ('name', 'number') or self.peek()[1] == '(':
+            units = _combine(units, self.power(), 1)
+        return units
+
+    def power(self):
+        units = self.atom()
+        kind, token = self.peek()
+        if kind == 'power':
+            self.take()
+            exp = self.exponent()
+        elif kind == 'superscript':
+            self.take()
+            exp = _parse_number(token.translate(_SUPERSCRIPTS), self)
+        else:
+            return units
+        return {u: e * exp for u, e in units.items()}
+
+    def exponent(self):
+        kind, token = self.take()
+        sign = 1
+        if token in ('-', '+'):
+            sign = -1 if token == '-' else 1
+            kind, token = self.take()
+        if token == '(':
+            exp = self.exponent()
+            if self.peek()[1] == '/':
+                self.take()
+                exp = Fraction(exp) / self.exponent()
+            self.expect(')')
+            return canonical_exponent(sign * exp)
+        if kind != 'number':
+            raise self.error("expected an exponent")
+        return sign * _parse_number(token, self)
+
+    def atom(self):
+        kind, token = self.take()
+        if kind == 'name':
+            return {token: 1}
+        if kind == 'number':
+            # Only a bare '1' is allowed, as in '1/s'; scale factors are not units
+            if float(token) != 1:
+                raise self.error(f"numeric factor '{token}' is not a unit")
+            return {}
+        if token == '(':
+            units = self.expression()
+            self.expect(')')
+            return units
+        if token is None:
+            raise self.error("unexpected end of expression")
+        raise self.error(f"unexpected '{token}'")
+
+
+def _parse_number(token, parser):
+    try:
+        return canonical_exponent(token)
+    except (ValueError, ZeroDivisionError):
+        raise parser.error(f"invalid exponent '{token}'")
+
+
+def _combine(lhs, rhs, sign):
+    units = dict(lhs)
+    for u, exp in rhs.items():
+        units[u] = units.get(u, 0) + sign * exp
+    return units
+
+
+def parse_unit_expression(text):
+    """
+    Parse a unit string like 'm/s^2', 'kg * m', 'm s^-1' or 'W/(m² K)'.
+    Returns dict {unit: exponent} without zero exponents.
+    """
+    units = _Parser(text).parse()
+    units = {u: canonical_exponent(e) for u, e in units.items()}
+    return {u: e for u, e in units.items() if e != 0}
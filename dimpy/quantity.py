@@ -1,313 +1,289 @@
-try:
-    import numpy as np
-    HAS_NUMPY = True
-except ImportError:
-    HAS_NUMPY = False
-    np = None
+import math
+import operator
+
+from .unit import Unit
+from .errors import DimensionalityError
+from . import kernels, numpy_func
+from .lazy import LazyQuantity, _Node
+from .numpy_compat import np, HAS_NUMPY, is_ndarray
+
+_OPERATORS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+_UFUNC_NAMES = {'+': 'add', '-': 'subtract', '*': 'multiply', '/': 'true_divide'}
+
+# Exact value types served by the scalar fast paths (not bool, not NumPy scalars),
+# checked with `type(x) in _SCALARS`
+_SCALARS = (float, int)
+
+
+_object_new = object.__new__
+
+
+def _new(value, unit, registry):
+    """Quantity without any validation, for interned units and final values"""
+    q = _object_new(Quantity)
+    q.value = value
+    q.unit = unit
+    q.registry = registry
+    return q
+
+
+def _unpickle_quantity(value, unit, fingerprint):
+    from .registry import get_registry
+    registry = get_registry(fingerprint)
+    if registry is None:
+        raise ValueError(
+            f"No UnitRegistry with fingerprint {fingerprint} in this process; create it "
+            f"(e.g. in the process pool initializer) before unpickling quantities"
+        )
+    return Quantity(value, registry.parse_units(unit), registry)
+
 
 class Quantity:
+    """
+    A value (number or array) with a Unit of a UnitRegistry.
+
+    Operations on two plain float/int Quantities take a fast path: one float
+    operation, a memoized unit product and an unvalidated constructor.
+    """
+    __slots__ = ('value', 'unit', 'registry')
+
     def __init__(self, value, unit, registry):
         if HAS_NUMPY and isinstance(value, list):
             self.value = np.array(value)
         else:
             self.value = value
         self.registry = registry
-        
-        if isinstance(unit, str):
-            self._units = self._parse_unit_string(unit)
-        elif isinstance(unit, dict):
-            self._units = unit.copy()
+
+        # Units are interned by the registry and validated once when first
+        # created, so passing an existing Unit skips the lookups entirely.
+        if isinstance(unit, Unit) and unit.registry is registry:
+            self.unit = unit
+        elif isinstance(unit, (str, dict, Unit)):
+            self.unit = registry.unit(unit)
         else:
              raise TypeError("Unit must be a string or dictionary")
 
-        # Validation deferred to usage or init? 
-        # For performance with many arrays, maybe validate once?
-        # Let's keep validation on init for safety
-        for u in self._units:
-            if u not in registry._units:
-                # Could be a prefixed unit not yet defined? 
-                # Be careful. If we use dynamic prefixes, we might fail here if not yet generated.
-                # But typically we generate quantity via registry, which should resolve it first.
-                 if not registry.resolve_unit(u):
-                     raise ValueError(f"Unknown unit: {u}")
-    
-    
-    def _parse_unit_string(self, unit_str):
-        """
-        Parse unit string like 'm/s^2', 'kg * m', 'm s^-1'.
-        Returns dict {unit: exponent}.
-        """
-        units = {}
-        # Simple parser:
-        # 1. Normalize: replace / with ' * ' and reverse exponent sign logic is hard in one pass?
-        # Better: Recursive descent or simple tokenizing.
-        #
-        # Let's support:
-        # Space or * means multiply
-        # / means divide
-        # ^ means power
-        
-        # Split by / to handle numerator / denominator
-        parts = unit_str.split('/')
-        numerator = parts[0]
-        denominators = parts[1:] if len(parts) > 1 else []
-        
-        def parse_term(term, sign=1):
-            # Split by * or space
-            term = term.strip()
-            if not term: return
-            
-            # Handle multiplication by * or space
-            # Be careful not to split 'km'
-            # We can replace * with space and split
-            subterms = term.replace('*', ' ').split()
-            for sub in subterms:
-                if '^' in sub:
-                     base, exp = sub.split('^')
-                     exp = float(exp) if '.' in exp else int(exp)
-                else:
-                     base, exp = sub, 1
-                
-                units[base] = units.get(base, 0) + sign * exp
-
-        parse_term(numerator, 1)
-        for d in denominators:
-             # If denominator has multiple terms like 's*kg', they are all in denominator?
-             # Standard: m/s*kg  -> (m/s)*kg? Or m/(s*kg)?
-             # Usually standard precedence: a/b*c -> (a/b)*c. 
-             # But a/(b c) is common in parsing.
-             # Let's assume / acts on the immediate next term, but usually 'm/s kg' means m * s^-1 * kg.
-             # If user writes m/(s kg), we need parens.
-             # My split('/') handles 'm / s / kg' -> m, s, kg (all negative).
-             # It does NOT handle 'm / (s kg)'.
-             # For this simple library, let's assume flat expression:
-             # m/s^2 means m * s^-2.
-             parse_term(d, -1)
-             
-        # Filter zeroes
-        return {u: e for u, e in units.items() if e != 0}
+    def __reduce__(self):
+        # Only the value and the canonical unit string travel; the receiving
+        # process rebinds to its own registry with the same fingerprint.
+        return _unpickle_quantity, (self.value, str(self.unit), self.registry.fingerprint)
+
+    @property
+    def _units(self):
+        return self.unit.as_dict()
     
     def is_single_unit(self):
-        return len(self._units) == 1 and list(self._units.values())[0] == 1
+        return self.unit.is_single()
     
-    def __array__(self):
+    def __array__(self, dtype=None, copy=None):
         """Support for converting Quantity to numpy array (strips units)"""
         if HAS_NUMPY:
-            return np.array(self.value)
+            return np.asarray(self.value, dtype=dtype)
         return list(self.value)
     
     def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
-        """Handle numpy ufuncs (add, multiply, etc.)"""
-        if method != '__call__':
-            return NotImplemented
-            
-        # Separate inputs into quantities and numbers
-        args = []
-        unit_args = []
-        for inp in inputs:
-            if isinstance(inp, Quantity):
-                args.append(inp.value)
-                unit_args.append(inp)
-            else:
-                args.append(inp)
-                unit_args.append(None)
-        
-        # Determine resulting unit based on ufunc
-        # This is complex for general ufuncs, handling basic arithmetic only
-        if ufunc == np.add or ufunc == np.subtract:
-            # Check units match
-            u0 = unit_args[0]._units
-            u1 = unit_args[1]._units
-            if u0 != u1:
-                 # Try conversion? For now strict
-                 raise ValueError("Units must match for numpy addition/subtraction")
-            
-            result_val = ufunc(*args, **kwargs)
-            return Quantity(result_val, u0, self.registry)
-            
-        elif ufunc == np.multiply:
-            # Add units
-            u0 = unit_args[0]._units if unit_args[0] else {}
-            u1 = unit_args[1]._units if unit_args[1] else {}
-            
-            new_units = u0.copy()
-            for u, exp in u1.items():
-                new_units[u] = new_units.get(u, 0) + exp
-                if new_units[u] == 0:
-                    del new_units[u]
-            
-            result_val = ufunc(*args, **kwargs)
-            return Quantity(result_val, new_units, self.registry)
+        """Handle numpy ufuncs, including reduce/accumulate/at and out= buffers"""
+        return numpy_func.implement_ufunc(ufunc, method, inputs, kwargs)
 
-        elif ufunc == np.true_divide:
-            # Sub units
-            u0 = unit_args[0]._units if unit_args[0] else {}
-            u1 = unit_args[1]._units if unit_args[1] else {}
-            
-            new_units = u0.copy()
-            for u, exp in u1.items():
-                new_units[u] = new_units.get(u, 0) - exp
-                if new_units[u] == 0:
-                    del new_units[u]
-            
-            result_val = ufunc(*args, **kwargs)
-            return Quantity(result_val, new_units, self.registry)
+    def __array_function__(self, func, types, args, kwargs):
+        """Handle numpy functions (concatenate, where, sum, ...) on the magnitudes"""
+        for t in types:
+            if not issubclass(t, Quantity) and not issubclass(t, np.ndarray):
+                return NotImplemented
+        return numpy_func.implement_function(func, types, args, kwargs)
 
-        return NotImplemented
+    @property
+    def shape(self):
+        return np.shape(self.value)
 
-    def to(self, target_unit_str):
-        # 1. Simple Single Unit Check (Affine)
-        if self.is_single_unit():
-             source_unit = list(self._units.keys())[0]
-             self.registry.resolve_unit(target_unit_str) # Ensure target exists/generated
-             
-             if target_unit_str in self.registry._units:
-                 base_src = self.registry.get_base_unit(source_unit)
-                 base_dst = self.registry.get_base_unit(target_unit_str)
-                 
-                 if base_src and base_dst and base_src == base_dst:
-                     f_src = self.registry.get_factor(source_unit)
-                     o_src = self.registry.get_offset(source_unit)
-                     f_dst = self.registry.get_factor(target_unit_str)
-                     o_dst = self.registry.get_offset(target_unit_str)
-                     
-                     # Support array operations
-                     # val * f may need special handling if list
-                     if isinstance(self.value, list):
-                         if HAS_NUMPY:
-                             val_arr = np.array(self.value)
-                             base_val = val_arr * f_src + o_src
-                             new_val = (base_val - o_dst) / f_dst
-                             # Return as list if input was list? Or keep as numpy? 
-                             # Let's keep consistent: if numpy installed, use it internally, 
-                             # but return type?
-                             # Regulate: if input list -> output list?
-                             new_val = new_val.tolist()
-                         else:
-                             # Manual list comprehension
-                             new_val = [((v * f_src + o_src) - o_dst) / f_dst for v in self.value]
-                     elif HAS_NUMPY and isinstance(self.value, np.ndarray):
-                         base_val = self.value * f_src + o_src
-                         new_val = (base_val - o_dst) / f_dst
-                     else:
-                        base_val = self.value * f_src + o_src
-                        new_val = (base_val - o_dst) / f_dst
-                     
-                     return Quantity(new_val, target_unit_str, self.registry)
-
-        # 2. General Dimensional Analysis (ignoring offsets)
-        
-        # Calculate base value (factors only)
-        # Handle Array/List
-        if isinstance(self.value, list):
-             base_value = np.array(self.value) if HAS_NUMPY else self.value[:] 
-        elif HAS_NUMPY and isinstance(self.value, np.ndarray):
-             base_value = self.value.copy()
-        else:
-             base_value = self.value
-             
-        # Source base units
-        base_units = {}
-        for u, exp in self._units.items():
-            factor = self.registry.get_factor(u)
-            base = self.registry.get_base_unit(u)
-            
-            # Apply factor
-            if isinstance(base_value, list) and not HAS_NUMPY:
-                base_value = [v * (factor ** exp) for v in base_value]
-            else:
-                base_value *= (factor ** exp)
-            
-            base_units[base] = base_units.get(base, 0) + exp
-
-        # Parse target units
-        # If string, parse it. If dict, use it.
-        if isinstance(target_unit_str, str):
-             # Try to resolve as atomic unit first?
-             if target_unit_str in self.registry._units or self.registry.resolve_unit(target_unit_str):
-                 target_units = {target_unit_str: 1}
-             else:
-                 # Complex string parsing
-                 target_units = self._parse_unit_string(target_unit_str)
-        elif isinstance(target_unit_str, dict):
-             target_units = target_unit_str
+    @property
+    def ndim(self):
+        return np.ndim(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __getitem__(self, key):
+        return Quantity(self.value[key], self.unit, self.registry)
+
+    def __setitem__(self, key, other):
+        if isinstance(other, Quantity):
+            other = self.registry.conversion_plan(other.unit, self.unit).apply(other.value)
+        elif not self.unit.dimensionless:
+            raise DimensionalityError(f"Cannot assign a plain number to a quantity in '{self.unit}'")
+        self.value[key] = other
+
+    def __neg__(self):
+        return _new(-self.value, self.unit, self.registry)
+
+    def __pos__(self):
+        return _new(+self.value, self.unit, self.registry)
+
+    def __abs__(self):
+        return _new(abs(self.value), self.unit, self.registry)
+
+    def defer(self):
+        """Start a lazy expression; see dimpy.lazy"""
+        return LazyQuantity(_Node('leaf', (self,), self.unit), self.registry)
+
+    def _target_unit(self, target_unit):
+        if isinstance(target_unit, Unit) and target_unit.registry is self.registry:
+            return target_unit
+        if isinstance(target_unit, (str, dict, Unit)):
+            return self.registry.unit(target_unit)
+        raise TypeError("Target unit must be string or dict")
+
+    def _workers(self, *values, workers=None):
+        """Threads to use for an operation on values; 1 unless an array is large"""
+        size = max((v.size for v in values if is_ndarray(v)), default=0)
+        return self.registry._workers_for(size, workers)
+
+    def _combine_values(self, op, a, b):
+        """a <op> b, split across worker threads for large arrays"""
+        workers = self._workers(a, b)
+        if workers > 1:
+            result = kernels.parallel_ufunc(getattr(np, _UFUNC_NAMES[op]), a, b, workers,
+                                            self.registry.executor)
         else:
-             raise TypeError("Target unit must be string or dict")
+            result = _OPERATORS[op](a, b)
+        stats = self.registry._stats
+        if stats is not None and is_ndarray(result):
+            stats.count_array(result)
+        return result
 
-        # Target base units
-        target_base_units = {}
-        target_factor_accum = 1.0
-        
-        for u, exp in target_units.items():
-            # Ensure target units exist
-            if u not in self.registry._units and not self.registry.resolve_unit(u):
-                 raise ValueError(f"Unknown target unit: {u}")
-            
-            base = self.registry.get_base_unit(u)
-            factor = self.registry.get_factor(u)
-            
-            target_factor_accum *= (factor ** exp)
-            target_base_units[base] = target_base_units.get(base, 0) + exp
-            
-        # Check dimensionality match
-        # Clean up zeroes
-        base_units = {k: v for k, v in base_units.items() if v != 0}
-        target_base_units = {k: v for k, v in target_base_units.items() if v != 0}
-        
-        if base_units != target_base_units:
-             raise ValueError(f"Incompatible dimensions: {base_units} vs {target_base_units}")
-        
-        # Convert base_value to target
-        # value_dst = value_base / target_factor
-        if isinstance(base_value, list) and not HAS_NUMPY:
-             new_value = [v / target_factor_accum for v in base_value]
+    def to(self, target_unit, out=None, workers=None):
+        """
+        Convert to another unit (string, dict or Unit) using a cached plan.
+
+        With out= (an ndarray or array Quantity of the same shape) the result is
+        written into that buffer instead of a new array. workers= overrides the
+        registry's thread count (see UnitRegistry.set_parallel) for this call.
+        """
+        registry = self.registry
+        stats = registry._stats
+        if stats is not None:
+            return stats.call('to', self._to, target_unit, out, workers, stats)
+
+        if out is None and type(self.value) in _SCALARS:
+            if target_unit.__class__ is str:
+                target_unit = registry._parse_cache.get(target_unit) or registry.parse_units(target_unit)
+            elif target_unit.__class__ is not Unit or target_unit.registry is not registry:
+                target_unit = self._target_unit(target_unit)
+            key = (self.unit, target_unit)
+            plan = registry._plans.get(key) or registry._add_plan(key)
+            if plan.error is not None:
+                raise DimensionalityError(plan.error)
+            if plan.offset:
+                return _new(self.value * plan.scale + plan.offset, target_unit, registry)
+            return _new(self.value * plan.scale, target_unit, registry)
+        return self._to(target_unit, out, workers)
+
+    def _to(self, target_unit, out=None, workers=None, stats=None):
+        target = self._target_unit(target_unit)
+        plan = self.registry.conversion_plan(self.unit, target)
+        workers = self._workers(self.value, workers=workers)
+        executor = self.registry.executor
+        if stats is not None:
+            stats.count('to.' + plan.kind)
+        if out is None:
+            value = plan.apply(self.value, workers, executor)
+            if stats is not None and is_ndarray(value):
+                stats.count_array(value)
+            return Quantity(value, target, self.registry)
+
+        if isinstance(out, Quantity):
+            plan.apply_into(np.asarray(self.value), out.value, workers, executor)
+            out.unit = target
+            return out
+        plan.apply_into(np.asarray(self.value), out, workers, executor)
+        return Quantity(out, target, self.registry)
+
+    def ito(self, target_unit, workers=None):
+        """
+        Convert in place. Arrays are overwritten in one pass without temporaries;
+        integer arrays are only converted when the result stays exact.
+        """
+        target = self._target_unit(target_unit)
+        plan = self.registry.conversion_plan(self.unit, target)
+        if self.registry._stats is not None:
+            self.registry._stats.count('ito.' + plan.kind)
+        if is_ndarray(self.value) and self.value.ndim:
+            if not self.value.flags.writeable:
+                raise ValueError("Cannot convert a read-only array in place")
+            plan.apply_into(self.value, self.value, self._workers(self.value, workers=workers),
+                            self.registry.executor)
         else:
-             new_value = base_value / target_factor_accum
-        
-        if HAS_NUMPY and isinstance(new_value, np.ndarray) and isinstance(self.value, list):
-             new_value = new_value.tolist()
+            self.value = plan.apply(self.value)
+        self.unit = target
 
-        return Quantity(new_value, target_units, self.registry)
+    def to_base(self):
+        """Convert to the registry's base system: 36 km/hr -> 10 m/s"""
+        return self.to(self.registry.to_base_unit(self.unit))
 
-    def __str__(self):
-        numerator = []
-        denominator = []
-        
-        for u, exp in sorted(self._units.items()):
-            if exp > 0:
-                if exp == 1:
-                    numerator.append(u)
-                else:
-                    numerator.append(f"{u}^{exp}")
-            else:
-                if abs(exp) == 1:
-                    denominator.append(u)
-                else:
-                    denominator.append(f"{u}^{abs(exp)}")
-        
-        if not numerator:
-            num_str = "1"
+    def simplify(self):
+        """
+        Convert to a simpler unit with the same dimensions, see
+        UnitRegistry.simplify_unit: 2 kg m^2/(s^2 km) -> 0.002 N.
+        """
+        return self.to(self.registry.simplify_unit(self.unit))
+
+    def to_compact(self):
+        """
+        Re-prefix the unit so the largest finite magnitude lies in [1, 1000)
+        as far as the prefixes allow: 12345 m -> 12.345 km, 0.002 s -> 2 ms.
+        An array gets one prefix for all its elements.
+        """
+        value = self.value
+        if is_ndarray(value):
+            magnitudes = np.abs(value)
+            magnitude = float(np.max(magnitudes, where=np.isfinite(magnitudes), initial=0.0))
+        elif isinstance(value, list):
+            magnitude = max((abs(v) for v in value if math.isfinite(abs(v))), default=0.0)
         else:
-            num_str = " ".join(numerator)
-            
-        if not denominator:
-            unit_part = num_str if numerator else ""
-            return f"{self.value} {unit_part}".strip()
-        
-        den_str = " ".join(denominator)
-        if len(denominator) > 1:
-            den_str = f"({den_str})"
-            
-        return f"{self.value} {num_str}/{den_str}"
+            magnitude = abs(value)
+        return self.to(self.registry._compact_unit(self.unit, magnitude))
+
+    def __str__(self):
+        return f"{self.value} {self.unit}".strip()
 
     def __repr__(self):
         return f"<Quantity({self.value}, {self._units})>"
     
+    def _scaled_combine(self, a, b, scale, offset, subtract):
+        """a + (b * scale + offset), or a - (...), in one pass without temporaries"""
+        if is_ndarray(a) or is_ndarray(b):
+            result = kernels.scaled_add(a, b, scale, offset, subtract,
+                                        self._workers(a, b), self.registry.executor)
+            stats = self.registry._stats
+            if stats is not None:
+                stats.count_array(result)
+            return result
+        sign = -1 if subtract else 1
+        if isinstance(a, list) or isinstance(b, list):
+            if isinstance(a, list) and isinstance(b, list) and len(a) != len(b):
+                raise ValueError("List lengths differ")
+            n = len(a) if isinstance(a, list) else len(b)
+            xs = a if isinstance(a, list) else [a] * n
+            ys = b if isinstance(b, list) else [b] * n
+            return [x + sign * (y * scale + offset) for x, y in zip(xs, ys)]
+        return a + sign * (b * scale + offset)
+
     def _add_sub(self, other, op_sign):
+        """
+        self +/- other for any compatible units. other is scaled into self's
+        unit with the cached plan of the unit pair, in a single pass over the
+        data; absolute temperatures go through _add_sub_offset.
+        """
         if not isinstance(other, Quantity):
              raise TypeError("Operands must be Quantity instances")
+        registry = self.registry
+        if self.unit in registry._offset_units or other.unit in registry._offset_units:
+            return self._add_sub_offset(other, op_sign == -1)
 
-        if self._units == other._units:
+        if self.unit is other.unit:
              if isinstance(self.value, list) and isinstance(other.value, list) and not HAS_NUMPY:
                   # Manual list add
                   if len(self.value) != len(other.value): raise ValueError("List lengths differ")
@@ -315,7 +291,7 @@ class Quantity:
                       val = [a + b for a, b in zip(self.value, other.value)]
                   else:
                       val = [a - b for a, b in zip(self.value, other.value)]
-                  return Quantity(val, self._units, self.registry)
+                  return Quantity(val, self.unit, self.registry)
              
              if isinstance(self.value, list) and not isinstance(other.value, list) and not HAS_NUMPY:
                   # Broadcast scalar other to list self
@@ -323,51 +299,74 @@ class Quantity:
                       val = [a + other.value for a in self.value]
                   else:
                       val = [a - other.value for a in self.value]
-                  return Quantity(val, self._units, self.registry)
+                  return Quantity(val, self.unit, self.registry)
 
              # Numpy or scalar
-             val = self.value + other.value if op_sign == 1 else self.value - other.value
-             return Quantity(val, self._units, self.registry)
-        
-        # Conversion path...
-        # Simplify: Convert other to base, then to self units (factors only)
-        
-        # 1. Other -> Base
-        other_conv = other.value
-        # For lists, this is painful heavily nested.
-        # Assume usage of Numpy for ease? Or implement robust list walker.
-        # For simplicity MVP: support Scalar mixed units, Vector matching units.
-        # If Vector mixed units, require Numpy?
-        
-        if (isinstance(self.value, list) or (HAS_NUMPY and isinstance(self.value, np.ndarray))) and self._units != other._units:
-             # Try to simply call .to() on 'other' to match self unit, then add values
-             # But 'to' only works for simple target strings currently.
-             # We need a proper 'to_units(dict)'?
-             pass 
-
-        # Fallback to scalar logic but applied to array?
-        # Let's rely on .to() if possible.
-        # Construct target unit string from self._units?
-        target_str = " ".join([k for k, v in self._units.items() if v==1]) # Very hacky, only simple unit support
-        try:
-             # Only works if self is simple single unit for now
-             if self.is_single_unit():
-                 converted_other = other.to(list(self._units.keys())[0])
-                 val = self.value + converted_other.value if op_sign == 1 else self.value - converted_other.value
-                 return Quantity(val, self._units, self.registry)
-        except:
-             pass
-        
-        raise NotImplementedError("Mixed unit arithmetic for Arrays/Complex units not fully implemented yet in this step.")
+             val = self._combine_values('+' if op_sign == 1 else '-', self.value, other.value)
+             return Quantity(val, self.unit, self.registry)
+
+        # One combined factor per unit pair, e.g. 'N' + 'kg m/s^2' or 'cm' + 'm'
+        plan = registry.conversion_plan(other.unit, self.unit)
+        plan.check()
+        val = self._scaled_combine(self.value, other.value, plan.scale, 0.0, op_sign == -1)
+        return Quantity(val, self.unit, registry)
+
+    def _add_sub_offset(self, other, subtract):
+        """
+        Add/sub with absolute temperatures (units with an offset, like degC),
+        by the delta rules of UnitRegistry._add_sub_rule: degC - degC gives
+        delta_degC, degC +/- delta_degC gives degC, degC + degC raises.
+        """
+        registry = self.registry
+        left, right, unit = registry._add_sub_rule(self.unit, other.unit, subtract)
+        if left == (1.0, 0.0):
+            val = self._scaled_combine(self.value, other.value, right[0], right[1], subtract)
+        elif right == (1.0, 0.0) and not subtract:
+            # difference + absolute: scale the difference in the same pass
+            val = self._scaled_combine(other.value, self.value, left[0], left[1], False)
+        else:
+            a = registry.conversion_plan(self.unit, unit).apply(self.value)
+            val = self._scaled_combine(a, other.value, right[0], right[1], subtract)
+        return Quantity(val, unit, registry)
 
     def __add__(self, other):
+        if other.__class__ is Quantity and type(self.value) in _SCALARS and type(other.value) in _SCALARS:
+            if other.unit is self.unit:
+                # Absolute temperatures follow the delta rules in _add_sub_offset
+                if self.unit not in self.registry._offset_units:
+                    return _new(self.value + other.value, self.unit, self.registry)
+            else:
+                plan = self.registry.conversion_plan(other.unit, self.unit)
+                if plan.error is None and not plan.offset:
+                    return _new(self.value + other.value * plan.scale, self.unit, self.registry)
+        if isinstance(other, LazyQuantity):
+            return NotImplemented
         return self._add_sub(other, 1)
 
     def __sub__(self, other):
+        if other.__class__ is Quantity and type(self.value) in _SCALARS and type(other.value) in _SCALARS:
+            if other.unit is self.unit:
+                # Absolute temperatures follow the delta rules in _add_sub_offset
+                if self.unit not in self.registry._offset_units:
+                    return _new(self.value - other.value, self.unit, self.registry)
+            else:
+                plan = self.registry.conversion_plan(other.unit, self.unit)
+                if plan.error is None and not plan.offset:
+                    return _new(self.value - other.value * plan.scale, self.unit, self.registry)
+        if isinstance(other, LazyQuantity):
+            return NotImplemented
         return self._add_sub(other, -1)
 
     def __mul__(self, other):
-        if isinstance(other, (int, float, list)) or (HAS_NUMPY and isinstance(other, np.ndarray)):
+        if type(self.value) in _SCALARS:
+            cls = other.__class__
+            if cls is Quantity and type(other.value) in _SCALARS:
+                unit = (self.registry._products.get(('*', self.unit, other.unit))
+                        or self.unit * other.unit)
+                return _new(self.value * other.value, unit, self.registry)
+            if cls in _SCALARS:
+                return _new(self.value * other, self.unit, self.registry)
+        if isinstance(other, (int, float, list)) or is_ndarray(other):
              if isinstance(self.value, list) and isinstance(other, list):
                  # Element wise mul? Python lists don't do that naturally.
                  # User probably expects scalar mul or numpy-like behavior
@@ -377,31 +376,26 @@ class Quantity:
                       raise TypeError("Install Numpy for element-wise array operations")
                  val = np.array(self.value) * np.array(other)
                  if isinstance(self.value, list): val = val.tolist()
-                 return Quantity(val, self._units, self.registry)
+                 return Quantity(val, self.unit, self.registry)
              
              # Scalar mul
-             if HAS_NUMPY and isinstance(other, np.ndarray):
-                 return Quantity(self.value * other, self._units, self.registry)
+             if is_ndarray(other):
+                 return Quantity(self._combine_values('*', self.value, other), self.unit, self.registry)
                  
              if isinstance(self.value, list) and isinstance(other, (int, float)):
                  # List * scalar -> new list
-                 return Quantity([v * other for v in self.value], self._units, self.registry)
+                 return Quantity([v * other for v in self.value], self.unit, self.registry)
                  
-             return Quantity(self.value * other, self._units, self.registry)
+             return Quantity(self.value * other, self.unit, self.registry)
         
         if isinstance(other, Quantity):
             # Element wise value mul
-            if (isinstance(self.value, list) or (HAS_NUMPY and isinstance(self.value, np.ndarray))):
+            if (isinstance(self.value, list) or is_ndarray(self.value)):
                  if not HAS_NUMPY and isinstance(other.value, list):
                      raise TypeError("Install Numpy for element-wise array operations")
             
-            new_val = self.value * other.value # Works if both numpy, or scalar
-            new_units = self._units.copy()
-            for u, exp in other._units.items():
-                new_units[u] = new_units.get(u, 0) + exp
-                if new_units[u] == 0:
-                    del new_units[u]
-            return Quantity(new_val, new_units, self.registry)
+            new_val = self._combine_values('*', self.value, other.value) # Works if both numpy, or scalar
+            return Quantity(new_val, self.unit * other.unit, self.registry)
             
         return NotImplemented
 
@@ -409,37 +403,43 @@ class Quantity:
         return self.__mul__(other)
         
     def __truediv__(self, other):
-        if isinstance(other, (int, float, list)) or (HAS_NUMPY and isinstance(other, np.ndarray)):
+        if type(self.value) in _SCALARS:
+            cls = other.__class__
+            if cls is Quantity and type(other.value) in _SCALARS:
+                unit = (self.registry._products.get(('/', self.unit, other.unit))
+                        or self.unit / other.unit)
+                return _new(self.value / other.value, unit, self.registry)
+            if cls in _SCALARS:
+                return _new(self.value / other, self.unit, self.registry)
+        if isinstance(other, (int, float, list)) or is_ndarray(other):
              if isinstance(self.value, list) and not HAS_NUMPY:
                   if isinstance(other, list): raise TypeError("Install Numpy")
-                  return Quantity([v / other for v in self.value], self._units, self.registry)
+                  return Quantity([v / other for v in self.value], self.unit, self.registry)
                   
-             return Quantity(self.value / other, self._units, self.registry)
+             return Quantity(self.value / other, self.unit, self.registry)
         
         if isinstance(other, Quantity):
-            new_val = self.value / other.value
-            new_units = self._units.copy()
-            for u, exp in other._units.items():
-                new_units[u] = new_units.get(u, 0) - exp
-                if new_units[u] == 0:
-                    del new_units[u]
-            return Quantity(new_val, new_units, self.registry)
+            new_val = self._combine_values('/', self.value, other.value)
+            return Quantity(new_val, self.unit / other.unit, self.registry)
 
         return NotImplemented
 
     def __rtruediv__(self, other):
-        if isinstance(other, (int, float, list)) or (HAS_NUMPY and isinstance(other, np.ndarray)):
+        if other.__class__ in _SCALARS and type(self.value) in _SCALARS:
+            unit = self.registry._products.get(('**', self.unit, -1)) or self.unit ** -1
+            return _new(other / self.value, unit, self.registry)
+        if isinstance(other, (int, float, list)) or is_ndarray(other):
              if isinstance(self.value, list) and not HAS_NUMPY:
-                  return Quantity([other / v for v in self.value], {u: -e for u,e in self._units.items()}, self.registry)
+                  return Quantity([other / v for v in self.value], self.unit ** -1, self.registry)
                   
              new_val = other / self.value
-             new_units = {}
-             for u, exp in self._units.items():
-                 new_units[u] = -exp
-             return Quantity(new_val, new_units, self.registry)
+             return Quantity(new_val, self.unit ** -1, self.registry)
         return NotImplemented
     
     def __pow__(self, power):
+        if power.__class__ in _SCALARS and type(self.value) in _SCALARS:
+            unit = self.registry._products.get(('**', self.unit, power)) or self.unit ** power
+            return _new(self.value ** power, unit, self.registry)
         if not isinstance(power, (int, float)):
              raise TypeError("Power must be a number")
         
@@ -449,7 +449,170 @@ class Quantity:
         else:
              new_val = self.value ** power
              
-        new_units = {}
-        for u, exp in self._units.items():
-            new_units[u] = exp * power
-        return Quantity(new_val, new_units, self.registry)
+        return Quantity(new_val, self.unit ** power, self.registry)
+
+    # --- Reductions --------------------------------------------------------
+
+    def _array(self):
+        if not HAS_NUMPY:
+            raise TypeError("Install Numpy for reductions")
+        return np.asarray(self.value)
+
+    def sum(self, axis=None, dtype=None, keepdims=False):
+        if self.unit in self.registry._offset_units:
+            raise DimensionalityError(
+                f"Cannot sum absolute temperatures in '{self.unit}'; convert to K or a delta unit first")
+        return Quantity(np.sum(self._array(), axis=axis, dtype=dtype, keepdims=keepdims),
+                        self.unit, self.registry)
+
+    def mean(self, axis=None, dtype=None, keepdims=False):
+        return Quantity(np.mean(self._array(), axis=axis, dtype=dtype, keepdims=keepdims),
+                        self.unit, self.registry)
+
+    def min(self, axis=None, keepdims=False):
+        return Quantity(np.min(self._array(), axis=axis, keepdims=keepdims), self.unit, self.registry)
+
+    def max(self, axis=None, keepdims=False):
+        return Quantity(np.max(self._array(), axis=axis, keepdims=keepdims), self.unit, self.registry)
+
+    def percentile(self, q, axis=None, keepdims=False):
+        """Percentile(s) q in [0, 100] of the values, in this unit"""
+        return Quantity(np.percentile(self._array(), q, axis=axis, keepdims=keepdims),
+                        self.unit, self.registry)
+
+    def std(self, axis=None, ddof=0, keepdims=False):
+        """Standard deviation; absolute temperatures give a delta unit (degC -> delta_degC)"""
+        unit, scale = self.registry._difference_unit(self.unit)
+        value = np.std(self._array(), axis=axis, ddof=ddof, keepdims=keepdims)
+        return Quantity(value * scale if scale != 1.0 else value, unit, self.registry)
+
+    def var(self, axis=None, ddof=0, keepdims=False):
+        """Variance, in the squared unit (of the delta unit for absolute temperatures)"""
+        unit, scale = self.registry._difference_unit(self.unit)
+        value = np.var(self._array(), axis=axis, ddof=ddof, keepdims=keepdims)
+        return Quantity(value * scale ** 2 if scale != 1.0 else value, unit ** 2, self.registry)
+
+    # --- Comparisons -------------------------------------------------------
+    # The other operand is converted once into this quantity's unit (or, when
+    # only the other side is an array, this side into the other's unit), so
+    # comparing an array against a threshold is one NumPy comparison.
+
+    def _compare(self, other, op):
+        if isinstance(other, Quantity):
+            a, b = self.value, other.value
+            if other.unit is not self.unit:
+                if is_ndarray(b) and not is_ndarray(a):
+                    plan = self.registry.conversion_plan(self.unit, other.unit)
+                    if plan.error is None:
+                        a = plan.apply(a)
+                else:
+                    plan = self.registry.conversion_plan(other.unit, self.unit)
+                    if plan.error is None:
+                        b = plan.apply(b)
+                if plan.error is not None:
+                    if op is operator.eq or op is operator.ne:
+                        return self._constant_comparison(op is operator.ne)
+                    raise DimensionalityError(plan.error)
+        elif isinstance(other, (int, float)) or is_ndarray(other) or (HAS_NUMPY and isinstance(other, np.generic)):
+            # Plain numbers compare with dimensionless quantities (converted
+            # first, so 1 m/km == 0.001), and zero orders against anything
+            # (q > 0). q == 0 stays False for other dimensions though, as
+            # their hash cannot match hash(0).
+            a, b = self.value, other
+            if not self.unit.dimensionless:
+                registry = self.registry
+                plan = registry.conversion_plan(self.unit, registry.dimensionless)
+                if plan.error is None:
+                    a = plan.apply(a)
+                elif is_ndarray(other) or other != 0 or op is operator.eq or op is operator.ne:
+                    if op is operator.eq or op is operator.ne:
+                        return self._constant_comparison(op is operator.ne)
+                    raise DimensionalityError(f"Cannot compare a quantity in '{self.unit}' with a plain number")
+        else:
+            return NotImplemented
+
+        if isinstance(a, list) or isinstance(b, list):
+            n = len(a) if isinstance(a, list) else len(b)
+            xs = a if isinstance(a, list) else [a] * n
+            ys = b if isinstance(b, list) else [b] * n
+            return [op(x, y) for x, y in zip(xs, ys)]
+        return op(a, b)
+
+    def _constant_comparison(self, result):
+        # == / != between different dimensions: False / True for every element
+        if is_ndarray(self.value) and self.value.ndim:
+            return np.full(self.value.shape, result)
+        return result
+
+    def __eq__(self, other):
+        if isinstance(other, LazyQuantity):
+            return NotImplemented
+        return self._compare(other, operator.eq)
+
+    def __ne__(self, other):
+        if isinstance(other, LazyQuantity):
+            return NotImplemented
+        return self._compare(other, operator.ne)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    def __hash__(self):
+        """
+        Hash of the magnitude in base units (rounded to 12 significant digits)
+        and the dimensions, so 1 km and 1000 m hash alike; dimensionless
+        quantities hash like the plain number they equal. Arrays are unhashable.
+        Do not change a quantity (ito(), writing .value) while it is a dict
+        key or in a set: the hash follows the value, so it would be lost.
+        """
+        value = self.value
+        if is_ndarray(value):
+            if value.ndim:
+                raise TypeError("unhashable type: array Quantity")
+            value = value.item()
+        elif isinstance(value, list):
+            raise TypeError("unhashable type: list Quantity")
+        registry = self.registry
+        if self.unit is registry.dimensionless:
+            return hash(value)
+        base = registry.to_base_unit(self.unit)
+        if base is not self.unit:
+            value = registry.conversion_plan(self.unit, base).apply(value)
+        if base is registry.dimensionless:
+            # Unrounded: == against plain numbers uses this same converted value
+            return hash(value)
+        if isinstance(value, float) and math.isfinite(value) and value:
+            value = float(f"{value:.12g}")
+        return hash((value, base))
+
+    # --- Sorting and searching ---------------------------------------------
+
+    def argsort(self, kind=None):
+        """Indices that sort the values (NumPy argsort; kind='stable' keeps ties in order)"""
+        return np.argsort(np.asarray(self.value), kind=kind)
+
+    def searchsorted(self, v, side='left', sorter=None):
+        """
+        Insertion indices of v (a Quantity, converted once into this unit) in
+        the sorted values, e.g. the rows of a sorted array within a range:
+        q[q.searchsorted(lo):q.searchsorted(hi, side='right')].
+        """
+        return np.searchsorted(np.asarray(self.value), numpy_func._convert(v, self.unit, self.registry),
+                               side=side, sorter=sorter)
+
+    def unique(self, return_index=False, return_inverse=False, return_counts=False):
+        """Sorted unique values as a Quantity, plus np.unique's optional index arrays"""
+        result = np.unique(np.asarray(self.value), return_index=return_index,
+                           return_inverse=return_inverse, return_counts=return_counts)
+        if isinstance(result, tuple):
+            return (Quantity(result[0], self.unit, self.registry),) + result[1:]
+        return Quantity(result, self.unit, self.registry)
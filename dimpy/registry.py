@@ -1,25 +1,209 @@
 from .quantity import Quantity
+from .mixed import MixedQuantity
+from .unit import Unit, canonical_exponent
+from .conversion import ConversionPlan, LRUCache
+from .parser import parse_unit_expression
+from .errors import DimensionalityError, RegistryFrozenError
+from .stats import Stats
+from .numpy_compat import np, HAS_NUMPY
+from . import kernels
+from collections import namedtuple
+from types import MappingProxyType
+import itertools
+import math
+import contextlib
+import os
+import re
+import threading
+import weakref
+
+# Leading number and unit expression of strings like '10 km/hr'
+_QUANTITY_RE = re.compile(r'^([-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)\s*(.*)$', re.DOTALL)
+
+# SI base dimensions, in dimension-vector order. Registries append any extra
+# base dimensions (e.g. 'angle') after these.
+BASE_DIMENSIONS = ('length', 'mass', 'time', 'temperature', 'current', 'amount', 'luminosity')
+
+# factor and offset convert to the registry's base system: base = value * factor + offset.
+# dimensions is the exponent vector over the registry dimensions, without trailing zeros.
+UnitDefinition = namedtuple('UnitDefinition', ['factor', 'offset', 'dimensions'])
+
+
+def _trim(vector):
+    vector = list(vector)
+    while vector and vector[-1] == 0:
+        vector.pop()
+    return tuple(vector)
+
+
+# SI prefixes every registry starts with
+DEFAULT_PREFIXES = {
+    'yotta': 1e24, 'zetta': 1e21, 'exa': 1e18, 'peta': 1e15, 'tera': 1e12, 'giga': 1e9, 'mega': 1e6, 'kilo': 1e3, 'hecto': 1e2, 'deca': 10,
+    'deci': 1e-1, 'centi': 1e-2, 'milli': 1e-3, 'micro': 1e-6, 'nano': 1e-9, 'pico': 1e-12, 'femto': 1e-15, 'atto': 1e-18, 'zepto': 1e-21, 'yocto': 1e-24,
+    # Short forms
+    'Y': 1e24, 'Z': 1e21, 'E': 1e18, 'P': 1e15, 'T': 1e12, 'G': 1e9, 'M': 1e6, 'k': 1e3, 'h': 1e2, 'da': 10,
+    'd': 1e-1, 'c': 1e-2, 'm': 1e-3, 'u': 1e-6, 'µ': 1e-6, 'n': 1e-9, 'p': 1e-12, 'f': 1e-15, 'a': 1e-18, 'z': 1e-21, 'y': 1e-24
+}
+
+
+def _add_to_trie(trie, prefix, factor):
+    node = trie
+    for ch in prefix:
+        node = node.setdefault(ch, {})
+    node[None] = factor
+
+
+def _build_trie(prefixes):
+    trie = {}
+    for prefix, factor in prefixes.items():
+        _add_to_trie(trie, prefix, factor)
+    return trie
+
+
+# Shared by registries until they define their own prefixes (copy on write)
+_DEFAULT_PREFIX_TRIE = _build_trie(DEFAULT_PREFIXES)
+
+# What load_defaults() produces, computed once per process. New registries
+# copy the (immutable) definitions instead of replaying every define().
+DefaultTable = namedtuple('DefaultTable', ['units', 'dimensions', 'dimension_units', 'fingerprint'])
+_default_table = None
+_default_table_lock = threading.Lock()
+
+
+def default_table():
+    """The shared DefaultTable, built on first use"""
+    global _default_table
+    with _default_table_lock:
+        if _default_table is None:
+            registry = UnitRegistry(autoload=False)
+            UnitRegistry.load_defaults(registry)
+            _registries.pop(registry._registry_id, None)
+            _default_table = DefaultTable(
+                MappingProxyType(dict(registry._units)),
+                tuple(registry._dimensions),
+                tuple(registry._dimension_units),
+                registry.fingerprint,
+            )
+    return _default_table
+
+
+# Live registries of this process by creation order, looked up by fingerprint
+# when unpickling; the newest matching registry wins
+_registries = weakref.WeakValueDictionary()
+_registry_ids = itertools.count()
+_default_registry = None
+
+
+def default_registry():
+    """The shared registry of default units, created on first use"""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = UnitRegistry()
+    return _default_registry
+
+
+def get_registry(fingerprint):
+    """Return a registry of this process with the given fingerprint, or None"""
+    for key in sorted(_registries.keys(), reverse=True):
+        registry = _registries.get(key)
+        if registry is not None and registry.fingerprint == fingerprint:
+            return registry
+    registry = default_registry()
+    if registry.fingerprint == fingerprint:
+        return registry
+    return None
+
+
+def _unpickle_registry(fingerprint, state):
+    registry = get_registry(fingerprint)
+    if registry is None:
+        registry = UnitRegistry(autoload=False)
+        registry._restore(state)
+    return registry
+
 
 class UnitRegistry:
-    def __init__(self, autoload=True):
+    """
+    Unit definitions plus the caches derived from them.
+
+    Lookups, parsing and conversions may run from many threads. Changes to
+    the definitions (define, define_prefix and the first use of a prefixed
+    name) are serialized by a lock. A registry that is fully set up can be
+    freeze()-d: prefixed names are materialized once, further definitions
+    raise RegistryFrozenError, and lookups never write to the definitions.
+    """
+
+    def __init__(self, autoload=True, conversion_cache_size=1024):
         self._units = {}
-        self._base_units = {}
+        self._lock = threading.RLock()
+        self._frozen = False
+        self._fingerprint = None
+        self._registry_id = next(_registry_ids)
+        _registries[self._registry_id] = self
+
+        # Dimension names and, for each, the unit used by the base system
+        self._dimensions = list(BASE_DIMENSIONS)
+        self._dimension_units = [None] * len(self._dimensions)
+
+        # Interned Unit objects, keyed by their sorted (name, exponent) items,
+        # plus a memo of Unit products so repeated arithmetic is a dict hit.
+        self._interned = {}
+        self._products = {}
+        # Interned single units with an offset (degC, degF): absolute temperatures
+        self._offset_units = set()
+        self.dimensionless = self._intern(())
+
+        # Raw unit string -> Unit, so repeated spellings skip the parser.
+        # Bounded: unit strings may come from data files
+        self._parse_cache = LRUCache(4096)
+
+        # Unit -> (scale, dimensions)
+        self._reduced = {}
+
+        # Cached to_base_unit/simplify_unit/to_compact results, keyed by kind and Unit
+        self._reductions = {}
+
+        # Dense integer unit IDs for MixedQuantity. IDs never change; the
+        # factor/offset/dimension arrays over them are rebuilt when stale.
+        self._unit_ids = {}
+        self._id_units = []
+        self._id_table = None
+
+        # Compiled (source Unit, target Unit) -> ConversionPlan
+        self._plans = LRUCache(conversion_cache_size)
+
+        # Opt-in multi-threaded array kernels, see set_parallel()
+        self.workers = 1
+        self.parallel_threshold = kernels.PARALLEL_THRESHOLD
+        self.executor = None
+
+        # Instrumentation, see enable_stats(); None keeps the hot paths free
+        self._stats = None
         
-        # SI Prefixes
-        self._prefixes = {
-            'yotta': 1e24, 'zetta': 1e21, 'exa': 1e18, 'peta': 1e15, 'tera': 1e12, 'giga': 1e9, 'mega': 1e6, 'kilo': 1e3, 'hecto': 1e2, 'deca': 10,
-            'deci': 1e-1, 'centi': 1e-2, 'milli': 1e-3, 'micro': 1e-6, 'nano': 1e-9, 'pico': 1e-12, 'femto': 1e-15, 'atto': 1e-18, 'zepto': 1e-21, 'yocto': 1e-24,
-            # Short forms
-            'Y': 1e24, 'Z': 1e21, 'E': 1e18, 'P': 1e15, 'T': 1e12, 'G': 1e9, 'M': 1e6, 'k': 1e3, 'h': 1e2, 'da': 10,
-            'd': 1e-1, 'c': 1e-2, 'm': 1e-3, 'u': 1e-6, 'µ': 1e-6, 'n': 1e-9, 'p': 1e-12, 'f': 1e-15, 'a': 1e-18, 'z': 1e-21, 'y': 1e-24
-        }
+        # SI Prefixes, and a character trie over them for longest-match resolution
+        self._prefixes = dict(DEFAULT_PREFIXES)
+        self._prefix_trie = _DEFAULT_PREFIX_TRIE
+
+        # Names created by resolve_unit from a prefix, and names known not to resolve
+        self._prefixed = set()
+        self._unresolved = LRUCache(1024)
         
         if autoload:
-            self.load_defaults()
+            if type(self).load_defaults is UnitRegistry.load_defaults:
+                self._load_default_table()
+            else:
+                self.load_defaults()
+
+    def _load_default_table(self):
+        table = default_table()
+        self._units = dict(table.units)
+        self._dimensions = list(table.dimensions)
+        self._dimension_units = list(table.dimension_units)
+        self._fingerprint = table.fingerprint
 
     def load_defaults(self):
         # Length
-        self.define('meter') # Full name for prefix matching
+        self.define('meter', dimension='length') # Full name for prefix matching
         self.alias('m', 'meter')
         
         # We can still explicitly define common ones if we want short aliases
@@ -29,28 +213,24 @@ class UnitRegistry:
         self.define('mile', 'yd', 1760)
 
         # Mass
-        self.define('gram') # Base for prefixes usually, though SI base is kg. 
-        # Registry handles 'kg' via prefix 'kilo' + 'gram' if 'gram' is base?
-        # But 'kg' is the base unit of mass in SI.
-        # Let's define 'gram' as base for our system to make 'milli-gram' work nicely.
+        # 'gram' is defined so prefixes ('milligram') work, but the base unit
+        # of mass in SI is the kilogram, so gram carries a factor of 1e-3.
+        self.define('gram', dimension='mass', factor=1e-3)
         self.alias('g', 'gram')
         
         self.define('lb', 'gram', 453.59237)
         self.define('oz', 'lb', 1/16)
-        
-        # We need to manually alias 'kg' to 'kilogram' if we want short form to work with prefixes?
-        # Or just define 'kg' as 1000 g.
         self.define('kg', 'gram', 1000)
 
         # Time
-        self.define('second')
+        self.define('second', dimension='time')
         self.alias('s', 'second')
         self.define('min', 's', 60)
         self.define('hr', 'min', 60)
         self.define('day', 'hr', 24)
         
         # Temperature
-        self.define('kelvin')
+        self.define('kelvin', dimension='temperature')
         self.alias('K', 'kelvin')
         self.define('celsius', 'kelvin', 1.0, 273.15)
         self.alias('degC', 'celsius')
@@ -58,104 +238,864 @@ class UnitRegistry:
         self.alias('degR', 'rankine')
         self.define('fahrenheit', 'kelvin', 5/9, 255.37222222222222)
         self.alias('degF', 'fahrenheit')
+        # Temperature differences: degC - degC gives delta_degC
+        self.define('delta_degC', 'kelvin')
+        self.alias('delta_celsius', 'delta_degC')
+        self.define('delta_degF', 'rankine')
+        self.alias('delta_fahrenheit', 'delta_degF')
         # short aliases
         self.alias('C', 'celsius')
         self.alias('F', 'fahrenheit')
 
+        # Remaining SI base units
+        self.define('ampere', dimension='current')
+        self.alias('A', 'ampere')
+        self.define('mole', dimension='amount')
+        self.alias('mol', 'mole')
+        self.define('candela', dimension='luminosity')
+        self.alias('cd', 'candela')
+
+        # Force
+        self.define('newton', 'kg*m/s^2')
+        self.alias('N', 'newton')
+
         # Power/Energy
-        self.define('watt')
-        self.alias('W', 'watt')
-        self.define('joule')
+        self.define('joule', 'N*m')
         self.alias('J', 'joule')
-        
-        # Force (simulated as base for simplicity in this architecture)
-        self.define('newton')
-        self.alias('N', 'newton')
+        self.define('watt', 'J/s')
+        self.alias('W', 'watt')
         
         # Pressure
-        self.define('pascal')
+        self.define('pascal', 'N/m^2')
         self.alias('Pa', 'pascal')
         self.define('kPa', 'pascal', 1000)
         self.define('mmHg', 'pascal', 133.3223684) # Standard
+        self.define('bar', 'pascal', 1e5)
+        self.define('psi', 'pascal', 6894.757293168361) # lbf/in^2
         
         # Volume
-        self.define('liter')
+        self.define('liter', 'm^3', 1e-3)
         self.alias('L', 'liter')
         self.alias('l', 'liter')
         
-
-
-        
         # Angles
-        self.define('radian')
+        self.define('radian', dimension='angle')
         self.alias('rad', 'radian')
         self.define('degree', 'radian', 0.017453292519943295)
         self.alias('deg', 'degree')
 
-    def define(self, unit_name, base_unit=None, factor=1.0, offset=0.0):
+    def define(self, unit_name, base_unit=None, factor=1.0, offset=0.0, dimension=None):
+        """
+        Define a unit.
+
+        define('meter', dimension='length')  new base unit of a dimension
+        define('ft', 'inch', 12)             scaled (and offset) version of a unit
+        define('N', 'kg*m/s^2')              derived unit from an expression
+        """
+        with self._lock:
+            self._check_not_frozen()
+            self._define(unit_name, base_unit, factor, offset, dimension)
+
+    def _define(self, unit_name, base_unit, factor, offset, dimension):
+        redefined = unit_name in self._units
         if base_unit is None:
-            self._units[unit_name] = {'base': unit_name, 'factor': 1.0, 'offset': 0.0}
-            self._base_units[unit_name] = unit_name
+            dimension = dimension or unit_name
+            if dimension not in self._dimensions:
+                self._dimensions.append(dimension)
+                self._dimension_units.append(None)
+            index = self._dimensions.index(dimension)
+            dims = (0,) * index + (1,)
+            entry = UnitDefinition(float(factor), float(offset), dims)
+        elif base_unit in self._units or self.resolve_unit(base_unit):
+            parent = self._units[base_unit]
+            entry = UnitDefinition(
+                factor * parent.factor,
+                offset * parent.factor + parent.offset,
+                parent.dimensions,
+            )
         else:
-            if base_unit not in self._units:
-                 # Try to resolve base_unit if it's a prefix
-                 if not self.resolve_unit(base_unit):
-                     raise ValueError(f"Unknown base unit: {base_unit}")
-            
-            parent_info = self._units[base_unit]
-            self._units[unit_name] = {
-                'base': parent_info['base'],
-                'factor': factor * parent_info['factor'],
-                'offset': offset * parent_info['factor'] + parent_info['offset'] 
-            }
+            # Expression like 'kg*m/s^2'; offsets of its units are ignored
+            try:
+                scale, dims = self._reduce(self.parse_units(base_unit))
+            except ValueError:
+                raise ValueError(f"Unknown base unit: {base_unit}")
+            entry = UnitDefinition(factor * scale, offset * scale, dims)
+
+        self._prefixed.discard(unit_name)
+        self._units[unit_name] = entry
+        if redefined:
+            # Redefining a unit invalidates anything compiled from the old one
+            self._plans.clear()
+            self._reduced.clear()
+        # A new unit may make previously unknown (prefixed) names valid
+        self._unresolved.clear()
+        self._reductions.clear()
+        self._id_table = None
+        self._fingerprint = None
+        unit = self._interned.get(((unit_name, 1),))
+        if unit is not None:
+            if entry.offset:
+                self._offset_units.add(unit)
+            else:
+                self._offset_units.discard(unit)
+
+        # The shortest name with factor 1 becomes the base system unit of its dimension
+        dims = entry.dimensions
+        if entry.factor == 1 and entry.offset == 0 and dims and dims[-1] == 1 and not any(dims[:-1]):
+            index = len(dims) - 1
+            current = self._dimension_units[index]
+            if current is None or len(unit_name) < len(current):
+                self._dimension_units[index] = unit_name
             
     def alias(self, alias_name, target_name):
         self.define(alias_name, target_name) # Factor 1, offset 0
 
+    def define_prefix(self, prefix, factor):
+        """Add a prefix usable in front of any unit, e.g. define_prefix('kibi', 1024)"""
+        with self._lock:
+            self._check_not_frozen()
+            self._prefixes[prefix] = factor
+            self._add_prefix_to_trie(prefix, factor)
+            self._unresolved.clear()
+            self._reductions.clear()
+            self._fingerprint = None
+
+    def load_definitions(self, source, cache=True, cache_path=None):
+        """
+        Load units and prefixes from a definitions file (see dimpy.definitions
+        for the format). Files are compiled once into a cache next to them and
+        later loads read the compiled table; edited files are recompiled.
+        """
+        from .definitions import load_definitions
+        return load_definitions(self, source, cache, cache_path)
+
+    def _check_not_frozen(self):
+        if self._frozen:
+            raise RegistryFrozenError("UnitRegistry is frozen; define units before calling freeze()")
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    def freeze(self):
+        """
+        Make the registry read-only. Every prefix + unit combination is defined
+        up front (with the usual precedence), so lookups afterwards only read
+        and the registry and its caches can be shared freely between threads.
+        Returns the registry.
+        """
+        with self._lock:
+            if self._frozen:
+                return self
+            bases = [n for n in self._units if n not in self._prefixed]
+            for prefix in list(self._prefixes):
+                for base in bases:
+                    self.resolve_unit(prefix + base)
+            self._unresolved.clear()
+            self.fingerprint
+            self._frozen = True
+        return self
+
+    def _add_prefix_to_trie(self, prefix, factor):
+        if self._prefix_trie is _DEFAULT_PREFIX_TRIE:
+            self._prefix_trie = _build_trie(self._prefixes)
+        _add_to_trie(self._prefix_trie, prefix, factor)
+
+    def _match_prefixes(self, name):
+        """Yield (prefix length, factor) for every prefix of name, longest first"""
+        matches = []
+        node = self._prefix_trie
+        for i, ch in enumerate(name):
+            node = node.get(ch)
+            if node is None:
+                break
+            if None in node:
+                matches.append((i + 1, node[None]))
+        return reversed(matches)
+
     def resolve_unit(self, name):
-        """Try to resolve dynamic prefixes if unit missing"""
+        """
+        Try to resolve dynamic prefixes if unit missing.
+
+        Precedence is deterministic: an explicitly defined name always wins
+        ('mmHg', 'Pa', 'min'), otherwise the longest prefix whose remainder is
+        a defined, unprefixed unit ('dam' is deca-meter, 'mm' is milli-meter).
+        Prefixes never stack ('kkm' does not resolve).
+        """
+        stats = self._stats
         if name in self._units:
+            if stats is not None:
+                stats.count('resolve.defined')
             return True
-        
-        # Check prefixes
-        for prefix, mp in self._prefixes.items():
-            if name.startswith(prefix):
-                base = name[len(prefix):]
-                if base in self._units:
+        # Frozen registries hold every prefixed name already
+        if self._frozen or self._unresolved.get(name) is not None:
+            if stats is not None:
+                stats.count('resolve.unknown_cached')
+            return False
+
+        with self._lock:
+            if name in self._units:
+                return True
+            for length, factor in self._match_prefixes(name):
+                base = name[length:]
+                if base in self._units and base not in self._prefixed:
                     # Found it! Define it dynamically
-                    self.define(name, base, mp)
+                    parent = self._units[base]
+                    self._prefixed.add(name)
+                    self._units[name] = UnitDefinition(
+                        factor * parent.factor, parent.offset, parent.dimensions
+                    )
+                    if stats is not None:
+                        stats.count('resolve.dynamic')
                     return True
+            self._unresolved.put(name, True)
+        if stats is not None:
+            stats.count('resolve.unknown')
         return False
 
     def parse(self, expression):
         """Parse a string expression like '10 km/hr' into a Quantity"""
-        import re
+        if self._stats is not None:
+            return self._stats.call('parse', self._parse, expression)
+        return self._parse(expression)
+
+    def _parse(self, expression):
         expression = expression.strip()
-        match = re.match(r'^([-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?)\s*(.*)$', expression)
+        match = _QUANTITY_RE.match(expression)
         if match:
-            value_str = match.group(1)
-            unit_str = match.group(3)
-            return self.Quantity(float(value_str), unit_str)
+            return self.Quantity(float(match.group(1)), self.parse_units(match.group(2)))
         
         # If no number found, maybe just units? e.g. "m/s" -> 1 m/s
-        # Or maybe "kg" -> 1 kg
-        # Let's try to assume value 1 if no number at start?
-        # But 'm' matches the regex? No, 'm' start with letter.
-        return self.Quantity(1, expression)
+        return self.Quantity(1, self.parse_units(expression))
+
+    def parse_many(self, expressions, target=None):
+        """
+        Parse many strings like '12.5 km/hr' at once.
+
+        Rows are grouped by unit string, so each distinct spelling is parsed
+        and converted once. With a target unit the result is one array
+        Quantity in that unit, in input order. Without one, the result is a
+        dict {Unit: (row indices, array Quantity)}.
+        """
+        if not HAS_NUMPY:
+            raise TypeError("Install Numpy for parse_many")
+
+        match = _QUANTITY_RE.match
+        numbers = []
+        groups = {}
+        for i, expression in enumerate(expressions):
+            expression = expression.strip()
+            m = match(expression)
+            if m:
+                numbers.append(m.group(1))
+                unit_str = m.group(2)
+            else:
+                numbers.append('1')
+                unit_str = expression
+            rows = groups.get(unit_str)
+            if rows is None:
+                groups[unit_str] = rows = []
+            rows.append(i)
+
+        if self._stats is not None:
+            self._stats.count('parse_many.rows', len(numbers))
+            self._stats.count('parse_many.groups', len(groups))
+
+        # One C-level string to float conversion for all rows
+        values = np.array(numbers, dtype=str).astype(np.float64) if numbers else np.empty(0)
+
+        # Spellings that parse to the same Unit ('km/hr', 'km / hr') share a group
+        by_unit = {}
+        for unit_str, rows in groups.items():
+            by_unit.setdefault(self.parse_units(unit_str), []).extend(rows)
+
+        if target is None:
+            result = {}
+            for unit, rows in by_unit.items():
+                rows = np.array(sorted(rows), dtype=np.intp)
+                result[unit] = (rows, self.Quantity(values[rows], unit))
+            return result
+
+        target = self.unit(target)
+        if len(by_unit) == 1:
+            (unit,) = by_unit
+            self.conversion_plan(unit, target).apply_into(values, values)
+            return self.Quantity(values, target)
+
+        out = np.empty_like(values)
+        for unit, rows in by_unit.items():
+            rows = np.array(rows, dtype=np.intp)
+            out[rows] = self.conversion_plan(unit, target).apply(values[rows])
+        return self.Quantity(out, target)
+
+    def unit_id(self, unit):
+        """
+        Dense integer ID of a Unit, stable for the lifetime of the registry.
+        Every defined name gets one up front, other units on first use.
+        """
+        unit = self.unit(unit)
+        uid = self._unit_ids.get(unit)
+        if uid is None:
+            with self._lock:
+                if not self._id_units:
+                    for name in list(self._units):
+                        if name not in self._prefixed:
+                            self._add_unit_id(self._intern(((name, 1),)))
+                uid = self._unit_ids.get(unit)
+                if uid is None:
+                    uid = self._add_unit_id(unit)
+        return uid
+
+    def _add_unit_id(self, unit):
+        uid = self._unit_ids.setdefault(unit, len(self._id_units))
+        if uid == len(self._id_units):
+            self._id_units.append(unit)
+            self._id_table = None
+        return uid
+
+    def _id_arrays(self):
+        """
+        (factor, offset, dimensions) NumPy arrays indexed by unit ID:
+        base value = value * factor[id] + offset[id], dimensions[id] is a row
+        of exponents over the registry dimensions.
+        """
+        table = self._id_table
+        if table is None:
+            with self._lock:
+                n = len(self._id_units)
+                factor = np.full(n, np.nan)
+                offset = np.zeros(n)
+                dims = np.zeros((n, len(self._dimensions)))
+                for uid, unit in enumerate(self._id_units):
+                    if not all(name in self._units for name, _ in unit.items()):
+                        continue  # Dropped by _restore(); converting it yields NaN
+                    scale, unit_dims = self._reduce(unit)
+                    factor[uid] = scale
+                    dims[uid, :len(unit_dims)] = [float(d) for d in unit_dims]
+                    if unit._single is not None:
+                        offset[uid] = self._units[unit._single].offset
+                table = self._id_table = (factor, offset, dims)
+        return table
+
+    def stack(self, quantities):
+        """
+        One MixedQuantity from Quantities of any (per row different) units,
+        e.g. a telemetry column of psi, kPa and mmHg readings. Array
+        Quantities contribute one row per element.
+        """
+        return MixedQuantity.stack(quantities, self)
 
     def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(f"'UnitRegistry' object has no attribute '{name}'")
         if self.resolve_unit(name):
              return self.Quantity(1, name)
         raise AttributeError(f"'UnitRegistry' object has no attribute '{name}'")
     
     def get_base_unit(self, unit_name):
-        return self._units.get(unit_name, {}).get('base')
+        """Base system expression of a unit, e.g. 'kg m/s^2' for 'N'"""
+        entry = self._units.get(unit_name)
+        if entry is None:
+            return None
+        return str(self._base_unit(entry.dimensions))
+
+    def get_dimensions(self, unit_name):
+        """Fixed-length dimension vector of a unit over the registry dimensions"""
+        dims = self._units[unit_name].dimensions
+        return dims + (0,) * (len(self._dimensions) - len(dims))
 
     def get_factor(self, unit_name):
-        return self._units.get(unit_name, {}).get('factor', 1.0)
+        entry = self._units.get(unit_name)
+        return entry.factor if entry is not None else 1.0
     
     def get_offset(self, unit_name):
-        return self._units.get(unit_name, {}).get('offset', 0.0)
-        
+        entry = self._units.get(unit_name)
+        return entry.offset if entry is not None else 0.0
+
+    def dimensionality(self, unit):
+        """Dimensions of a Unit (or unit string) as a dict, e.g. {'length': 1, 'time': -1}"""
+        dims = self._reduce(self.unit(unit))[1]
+        return {self._dimensions[i]: exp for i, exp in enumerate(dims) if exp != 0}
+
+    def delta_unit(self, unit):
+        """
+        Unit for differences of an absolute temperature unit: 'delta_' + its name
+        (degC -> delta_degC). Returns None when no such unit is defined.
+        """
+        unit = self.unit(unit)
+        if unit not in self._offset_units:
+            return unit
+        name = 'delta_' + unit._single
+        if name not in self._units and not self.resolve_unit(name):
+            return None
+        return self._intern(((name, 1),))
+
+    def _difference_unit(self, unit):
+        """
+        (unit, scale) to express differences of unit in: the unit itself, or
+        for absolute temperatures their delta unit (scale 1) or, without one,
+        the base unit (scale = factor to base).
+        """
+        if unit not in self._offset_units:
+            return unit, 1.0
+        delta = self.delta_unit(unit)
+        if delta is not None:
+            return delta, 1.0
+        return self.to_base_unit(unit), self._reduce(unit)[0]
+
+    def _add_sub_rule(self, left, right, subtract):
+        """
+        How to add/subtract quantities in units left and right, shared by
+        Quantity, LazyQuantity and the NumPy add/subtract ufuncs. Returns
+        ((scale, offset) for the left, (scale, offset) for the right operand,
+        result unit): both operands are mapped into the result unit, then
+        combined. Absolute temperatures (units with an offset, like degC):
+          absolute - absolute -> difference in the delta unit of left (or
+                                 the base unit when there is none)
+          absolute +/- difference -> absolute, in left's unit
+          difference + absolute -> absolute, in right's unit
+        Plain kelvin/rankine and the delta_* units count as differences.
+        Adding two absolutes or subtracting an absolute from a difference
+        raises DimensionalityError.
+        """
+        left_absolute = left in self._offset_units
+        right_absolute = right in self._offset_units
+        if not (left_absolute or right_absolute):
+            plan = self.conversion_plan(right, left)
+            plan.check()
+            return (1.0, 0.0), (plan.scale, plan.offset), left
+
+        if left_absolute and right_absolute:
+            if not subtract:
+                raise DimensionalityError(
+                    f"Cannot add two absolute temperatures ({left} + {right}); "
+                    f"add a difference such as {self.delta_unit(left) or 'K'} instead"
+                )
+            delta = self.delta_unit(left)
+            if delta is None:
+                # No delta_<name> defined: take the difference in the base unit
+                base = self.to_base_unit(left)
+                to_base = self.conversion_plan(left, base)
+                plan = self.conversion_plan(right, base)
+                return (to_base.scale, to_base.offset), (plan.scale, plan.offset), base
+            plan = self.conversion_plan(right, left)
+            plan.check()
+            return (1.0, 0.0), (plan.scale, plan.offset), delta
+
+        if left_absolute:
+            return (1.0, 0.0), (self._scale_between(right, left), 0.0), left
+        if subtract:
+            raise DimensionalityError(
+                f"Cannot subtract an absolute temperature ({right}) from a difference ({left})"
+            )
+        return (self._scale_between(left, right), 0.0), (1.0, 0.0), right
+
+    def _scale_between(self, source, target):
+        """Pure scale factor from source to target, ignoring offsets (for differences)"""
+        src_scale, src_dims = self._reduce(source)
+        dst_scale, dst_dims = self._reduce(target)
+        if src_dims != dst_dims:
+            raise DimensionalityError(
+                f"Incompatible dimensions: {self._base_unit(src_dims)} vs {self._base_unit(dst_dims)}")
+        return src_scale / dst_scale
+
+    def to_base_unit(self, unit):
+        """Base system Unit with the same dimensions: 'km/hr' -> 'm/s', 'degC' -> 'K'"""
+        unit = self.unit(unit)
+        key = ('base', unit)
+        result = self._reductions.get(key)
+        if result is None:
+            result = self._reductions.setdefault(key, self._base_unit(self._reduce(unit)[1]))
+        return result
+
+    def simplify_unit(self, unit):
+        """
+        Fold names of the same dimension into one ('m^2/km' -> 'm', 'hr/s^3'
+        -> '1/s^2') and use a registered derived unit or the base units when
+        that needs fewer names ('kg m/s^2' -> 'N'). Cached per Unit.
+        """
+        unit = self.unit(unit)
+        key = ('simplify', unit)
+        result = self._reductions.get(key)
+        if result is None:
+            result = self._reductions.setdefault(key, self._simplify(unit))
+        return result
+
+    def _simplify(self, unit):
+        items = unit.items()
+        if len(items) < 2:
+            return unit
+
+        # Group names by dimensions; each group collapses into the base system
+        # unit if it is part of the group, else into its highest power
+        groups = {}
+        for name, exp in items:
+            groups.setdefault(self._units[name].dimensions, []).append((name, exp))
+        base_names = set(self._dimension_units)
+        terms = {}
+        for group in groups.values():
+            target = max(group, key=lambda item: (item[0] in base_names, abs(item[1])))[0]
+            total = sum(exp for _, exp in group)
+            if total != 0:
+                terms[target] = canonical_exponent(total)
+        candidates = [self._intern(tuple(sorted(terms.items())))]
+
+        dims = self._reduce(unit)[1]
+        derived = self._derived_units().get(dims)
+        if derived is not None:
+            candidates.append(self._intern(((derived, 1),)))
+        candidates.append(self._base_unit(dims))
+        # Fewest names wins; ties keep the folded form, which stays closest to the input
+        return min(candidates, key=lambda u: len(u.items()))
+
+    def _derived_units(self):
+        """dimensions -> shortest unprefixed name of a factor 1 unit spanning several dimensions ('N', 'W')"""
+        derived = self._reductions.get('derived')
+        if derived is None:
+            derived = {}
+            for name, entry in list(self._units.items()):
+                if (entry.factor != 1 or entry.offset or name in self._prefixed
+                        or sum(1 for d in entry.dimensions if d) < 2):
+                    continue
+                dims = _trim(canonical_exponent(d) for d in entry.dimensions)
+                current = derived.get(dims)
+                if current is None or (len(name), name) < (len(current), current):
+                    derived[dims] = name
+            derived = self._reductions.setdefault('derived', derived)
+        return derived
+
+    def _compact_unit(self, unit, magnitude):
+        """
+        unit with the engineering prefix (a power of 1000) that puts magnitude,
+        given in unit, into [1, 1000). The prefix goes on the first name with
+        a positive exponent; offset units and dimensionless stay as they are.
+        """
+        info = self._reductions.get(('compact', unit))
+        if info is None:
+            info = self._reductions.setdefault(('compact', unit), self._compact_info(unit))
+        if not info or not magnitude or not math.isfinite(magnitude):
+            return unit
+
+        index, root, exp, current, prefixes = info
+        level = math.log10(magnitude) + exp * math.log10(current)  # log10 of the value in root units
+        step = level / (3 * exp)
+        power = math.floor(step) if exp > 0 else math.ceil(step)
+        power = min(max(power, min(prefixes)), max(prefixes))
+        key = ('compact', unit, power)
+        result = self._reductions.get(key)
+        if result is None:
+            while power not in prefixes:
+                # Gaps in custom prefix tables: step towards no prefix
+                power -= 1 if power > 0 else -1
+            name = prefixes[power] + root
+            if not self.resolve_unit(name):
+                return unit
+            terms = dict(unit.items())
+            del terms[unit.items()[index][0]]
+            terms[name] = canonical_exponent(terms.get(name, 0) + exp)
+            result = self._reductions.setdefault(
+                key, self._intern(tuple(sorted((n, e) for n, e in terms.items() if e != 0))))
+        return result
+
+    def _compact_info(self, unit):
+        """(item index, root name, exponent, current prefix factor, {power of 1000: prefix}) or False"""
+        items = unit.items()
+        if not items or unit in self._offset_units:
+            return False
+        index = next((i for i, (_, exp) in enumerate(items) if exp > 0), 0)
+        name, exp = items[index]
+        root, prefix, current = name, '', 1.0
+        entry = self._units[name]
+        # Split off an existing prefix, also of explicit names like 'kg'
+        for length, factor in self._match_prefixes(name):
+            base = self._units.get(name[length:])
+            if (base is not None and name[length:] not in self._prefixed
+                    and base.dimensions == entry.dimensions
+                    and math.isclose(entry.factor, factor * base.factor)):
+                root, prefix, current = name[length:], name[:length], factor
+                break
+        if self._units[root].offset:
+            return False
+
+        # Keep the style of the name: 'km' -> 'Mm', 'kilometer' -> 'megameter'
+        short = len(prefix) <= 2 if prefix else len(root) <= 3
+        prefixes = {0: ''}
+        for p, factor in self._prefixes.items():
+            if (len(p) <= 2) != short or factor <= 0:
+                continue
+            power = round(math.log10(factor) / 3)
+            if power and power not in prefixes and math.isclose(factor, 1000.0 ** power):
+                prefixes[power] = p
+        return index, root, float(exp), current, prefixes
+
+    def _base_unit(self, dims):
+        terms = {}
+        for i, exp in enumerate(dims):
+            if exp != 0:
+                name = self._dimension_units[i] or f"[{self._dimensions[i]}]"
+                terms[name] = exp
+        return self._intern(tuple(sorted(terms.items())))
+
+    def _reduce(self, unit):
+        """Return (scale, dimensions) of a Unit relative to the base system"""
+        reduced = self._reduced.get(unit)
+        if reduced is None:
+            scale = 1.0
+            dims = []
+            for u, exp in unit.items():
+                entry = self._units[u]
+                scale *= entry.factor ** exp
+                if len(entry.dimensions) > len(dims):
+                    dims.extend([0] * (len(entry.dimensions) - len(dims)))
+                for i, d in enumerate(entry.dimensions):
+                    dims[i] += d * exp
+            dims = _trim(canonical_exponent(d) for d in dims)
+            reduced = self._reduced.setdefault(unit, (scale, dims))
+        return reduced
+
+    def _intern(self, items):
+        unit = self._interned.get(items)
+        if unit is None:
+            unit = self._interned.setdefault(items, Unit(items, self))
+            if unit._single is not None and self._units[unit._single].offset:
+                self._offset_units.add(unit)
+        return unit
+
+    def unit(self, spec):
+        """Return the interned Unit for a string, a dict {name: exponent} or a Unit"""
+        if isinstance(spec, Unit):
+            if spec.registry is self:
+                return spec
+            spec = spec.as_dict()
+        elif isinstance(spec, str):
+            return self.parse_units(spec)
+        elif not isinstance(spec, dict):
+            raise TypeError("Unit must be a string, dictionary or Unit")
+
+        terms = {}
+        for u, exp in spec.items():
+            exp = canonical_exponent(exp)
+            if exp == 0:
+                continue
+            if u not in self._units and not self.resolve_unit(u):
+                raise ValueError(f"Unknown unit: {u}")
+            terms[u] = terms.get(u, 0) + exp
+        return self._intern(tuple(sorted((u, e) for u, e in terms.items() if e != 0)))
+
+    def parse_units(self, unit_str):
+        """Parse a unit expression like 'W/(m^2 K)' into a Unit, memoized by the raw string"""
+        unit = self._parse_cache.get(unit_str)
+        stats = self._stats
+        if unit is None:
+            if stats is None:
+                unit = self._parse_units_uncached(unit_str)
+            else:
+                unit = stats.call('parse_units.parse', self._parse_units_uncached, unit_str)
+            self._parse_cache.put(unit_str, unit)
+        elif stats is not None:
+            stats.count('parse_units.cache_hit')
+        return unit
+
+    def _parse_units_uncached(self, unit_str):
+        return self.unit(parse_unit_expression(unit_str))
+
+    def _unit_product(self, op, a, b):
+        key = (op, a, b)
+        result = self._products.get(key)
+        if result is not None:
+            return result
+
+        terms = dict(a.items())
+        if op == '**':
+            terms = {u: canonical_exponent(e * b) for u, e in terms.items()}
+        else:
+            sign = 1 if op == '*' else -1
+            for u, exp in b.items():
+                terms[u] = terms.get(u, 0) + sign * exp
+        result = self._intern(tuple(sorted((u, e) for u, e in terms.items() if e != 0)))
+        self._products[key] = result
+        return result
+
+    def conversion_plan(self, source, target):
+        """Return the cached ConversionPlan from one Unit to another"""
+        key = (source, target)
+        plan = self._plans.get(key)
+        if plan is None:
+            return self._add_plan(key)
+        if self._stats is not None:
+            self._stats.count('plan.cache_hit')
+        return plan
+
+    def _add_plan(self, key):
+        """Compile and cache the plan for a (source, target) key that missed"""
+        if self._stats is None:
+            plan = self._compile_plan(*key)
+        else:
+            plan = self._stats.call('plan.compile', self._compile_plan, *key)
+        self._plans.put(key, plan)
+        return plan
+
+    def _compile_plan(self, source, target):
+        # Units of another registry (e.g. from dimpy.constants) are looked up by name here
+        source, target = self.unit(source), self.unit(target)
+        src_scale, src_dims = self._reduce(source)
+        dst_scale, dst_dims = self._reduce(target)
+        if src_dims != dst_dims:
+            return ConversionPlan(
+                error=f"Incompatible dimensions: {self._base_unit(src_dims)} vs {self._base_unit(dst_dims)}"
+            )
+
+        # Single units keep their offsets (affine conversion, e.g. degC -> degF)
+        if source.is_single() and target.is_single():
+            o_src = self._units[source.items()[0][0]].offset
+            o_dst = self._units[target.items()[0][0]].offset
+            if o_src or o_dst:
+                return ConversionPlan(src_scale / dst_scale, (o_src - o_dst) / dst_scale)
+
+        # General dimensional analysis (ignoring offsets)
+        return ConversionPlan(src_scale / dst_scale)
+
+    def conversion_cache_info(self):
+        """Hits, misses and size of the conversion plan cache"""
+        return self._plans.info()
+
+    def set_conversion_cache_size(self, maxsize):
+        self._plans.resize(maxsize)
+
+    def set_parallel(self, workers=None, threshold=None, executor=None):
+        """
+        Run conversions and element-wise arithmetic of large arrays on worker
+        threads. workers=0 uses every core, workers=1 turns it off again and
+        workers=None keeps the current count, so set_parallel(threshold=...)
+        alone does not start any threads. Arrays with fewer than threshold
+        elements always stay serial. An executor (e.g. a ThreadPoolExecutor)
+        replaces the shared thread pool until reset_parallel().
+        """
+        if workers is not None:
+            self.workers = workers or os.cpu_count() or 1
+        if threshold is not None:
+            self.parallel_threshold = threshold
+        if executor is not None:
+            self.executor = executor
+
+    def reset_parallel(self):
+        """Back to serial kernels, the default threshold and the shared thread pool"""
+        self.workers = 1
+        self.parallel_threshold = kernels.PARALLEL_THRESHOLD
+        self.executor = None
+
+    def _workers_for(self, size, workers=None):
+        """Worker count for an array of size elements"""
+        workers = self.workers if workers is None else workers
+        if workers > 1 and size >= self.parallel_threshold:
+            return workers
+        return 1
+
+    def enable_stats(self, timing=False):
+        """
+        Start counting parses, unit resolutions, conversion plans and paths,
+        cache hits/misses and allocated array bytes. timing=True also sums the
+        time spent in parses, plan compilation and conversions.
+        """
+        self._stats = Stats(timing)
+
+    def disable_stats(self):
+        self._stats = None
+
+    def stats(self):
+        """Counters collected since enable_stats(): {'counts': {...}, 'times': {...}}"""
+        if self._stats is None:
+            return {'counts': {}, 'times': {}}
+        return self._stats.snapshot()
+
+    @contextlib.contextmanager
+    def profile(self, timing=True):
+        """
+        Collect stats for a block only:
+
+            with reg.profile() as stats:
+                ...
+            print(stats.report())
+
+        Counts also add up into stats enabled outside the block.
+        """
+        outer = self._stats
+        scoped = self._stats = Stats(timing)
+        try:
+            yield scoped
+        finally:
+            self._stats = outer
+            if outer is not None:
+                outer.merge(scoped)
+
+    def lazy(self, *quantities):
+        """Deferred versions of quantities for fused, chunked evaluation"""
+        lazies = tuple((q if isinstance(q, Quantity) else self.Quantity(q, self.dimensionless)).defer()
+                       for q in quantities)
+        return lazies[0] if len(lazies) == 1 else lazies
+
+    @property
+    def fingerprint(self):
+        """
+        Stable id of the registry definitions. Registries with the same units,
+        prefixes and dimensions share it, also across processes, which is how
+        unpickled Quantities find their registry.
+        """
+        if self._fingerprint is None:
+            with self._lock:
+                self._fingerprint = self._compute_fingerprint()
+        return self._fingerprint
+
+    def _compute_fingerprint(self):
+        import hashlib  # only needed when pickling, keep it off the import path
+        digest = hashlib.sha1()
+        digest.update(repr(self._dimensions).encode())
+        digest.update(repr(sorted(self._prefixes.items())).encode())
+        for name in sorted(n for n in self._units if n not in self._prefixed):
+            digest.update(repr((name, tuple(self._units[name]))).encode())
+        return digest.hexdigest()[:16]
+
+    def __reduce__(self):
+        # The definitions travel only as a fallback for processes that do not
+        # already have a registry with the same fingerprint.
+        return _unpickle_registry, (self.fingerprint, self._state())
+
+    def _state(self):
+        """Definitions as plain builtins (pickle, the definitions cache)"""
+        with self._lock:
+            return {
+                'units': {n: tuple(d) for n, d in self._units.items() if n not in self._prefixed},
+                'dimensions': list(self._dimensions),
+                'dimension_units': list(self._dimension_units),
+                'prefixes': dict(self._prefixes),
+            }
+
+    def _restore(self, state, fingerprint=None):
+        """Replace all definitions with a _state() snapshot"""
+        with self._lock:
+            self._check_not_frozen()
+            self._units = {n: UnitDefinition(*d) for n, d in state['units'].items()}
+            self._dimensions = list(state['dimensions'])
+            self._dimension_units = list(state['dimension_units'])
+            self._prefixes = dict(state['prefixes'])
+            self._prefix_trie = _build_trie(self._prefixes)
+            prefixed, self._prefixed = self._prefixed, set()
+            # Everything derived from the old definitions goes
+            self._parse_cache.clear()
+            self._products.clear()
+            self._plans.clear()
+            self._reduced.clear()
+            self._unresolved.clear()
+            self._reductions.clear()
+            self._id_table = None
+            # Prefixed names already in use (interned Units, ids) are not part
+            # of the snapshot; define them again from the restored table
+            for name in prefixed:
+                if name not in self._units:
+                    self.resolve_unit(name)
+            self._fingerprint = fingerprint
+            self._offset_units = {u for u in self._interned.values()
+                                  if u._single in self._units and self._units[u._single].offset}
+
     def Quantity(self, value, unit):
         return Quantity(value, unit, self)
@@ -0,0 +1,73 @@
+"""
+Opt-in counters and timers for the registry hot paths.
+
+A registry keeps registry._stats = None unless stats are enabled, and every
+instrumented spot only checks that attribute, so the disabled cost is one
+attribute load. Counts from several threads may undercount slightly; they
+are meant for profiling, not accounting.
+
+Keys (those marked * are also timed with timing=True):
+
+    resolve.defined, resolve.dynamic      resolve_unit() hits (a prefixed name
+    resolve.unknown, resolve.unknown_cached   defined on the fly) and misses
+    parse*                                parse() of a quantity string
+    parse_units.parse*, parse_units.cache_hit   unit strings, uncached and cached
+    parse_many.rows, parse_many.groups    rows and distinct units in parse_many()
+    plan.cache_hit, plan.compile*         conversion plan lookups
+    to*, to.<kind>, ito.<kind>            conversions; kind is the plan's
+                                          'identity', 'scale' or 'affine'
+    lazy.evaluate                         fused lazy expression evaluations
+    array.allocs, array.bytes             result arrays allocated
+"""
+import time
+from collections import Counter
+
+
+class Stats:
+    """Counters (and with timing=True, cumulative seconds) per key"""
+
+    def __init__(self, timing=False):
+        self.timing = timing
+        self.counts = Counter()
+        self.times = Counter()
+
+    def count(self, key, n=1):
+        self.counts[key] += n
+
+    def count_array(self, array):
+        """Record a newly allocated result array"""
+        self.counts['array.allocs'] += 1
+        self.counts['array.bytes'] += array.nbytes
+
+    def call(self, key, func, *args):
+        """Count (and time) func(*args)"""
+        self.counts[key] += 1
+        if not self.timing:
+            return func(*args)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.times[key] += time.perf_counter() - start
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.times.update(other.times)
+
+    def snapshot(self):
+        """Plain dict copy: {'counts': {...}, 'times': {...}}"""
+        return {'counts': dict(self.counts), 'times': dict(self.times)}
+
+    def report(self):
+        """Counts and times as an aligned text table"""
+        lines = []
+        for key in sorted(self.counts):
+            line = f"{key:<28} {self.counts[key]:>12,}"
+            if key in self.times:
+                total = self.times[key]
+                line += f"   {total * 1e3:10.3f} ms   {total / self.counts[key] * 1e6:9.2f} us/call"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"<Stats({dict(self.counts)})>"
@@ -0,0 +1,313 @@
+"""
+Columnar tables of Quantities.
+
+A QuantityTable holds equal-length NumPy columns with one Unit per column
+and a single registry reference, instead of one Quantity object per column.
+Row selection (slices, boolean masks, index arrays) never touches the
+column data: the table only records which rows are selected, composing
+successive selections into one index, and a column is gathered when it is
+read. Derived columns are built from expressions over column names, which
+are dimension checked and evaluated in one fused pass through dimpy.lazy.
+
+    t = QuantityTable({'h': depth, 'rho': density})
+    deep = t[t['h'] > 10 * reg.m]
+    deep = deep.with_column('p', 'rho * 9.81 * m/s^2 * h', unit='kPa')
+"""
+import ast
+
+from .errors import DimensionalityError
+from .lazy import LazyQuantity
+from .numpy_compat import np, HAS_NUMPY, is_ndarray
+from .quantity import Quantity
+
+_BINARY_OPS = {ast.Add: '__add__', ast.Sub: '__sub__', ast.Mult: '__mul__',
+               ast.Div: '__truediv__', ast.Pow: '__pow__'}
+
+
+class QuantityTable:
+    """
+    Equal-length columns with one unit each. Build from {name: Quantity} or
+    {name: (array, unit)} with registry=.
+    """
+
+    def __init__(self, columns, registry=None):
+        if not HAS_NUMPY:
+            raise TypeError("Install Numpy for QuantityTable")
+        self._values = {}
+        self._units = {}
+        self._rows = None  # None (all rows), a range or an index array into the columns
+        length = None
+        for name, column in dict(columns).items():
+            if isinstance(column, Quantity):
+                if registry is None:
+                    registry = column.registry
+                elif column.registry is not registry:
+                    raise ValueError(f"Column '{name}' belongs to a different registry")
+                values, unit = column.value, column.unit
+            elif isinstance(column, tuple) and len(column) == 2:
+                if registry is None:
+                    raise TypeError("Pass registry= for (array, unit) columns")
+                values, unit = column
+                unit = registry.unit(unit)
+            else:
+                raise TypeError(f"Column '{name}' must be a Quantity or an (array, unit) pair")
+            values = np.asarray(values)
+            if values.ndim != 1:
+                raise ValueError(f"Column '{name}' must be 1-D, got shape {values.shape}")
+            if length is None:
+                length = values.size
+            elif values.size != length:
+                raise ValueError(f"Column '{name}' has {values.size} rows, expected {length}")
+            self._values[name] = values
+            self._units[name] = unit
+        if registry is None:
+            raise ValueError("A QuantityTable needs at least one Quantity column or registry=")
+        self.registry = registry
+        self._length = length or 0
+
+    @classmethod
+    def _from_parts(cls, values, units, registry, rows, length):
+        table = cls.__new__(cls)
+        table._values = values
+        table._units = units
+        table.registry = registry
+        table._rows = rows
+        table._length = length
+        return table
+
+    @property
+    def names(self):
+        return list(self._values)
+
+    @property
+    def units(self):
+        return dict(self._units)
+
+    @property
+    def nbytes(self):
+        """Bytes of column data (shared with other tables) plus the row selection"""
+        total = sum(values.nbytes for values in self._values.values())
+        if is_ndarray(self._rows):
+            total += self._rows.nbytes
+        return total
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, name):
+        return name in self._values
+
+    def _column_values(self, name):
+        values = self._values[name]
+        rows = self._rows
+        if rows is None:
+            return values
+        if isinstance(rows, range):
+            # A range maps to a basic slice, i.e. a view. Empty ranges may
+            # have negative bounds (range(-1, -1, -1)); a non-empty one only
+            # has a negative stop, past index 0 when stepping backwards
+            if not rows:
+                return values[:0]
+            return values[rows.start:rows.stop if rows.stop >= 0 else None:rows.step]
+        return values.take(rows)
+
+    def column(self, name):
+        """A column as a Quantity: a view for slices, gathered for masks and indices"""
+        if name not in self._values:
+            raise KeyError(name)
+        return Quantity(self._column_values(name), self._units[name], self.registry)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.column(key)
+        if isinstance(key, list) and all(isinstance(k, str) for k in key):
+            missing = [k for k in key if k not in self._values]
+            if missing:
+                raise KeyError(missing[0])
+            return self._from_parts({k: self._values[k] for k in key}, {k: self._units[k] for k in key},
+                                    self.registry, self._rows, self._length)
+        return self._select(key)
+
+    def _select(self, key):
+        """Compose a row selection with the current one, without touching the columns"""
+        if isinstance(key, slice):
+            if is_ndarray(self._rows):
+                rows = self._rows[key]
+                return self._from_parts(self._values, self._units, self.registry, rows, rows.size)
+            rows = (range(self._length) if self._rows is None else self._rows)[key]
+            return self._from_parts(self._values, self._units, self.registry, rows, len(rows))
+
+        if isinstance(key, Quantity):
+            if not key.unit.dimensionless:
+                raise TypeError("Select rows with a boolean or integer array, not a quantity")
+            key = key.value
+        key = np.asarray(key)
+        if key.dtype == bool:
+            if key.shape != (self._length,):
+                raise IndexError(f"Boolean mask has shape {key.shape}, the table has {self._length} rows")
+            key = np.flatnonzero(key)
+        elif not np.issubdtype(key.dtype, np.integer) or key.ndim != 1:
+            raise IndexError("Rows are selected with a slice, a boolean mask or a 1-D integer array")
+
+        rows = self._rows
+        if rows is None:
+            rows = key
+        elif isinstance(rows, range):
+            rows = np.arange(rows.start, rows.stop, rows.step, dtype=np.intp)[key]
+        else:
+            rows = rows[key]
+        return self._from_parts(self._values, self._units, self.registry, rows, rows.size)
+
+    def materialize(self):
+        """A table whose columns hold exactly the selected rows (copies for masks and indices)"""
+        if self._rows is None:
+            return self
+        values = {name: self._column_values(name) for name in self._values}
+        return self._from_parts(values, dict(self._units), self.registry, None, self._length)
+
+    # --- Derived columns ---------------------------------------------------
+
+    def evaluate(self, expression, unit=None):
+        """
+        Compute an expression over the columns, e.g. 'rho * g * h + p0'.
+
+        Names are columns, or else registry units (so '2 * m' works); only
+        numbers, + - * / ** (or ^) and parentheses are allowed. Units are checked
+        while the expression is built, before any data is touched, and the
+        result comes from one fused pass (see dimpy.lazy). A callable gets
+        the lazy columns as keyword arguments instead.
+        """
+        lazy = {}
+
+        def name_value(name):
+            if name in self._values:
+                if name not in lazy:
+                    lazy[name] = self.column(name).defer()
+                return lazy[name]
+            if self.registry.resolve_unit(name):
+                return Quantity(1.0, name, self.registry)
+            raise NameError(f"Unknown column or unit '{name}' in table expression")
+
+        if callable(expression):
+            result = expression(**{name: name_value(name) for name in self._values})
+        else:
+            # '^' means power, as in unit strings
+            tree = ast.parse(expression.replace('^', '**'), mode='eval')
+            result = _evaluate(tree.body, name_value)
+        if not isinstance(result, LazyQuantity):
+            # Only constants and units, e.g. '2 + 3' or '9.81 * m/s^2'
+            raise ValueError("Table expression does not use any column")
+        if unit is not None:
+            result = result.to(unit)
+        return result.evaluate()
+
+    def with_column(self, name, expression, unit=None):
+        """
+        A new table with an extra column computed by evaluate(). The other
+        columns are shared; a table with a row selection is materialized first.
+        """
+        table = self.materialize()
+        column = table.evaluate(expression, unit)
+        values = dict(table._values)
+        units = dict(table._units)
+        values[name] = np.asarray(column.value)
+        units[name] = column.unit
+        return self._from_parts(values, units, self.registry, None, table._length)
+
+    # --- Unit conversion ---------------------------------------------------
+
+    def to(self, units):
+        """A new table with the columns in units ({name: unit}) converted; others are shared"""
+        unknown = [name for name in units if name not in self._values]
+        if unknown:
+            raise KeyError(unknown[0])
+        table = self.materialize()
+        return table._convert({name: self.registry.unit(unit) for name, unit in units.items()})
+
+    def to_base(self):
+        """Every column in the registry's base units"""
+        table = self.materialize()
+        return table._convert({name: self.registry.to_base_unit(unit) for name, unit in self._units.items()})
+
+    def to_system(self, units):
+        """
+        Every column in a unit system given per dimension, e.g.
+        {'length': 'ft', 'mass': 'lb', 'temperature': 'degF'}. Dimensions
+        not in the mapping use the base units.
+        """
+        registry = self.registry
+        system = {}
+        for dimension, unit in units.items():
+            if dimension not in registry._dimensions:
+                raise ValueError(f"Unknown dimension '{dimension}'")
+            unit = registry.unit(unit)
+            index = registry._dimensions.index(dimension)
+            expected = (0,) * index + (1,)
+            if not unit.is_single() or registry._reduce(unit)[1] != expected:
+                raise DimensionalityError(f"'{unit}' is not a unit of [{dimension}]")
+            system[index] = unit.items()[0][0]
+
+        targets = {}
+        for name, unit in self._units.items():
+            if unit.is_single() and unit in registry._offset_units:
+                dims = registry._reduce(unit)[1]
+                index = len(dims) - 1
+                if index in system and dims == (0,) * index + (1,):
+                    # Absolute temperature to absolute temperature (affine)
+                    targets[name] = registry.unit(system[index])
+                    continue
+            terms = {}
+            for i, exp in enumerate(registry._reduce(unit)[1]):
+                if exp:
+                    target = system.get(i) or registry._dimension_units[i] or f"[{registry._dimensions[i]}]"
+                    terms[target] = exp
+            targets[name] = registry._intern(tuple(sorted(terms.items())))
+        table = self.materialize()
+        return table._convert(targets)
+
+    def _convert(self, targets):
+        values = dict(self._values)
+        units = dict(self._units)
+        registry = self.registry
+        for name, target in targets.items():
+            if target is units[name]:
+                continue
+            plan = registry.conversion_plan(units[name], target)
+            values[name] = plan.apply(values[name], registry._workers_for(values[name].size),
+                                      registry.executor)
+            units[name] = target
+        return self._from_parts(values, units, registry, None, self._length)
+
+    def __repr__(self):
+        columns = ", ".join(f"{name} [{unit}]" for name, unit in self._units.items())
+        return f"<QuantityTable({self._length} rows: {columns})>"
+
+
+def _evaluate(node, name_value):
+    """Evaluate a whitelisted expression AST with Python operators"""
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        left = _evaluate(node.left, name_value)
+        right = _evaluate(node.right, name_value)
+        if isinstance(node.op, ast.Pow):
+            if not isinstance(right, (int, float)):
+                raise TypeError("Exponents in table expressions must be numbers")
+            return left ** right
+        return _apply(left, right, _BINARY_OPS[type(node.op)])
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _evaluate(node.operand, name_value)
+        return -operand if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.Name):
+        return name_value(node.id)
+    # Number literals parse as ast.Constant on Python 3.8+ (requires-python >= 3.8)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    raise ValueError(f"Unsupported syntax in table expression: {ast.dump(node)}")
+
+
+def _apply(left, right, method):
+    result = getattr(left, method)(right)
+    if result is NotImplemented:
+        result = getattr(right, '__r' + method[2:])(left)
+    if result is NotImplemented:
+        raise TypeError(f"Unsupported operands in table expression: {left!r}, {right!r}")
+    return result
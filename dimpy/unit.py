@@ -0,0 +1,129 @@
+from fractions import Fraction
+import numbers
+
+
+def canonical_exponent(exp):
+    """Normalize an exponent so equal values share one key (2.0 -> 2, 0.5 -> 1/2)"""
+    if isinstance(exp, bool):
+        raise TypeError("Exponent must be a number")
+    if isinstance(exp, numbers.Integral):
+        return int(exp)
+    if isinstance(exp, str):
+        exp = Fraction(exp.strip())
+    elif isinstance(exp, numbers.Rational):
+        exp = Fraction(exp.numerator, exp.denominator)
+    elif isinstance(exp, numbers.Real):
+        exp = float(exp)
+        if exp.is_integer():
+            return int(exp)
+        # Floats like 1/3 are not exact, snap them to the nearest small fraction
+        exp = Fraction(exp).limit_denominator(1000)
+    else:
+        raise TypeError("Exponent must be a number")
+
+    if exp.denominator == 1:
+        return exp.numerator
+    return exp
+
+
+def format_exponent(exp):
+    if isinstance(exp, Fraction):
+        return f"({exp})"
+    return str(exp)
+
+
+def _unpickle_unit(text, fingerprint):
+    from .registry import get_registry
+    registry = get_registry(fingerprint)
+    if registry is None:
+        raise ValueError(f"No UnitRegistry with fingerprint {fingerprint} in this process")
+    return registry.parse_units(text)
+
+
+class Unit:
+    """
+    Immutable unit combination like 'kg m/s^2'.
+
+    Units are interned by their UnitRegistry: every distinct combination exists
+    once, so equality and hashing are identity based. Build them through
+    registry.unit(...) rather than calling the constructor directly.
+    """
+    __slots__ = ('_items', '_single', '_str', 'registry', '__weakref__')
+
+    def __init__(self, items, registry):
+        # items: tuple of (name, exponent) pairs, sorted by name, no zero exponents
+        self._items = items
+        self.registry = registry
+        if len(items) == 1 and items[0][1] == 1:
+            self._single = items[0][0]
+        else:
+            self._single = None
+        self._str = None
+
+    def items(self):
+        """Return the (name, exponent) pairs of this unit"""
+        return self._items
+
+    def as_dict(self):
+        return dict(self._items)
+
+    @property
+    def dimensionless(self):
+        return not self._items
+
+    def is_single(self):
+        return self._single is not None
+
+    def __mul__(self, other):
+        if isinstance(other, Unit):
+            if other.registry is not self.registry:
+                other = self.registry.unit(other)
+            return self.registry._unit_product('*', self, other)
+        return NotImplemented
+
+    def __truediv__(self, other):
+        if isinstance(other, Unit):
+            if other.registry is not self.registry:
+                other = self.registry.unit(other)
+            return self.registry._unit_product('/', self, other)
+        return NotImplemented
+
+    def __pow__(self, power):
+        return self.registry._unit_product('**', self, canonical_exponent(power))
+
+    def __reduce__(self):
+        return _unpickle_unit, (str(self), self.registry.fingerprint)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return True
+
+    def __str__(self):
+        if self._str is None:
+            numerator = []
+            denominator = []
+            for u, exp in self._items:
+                if exp > 0:
+                    numerator.append(u if exp == 1 else f"{u}^{format_exponent(exp)}")
+                else:
+                    denominator.append(u if exp == -1 else f"{u}^{format_exponent(-exp)}")
+
+            num_str = " ".join(numerator) if numerator else ("1" if denominator else "")
+            if not denominator:
+                self._str = num_str
+            else:
+                den_str = " ".join(denominator)
+                if len(denominator) > 1:
+                    den_str = f"({den_str})"
+                self._str = f"{num_str}/{den_str}"
+        return self._str
+
+    def __repr__(self):
+        return f"<Unit('{self}')>"
+
+    def __setattr__(self, name, value):
+        if name != '_str' and hasattr(self, name):
+            raise AttributeError("Unit objects are immutable")
+        object.__setattr__(self, name, value)
@@ -21,26 +21,9 @@ def solve_pump_problem():
     Q = V / t
     print(f"Flow Rate Q = {Q}")
     
-    # 2. Convert units to SI for calculation consistency
-    # 1 L = 0.001 m^3
-    # 1 mmHg = 133.322 Pa
-    # 1 kPa = 1000 Pa
-    
-    # Manually bridging dimensions for this simple library that treat 'L', 'Pa' as base:
-    # We will compute the Power in base units of 'kPa L / s' first?
-    # Or convert to standard SI bases manually?
-    
-    # Let's perform conversion by value manipulation to show "under the hood" or just define conversions.
-    # Since we can't easily bridge 'L' to 'm^3' automatically in .to() without compound definition support,
-    # We will use factors.
-    
-    # Conversion Factors (Bridging the gaps)
-    # Define Liters to cubic meters
-    factor_L_to_m3 = 0.001
-    # Define mmHg to kPa
-    factor_mmHg_to_kPa = 133.322 / 1000
-    
-    P_suction_kPa = P_suction_mag.value * factor_mmHg_to_kPa * reg.kPa
+    # 2. Convert pressures to a common unit
+    # mmHg and kPa are both defined in terms of pascal, so .to() bridges them.
+    P_suction_kPa = P_suction_mag.to('kPa')
     # Suction is vacuum, so P1 = -P_suction
     P1 = -1.0 * P_suction_kPa
     P2 = P_discharge
@@ -60,17 +43,9 @@ def solve_pump_problem():
     print(f"Hydraulic Power (raw units) = {Power_hydraulic}")
     
     # 5. Convert to Watts
-    # 1 kPa * 1 L / s 
-    # = (1000 Pa) * (0.001 m^3) / s 
-    # = 1 Pa * m^3 / s 
-    # = 1 (N/m^2) * m^3 / s 
-    # = 1 N*m / s 
-    # = 1 J / s 
-    # = 1 Watt
-    # So numerically, the value in (kPa L / s) IS the value in Watts!
-    
-    Power_watts_val = Power_hydraulic.value
-    Power_watts = Power_watts_val * reg.W
+    # L is defined as 1e-3 m^3 and W as J/s = N m/s, so the registry
+    # reduces both sides to kg m^2/s^3 and checks the dimensions.
+    Power_watts = Power_hydraulic.to('W')
     print(f"Hydraulic Power (Watts) = {Power_watts}")
     
     # 6. Brake Power (Motor Power)
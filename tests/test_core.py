@@ -1,6 +1,6 @@
 import pytest
 import math
-from dimpy import UnitRegistry, constants
+from dimpy import UnitRegistry, DimensionalityError, constants
 
 # Check for numpy
 try:
@@ -75,3 +75,598 @@ def test_physical_constants(reg):
     val_kms = constants.c.to('km/s').value
     # c exact is 299792458 m/s = 299792.458 km/s
     assert math.isclose(val_kms, 299792.458, rel_tol=1e-5)
+    # README example: constants combine with a registry of your own
+    energy = constants.h * constants.c / (500 * reg.nm)
+    assert math.isclose(energy.to('J').value, 3.9728917142978567e-19)
+    assert math.isclose((constants.c + 1 * reg.km / reg.s).to('m/s').value, 299793458)
+
+def test_units_are_interned(reg):
+    speed = reg.parse("10 km/hr")
+    other = 5 * reg.km / reg.hr
+    assert speed.unit is other.unit
+    assert reg.unit({'m': 0.5}) is reg.unit({'m': '1/2'})
+    assert (reg.m ** 0.5).unit ** 2 is reg.m.unit
+    # Products are memoized, cancelled units drop out
+    assert (speed * reg.hr).unit is reg.km.unit
+    assert (reg.m / reg.m).unit is reg.dimensionless
+
+def test_conversion_plan_cache():
+    reg = UnitRegistry(conversion_cache_size=2)
+    speed = reg.parse("36 km/hr")
+    assert math.isclose(speed.to('m/s').value, 10.0)
+    assert math.isclose(speed.to('m/s').value, 10.0)
+    info = reg.conversion_cache_info()
+    assert (info.hits, info.misses, info.maxsize) == (1, 1, 2)
+
+    # Affine plans fold scale and offset together
+    assert math.isclose((100 * reg.degC).to('degF').value, 212.0)
+
+    # Incompatible dimensions are cached as failing plans
+    for _ in range(2):
+        with pytest.raises(DimensionalityError):
+            speed.to('kg')
+    assert reg.conversion_cache_info().currsize == 2
+
+def test_unit_expression_parser(reg):
+    assert reg.parse_units('m/(s kg)') is reg.parse_units('m s^-1 kg^-1')
+    assert reg.parse_units('m/s*kg') is reg.parse_units('kg m/s')
+    assert reg.parse_units('W/(m² K)') is reg.parse_units('W m^-2 K^-1')
+    assert reg.parse_units('s⁻¹') is reg.parse_units('1/s')
+    assert reg.parse_units('m^(1/2)') is reg.parse_units('m**0.5')
+    assert reg.parse_units('kg·m/s^2').as_dict() == {'kg': 1, 'm': 1, 's': -2}
+    assert reg.parse_units('') is reg.dimensionless
+    with pytest.raises(ValueError):
+        reg.parse_units('m/(s')
+    # Repeated spellings come straight from the cache
+    assert 'm/(s kg)' in reg._parse_cache
+    # ... and the least recently used spellings are evicted
+    reg._parse_cache.resize(2)
+    for spelling in ('m/s', 'km/hr', 'N m'):
+        reg.parse_units(spelling)
+    assert len(reg._parse_cache) == 2 and 'm/s' not in reg._parse_cache and 'N m' in reg._parse_cache
+
+def test_derived_units_and_dimensions(reg):
+    force = reg.parse("50 kg*m/s^2")
+    assert math.isclose(force.to('N').value, 50.0)
+    assert math.isclose(reg.parse("1 kPa L/s").to('W').value, 1.0)
+    assert math.isclose((1 * reg.L).to('m^3').value, 1e-3)
+
+    reg.define('kgf', 'kg*m/s^2', 9.80665)
+    assert math.isclose((1 * reg.kgf).to('N').value, 9.80665)
+
+    assert reg.get_dimensions('N') == reg.get_dimensions('kgf')
+    assert reg.dimensionality('W') == {'length': 2, 'mass': 1, 'time': -3}
+    assert reg.get_base_unit('Pa') == 'kg/(m s^2)'
+    with pytest.raises(DimensionalityError):
+        force.to('J')
+
+def test_prefix_resolution_precedence(reg):
+    # Longest prefix wins, explicitly defined names always win
+    assert math.isclose((1 * reg.dam).to('m').value, 10.0)
+    assert math.isclose((1 * reg.mm).to('m').value, 1e-3)
+    assert math.isclose((1 * reg.Mm).to('m').value, 1e6)
+    assert math.isclose((1 * reg.megameter).to('m').value, 1e6)
+    assert math.isclose((1 * reg.mmHg).to('Pa').value, 133.3223684)
+    # Prefixes do not stack, and misses are remembered
+    assert not reg.resolve_unit('kkm')
+    assert not reg.resolve_unit('furlong')
+    assert reg._unresolved.get('furlong')
+    # Defining a unit makes previously unknown prefixed names resolvable
+    reg.define('furlong', 'yd', 220)
+    assert reg.resolve_unit('kilofurlong')
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_numpy_protocol(reg):
+    a = np.array([1.0, 4.0, 9.0]) * reg.m
+    b = np.array([100.0, 200.0, 300.0]) * reg.cm
+
+    root = np.sqrt(a)
+    np.testing.assert_allclose(root.value, [1.0, 2.0, 3.0])
+    assert root.unit ** 2 is reg.m.unit
+
+    np.testing.assert_allclose(np.maximum(a, b).value, [1.0, 4.0, 9.0])
+    np.testing.assert_array_equal(np.greater(a, b), [False, True, True])
+    assert np.sum(a).value == 14.0 and np.sum(a).unit is a.unit
+    assert np.multiply.reduce(a).unit is reg.parse_units('m^3')
+    assert np.var(a).unit is reg.parse_units('m^2')
+
+    joined = np.concatenate([a, b])
+    np.testing.assert_allclose(joined.value, [1, 4, 9, 1, 2, 3])
+    np.testing.assert_allclose(np.clip(a, 2 * reg.m, 500 * reg.cm).value, [2, 4, 5])
+    np.testing.assert_allclose(np.where(a.value > 2, a, b).value, [1, 4, 9])
+    # compress/extract take the condition first
+    picked = np.compress([True, False, True], a)
+    np.testing.assert_allclose(picked.value, [1, 9])
+    assert picked.unit is a.unit
+    assert np.extract(a.value > 2, b).unit is b.unit
+    np.testing.assert_allclose(np.extract(a.value > 2, b).value, [200, 300])
+    # Operands passed by keyword are converted too
+    assert list(np.searchsorted(a, v=b)) == [0, 1, 1]
+    assert np.isclose(a=a, b=400 * reg.cm)[1] and np.argmax(a=a) == 2
+    assert math.isclose(np.sin(90 * reg.deg).value, 1.0)
+
+    # out= buffers receive the result and the unit without a new allocation
+    out = np.empty(3) * reg.s
+    buffer = out.value
+    assert np.multiply(a, 2, out=out) is out
+    assert out.value is buffer and out.unit is a.unit
+
+    # ufunc.at works in place with converted operands
+    np.add.at(a, [0, 0], 50 * reg.cm)
+    np.testing.assert_allclose(a.value, [2.0, 4.0, 9.0])
+
+    with pytest.raises(DimensionalityError):
+        np.exp(a)
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_in_place_and_out_conversions(reg):
+    q = np.arange(5.0) * reg.km
+    buffer = q.value
+    q.ito('m')
+    assert q.value is buffer and q.unit is reg.m.unit
+    np.testing.assert_array_equal(buffer, [0, 1000, 2000, 3000, 4000])
+
+    out = np.empty(5)
+    converted = q.to('cm', out=out)
+    assert converted.value is out
+    np.testing.assert_array_equal(out, [0, 1e5, 2e5, 3e5, 4e5])
+
+    temps = np.array([0.0, 100.0]) * reg.degC
+    np.testing.assert_allclose(temps.to('degF', out=np.empty(2)).value, [32.0, 212.0])
+
+    # Integer arrays only convert in place when the result is exact
+    counts = np.arange(3) * reg.km
+    counts.ito('m')
+    assert counts.value.dtype.kind == 'i'
+    with pytest.raises(TypeError):
+        counts.ito('km')
+    with pytest.raises(ValueError):
+        q.to('m', out=np.empty(3))
+    # Float data is never truncated into an integer buffer
+    with pytest.raises(TypeError):
+        (np.array([1.5, 2.7]) * reg.m).to('m', out=np.empty(2, np.int64))
+    whole = (np.array([1.0, 2.0]) * reg.km).to('m', out=np.empty(2, np.int64))
+    np.testing.assert_array_equal(whole.value, [1000, 2000])
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_lazy_expression(reg):
+    rho = np.full(1000, 1000.0) * reg.kg / reg.m**3
+    g = 9.81 * reg.m / reg.s**2
+    h = np.linspace(0, 10, 1000) * reg.cm
+    P0 = 101.325 * reg.kPa
+
+    expr = reg.lazy(rho) * g * h.defer() + P0
+    # Dimensions are checked when the graph is built
+    with pytest.raises(DimensionalityError):
+        expr + 1 * reg.s
+
+    result = expr.to('Pa').evaluate(chunk_size=128)
+    assert result.unit is reg.Pa.unit
+    np.testing.assert_allclose(result.value, 1000.0 * 9.81 * h.value / 100 + 101325)
+
+    # Broadcasting expressions fall back to whole-array evaluation
+    grid = np.arange(6.0).reshape(2, 3) * reg.m
+    row = np.arange(3.0) * reg.cm
+    np.testing.assert_allclose((grid.defer() + row).evaluate().value,
+                               grid.value + row.value / 100)
+
+    # Absolute temperatures follow the same delta rules as the eager operators
+    a = np.array([20.0, 30.0]) * reg.degC
+    b = np.array([50.0, 68.0]) * reg.degF
+    with pytest.raises(DimensionalityError):
+        a.defer() + b
+    diff = (a.defer() - b).evaluate()
+    assert diff.unit is (a - b).unit is reg.parse_units('delta_degC')
+    np.testing.assert_allclose(diff.value, (a - b).value)
+    shifted = (reg.Quantity(np.array([1.0, 2.0]), 'K') + a.defer()).evaluate()
+    assert shifted.unit is a.unit and np.allclose(shifted.value, [21.0, 32.0])
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_parse_many(reg):
+    rows = ["36 km/hr", "10 m/s", "72 km / hr", "-5e-1 m/s"]
+    speeds = reg.parse_many(rows, target='m/s')
+    assert speeds.unit is reg.parse_units('m/s')
+    np.testing.assert_allclose(speeds.value, [10.0, 10.0, 20.0, -0.5])
+
+    groups = reg.parse_many(rows)
+    indices, kmh = groups[reg.parse_units('km/hr')]
+    np.testing.assert_array_equal(indices, [0, 2])
+    np.testing.assert_array_equal(kmh.value, [36.0, 72.0])
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_read_csv_chunks(reg):
+    import io
+    from dimpy import read_csv
+
+    text = "flow [L/s],T [degC],label\n1,0,1\n2,100,2\n3,50,3\n"
+    chunks = list(read_csv(io.StringIO(text), reg, units={'flow': 'm^3/s', 'T': 'K'}, chunk_size=2))
+    assert len(chunks) == 2
+    np.testing.assert_allclose(chunks[0]['flow'].value, [1e-3, 2e-3])
+    assert chunks[0]['flow'].unit is reg.parse_units('m^3/s')
+    np.testing.assert_allclose(chunks[1]['T'].value, [323.15])
+    assert chunks[1]['label'].unit is reg.dimensionless
+    with pytest.raises(KeyError):
+        list(read_csv(io.StringIO(text), reg, units={'flw': 'm^3/s'}))
+    with pytest.raises(KeyError):
+        list(read_csv(io.StringIO(text), reg, columns=['flow', 'lable']))
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_save_and_load(reg, tmp_path):
+    from dimpy import save, savez, load
+
+    speeds = np.linspace(0, 1, 10) * reg.km / reg.hr
+    save(tmp_path / 'speeds.npy', speeds)
+    # The .npy file itself is plain NumPy
+    np.testing.assert_array_equal(np.load(tmp_path / 'speeds.npy'), speeds.value)
+
+    mapped = load(tmp_path / 'speeds.npy', reg, mmap=True)
+    assert isinstance(mapped.value, np.memmap) and not mapped.value.flags.writeable
+    assert mapped.unit is speeds.unit
+    np.testing.assert_array_equal(mapped[2:4].value, speeds.value[2:4])
+
+    savez(tmp_path / 'batch.npz', v=speeds, T=np.array([1.0, 2.0]) * reg.degC)
+    batch = load(tmp_path / 'batch.npz', reg)
+    assert batch['T'].unit is reg.degC.unit
+    np.testing.assert_array_equal(batch['v'].value, speeds.value)
+    # Paths without a suffix load what save()/savez() wrote
+    savez(str(tmp_path / 'data'), v=speeds)
+    save(str(tmp_path / 'single'), speeds)
+    assert load(str(tmp_path / 'data'), reg)['v'].unit is speeds.unit
+    assert load(str(tmp_path / 'single'), reg).unit is speeds.unit
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_pickle_and_map_chunks(reg):
+    import pickle
+    from dimpy.parallel import map_chunks
+
+    q = reg.Quantity(np.arange(6.0), 'km/hr')
+    restored = pickle.loads(pickle.dumps(q))
+    assert restored.registry is reg and restored.unit is q.unit
+    assert pickle.loads(pickle.dumps(reg.m.unit)) is reg.m.unit
+
+    squared = map_chunks(np.square, q, chunks=3, max_workers=2)
+    assert squared.unit is reg.parse_units('km^2/hr^2')
+    np.testing.assert_array_equal(squared.value, q.value ** 2)
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_parallel_kernels(reg):
+    reg.set_parallel(workers=3, threshold=1000)
+    x = np.linspace(0, 100, 100_003)
+    q = reg.Quantity(x, 'degC')
+    np.testing.assert_allclose(q.to('K').value, x + 273.15)
+    np.testing.assert_allclose(q.to('degF', workers=1).value, x * 1.8 + 32)
+
+    d = reg.Quantity(x, 'm')
+    np.testing.assert_allclose((d * d).value, x * x)
+    np.testing.assert_allclose((d - d).value, 0)
+    lazy = (d.defer() * 2 + d).to('km').evaluate(chunk_size=1000)
+    np.testing.assert_allclose(lazy.value, x * 3e-3)
+
+    # Below the threshold everything stays serial
+    assert reg._workers_for(999) == 1 and reg._workers_for(1000) == 3
+    reg.set_parallel(workers=1)
+    # A threshold on its own does not turn workers on
+    reg.set_parallel(threshold=10)
+    assert reg.workers == 1 and reg.parallel_threshold == 10
+    assert reg._workers_for(10 ** 9) == 1
+
+    # An executor stays until reset_parallel()
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(2) as pool:
+        reg.set_parallel(workers=2, executor=pool)
+        reg.set_parallel(threshold=100)
+        assert reg.executor is pool and reg.workers == 2
+        reg.reset_parallel()
+        assert reg.executor is None and reg.workers == 1
+
+def test_threaded_lookups_and_freeze(reg):
+    from concurrent.futures import ThreadPoolExecutor
+    from dimpy import RegistryFrozenError
+
+    names = [p + u for p in ('k', 'm', 'micro', 'G', 'c') for u in ('m', 'gram', 's', 'Pa', 'J')]
+    with ThreadPoolExecutor(8) as pool:
+        units = list(pool.map(lambda n: reg.parse_units(f"{n}/s"), names * 20))
+    assert units[:len(names)] == units[-len(names):]
+    assert reg.get_factor('cm') == 0.01
+
+    frozen = UnitRegistry().freeze()
+    size = len(frozen._units)
+    assert frozen.get_factor('microJ') == 1e-6 and frozen.get_factor('mmHg') != 1e-3
+    assert not frozen.resolve_unit('kkm') and len(frozen._units) == size
+    with pytest.raises(RegistryFrozenError):
+        frozen.define('furlong', 'yd', 220)
+    with pytest.raises(RegistryFrozenError):
+        frozen.define_prefix('kibi', 1024)
+
+def test_lazy_import_and_shared_defaults(reg):
+    import subprocess
+    import sys
+
+    script = ("import sys, dimpy; from dimpy import constants; r = dimpy.UnitRegistry(); "
+              "(1 * r.km).to('m'); assert 'numpy' not in sys.modules")
+    subprocess.run([sys.executable, '-c', script], check=True)
+
+    replayed = UnitRegistry(autoload=False)
+    replayed.load_defaults()
+    assert replayed.fingerprint == reg.fingerprint
+    assert replayed._units == reg._units
+
+    # Prefix tables are shared until a registry changes its own
+    other = UnitRegistry()
+    other.define_prefix('kibi', 1024)
+    assert other.kibimeter.to('m').value == 1024
+    assert not reg.resolve_unit('kibimeter')
+
+def test_definitions_file_and_cache(tmp_path):
+    path = tmp_path / 'plant.txt'
+    path.write_text("@prefix kibi = 1024\n"
+                    "bar = 1e5 Pa   # pressure\n"
+                    "barg = bar; offset: 1.01325 = bar_g\n"
+                    "widget = [count] = wd\n")
+
+    reg = UnitRegistry()
+    assert reg.load_definitions(path) is False
+    assert math.isclose(reg.parse("2 bar_g").to('kPa').value, 301.325)
+
+    cached = UnitRegistry()
+    assert cached.load_definitions(path) is True
+    assert cached.fingerprint == reg.fingerprint
+    assert cached.parse("3 kibiwd").to('wd').value == 3072
+
+    # Editing the file makes the cache stale
+    path.write_text("bar = 1e5 Pa\nbar = 2e5 Pa\n")
+    edited = UnitRegistry()
+    assert edited.load_definitions(path) is False
+    assert edited.parse("1 bar").to('Pa').value == 2e5
+
+    with pytest.raises(ValueError, match=r"plant.txt:2"):
+        path.write_text("bar = 1e5 Pa\nbroken = \n")
+        UnitRegistry().load_definitions(path)
+
+
+def test_definitions_cache_keeps_prefixed_units(tmp_path):
+    path = tmp_path / 'plant.txt'
+    path.write_text("widget = [count] = wd\n")
+    UnitRegistry().load_definitions(path)
+
+    reg = UnitRegistry()
+    q = 1.0 * reg.km
+    reg.unit_id('km')
+    assert reg.load_definitions(path) is True
+    assert q.to('m').value == 1000.0
+    assert reg.parse('2 km').to('m').value == 2000.0
+    assert reg._id_arrays()[0][reg.unit_id('km')] == 1000.0
+
+def test_stats_and_profile(reg):
+    assert reg._stats is None and reg.stats() == {'counts': {}, 'times': {}}
+
+    reg.enable_stats()
+    reg.parse("10 km/hr").to('m/s')
+    reg.parse("5 degC").to('degF')
+    with reg.profile() as scoped:
+        reg.resolve_unit('gigafurlong')
+        reg.parse("1 kilometer").to('m')
+    counts = scoped.counts
+    assert counts['resolve.dynamic'] == 1 and counts['resolve.unknown'] == 1
+    assert counts['to'] == 1 and scoped.times['to'] > 0
+
+    total = reg.stats()['counts']
+    assert total['parse'] == 3 and total['to.affine'] == 1 and total['to.scale'] == 2
+    assert total.get('plan.cache_hit', 0) + total['plan.compile'] == 3
+    reg.disable_stats()
+    reg.parse("1 m")
+    assert reg.stats()['counts'] == {}
+
+def test_scalar_fast_path(reg):
+    a = reg.Quantity(3.0, 'km')
+    t = reg.Quantity(2, 'hr')
+    assert not hasattr(a, '__dict__')
+
+    speed = a / t
+    assert speed.unit is reg.parse_units('km/hr') and speed.value == 1.5
+    assert (a * t).unit is reg.parse_units('km hr') and (a * t).value == 6.0
+    assert (a ** 2).unit is reg.parse_units('km^2') and (2.0 / t).unit is reg.parse_units('1/hr')
+    assert (t * 3).value == 6 and type((t * 3).value) is int
+    assert math.isclose((a + reg.Quantity(500.0, 'm')).value, 3.5)
+    assert math.isclose((a - reg.Quantity(500.0, 'm')).value, 2.5)
+    assert a.to('m').value == 3000.0 and a.to('m').unit is reg.m.unit
+    assert math.isclose(reg.Quantity(100.0, 'degC').to('degF').value, 212.0)
+    with pytest.raises(DimensionalityError):
+        a.to('kg')
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_mixed_unit_add_sub(reg):
+    cm = reg.Quantity(np.arange(4.0), 'cm')
+    m = reg.Quantity(np.arange(4.0), 'm')
+    assert np.allclose((cm + m).value, [0, 101, 202, 303]) and (cm + m).unit is cm.unit
+    assert np.allclose((m - cm).value, [0, 0.99, 1.98, 2.97])
+    force = reg.Quantity(np.ones((2, 3)), 'N') + reg.Quantity(np.arange(3), 'kg m/s^2')
+    assert force.value.shape == (2, 3) and np.allclose(force.value[1], [1, 2, 3])
+    with pytest.raises(DimensionalityError):
+        cm + reg.Quantity(np.ones(4), 's')
+
+    # Absolute temperatures go through delta units
+    t = reg.Quantity(np.array([20.0, 30.0]), 'degC')
+    diff = t - reg.Quantity(68.0, 'degF')
+    assert diff.unit is reg.parse_units('delta_degC') and np.allclose(diff.value, [0, 10])
+    assert np.allclose((t + reg.Quantity(9.0, 'delta_degF')).value, [25, 35])
+    assert (reg.Quantity(5.0, 'K') + t).unit is t.unit
+    d = reg.Quantity(20.0, 'degC') - reg.Quantity(10.0, 'degC')
+    assert math.isclose(d.to('delta_degF').value, 18.0)
+    with pytest.raises(DimensionalityError):
+        t + t
+    with pytest.raises(DimensionalityError):
+        reg.Quantity(5.0, 'K') - t
+
+
+def test_to_base_simplify_compact(reg):
+    q = reg.Quantity(2.0, 'kg m^2/(s^2 km)')
+    assert q.simplify().unit is reg.parse_units('N') and math.isclose(q.simplify().value, 0.002)
+    assert q.to_base().unit is reg.parse_units('kg m/s^2')
+    assert reg.simplify_unit('kg m^2 s^-3 km^-1 hr') is reg.parse_units('N')
+    assert reg.simplify_unit('J/s') is reg.parse_units('W')
+    assert reg.simplify_unit('N/kg') is reg.parse_units('N/kg')
+    # Cached per unit
+    assert reg.simplify_unit('J/s') is reg._reductions[('simplify', reg.parse_units('J/s'))]
+
+    assert math.isclose(reg.Quantity(36.0, 'km/hr').to_base().value, 10.0)
+    assert math.isclose(reg.Quantity(20.0, 'degC').to_base().value, 293.15)
+
+    compact = reg.Quantity(12345.0, 'm').to_compact()
+    assert compact.unit is reg.parse_units('km') and math.isclose(compact.value, 12.345)
+    assert reg.Quantity(3e-7, 'kilometer').to_compact().unit is reg.parse_units('micrometer')
+    assert reg.Quantity(1500.0, 'kg').to_compact().unit is reg.parse_units('Mg')
+    assert reg.Quantity(20.0, 'degC').to_compact().unit is reg.parse_units('degC')
+    if HAS_NUMPY:
+        ms = reg.Quantity(np.array([0.002, 0.004, np.inf]), 's').to_compact()
+        assert ms.unit is reg.parse_units('ms') and np.allclose(ms.value[:2], [2, 4])
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_mixed_unit_rows(reg):
+    from dimpy import MixedQuantity
+    assert reg.unit_id('psi') == reg.unit_id(reg.parse_units('psi'))
+    assert reg.unit_id('kPa') < len(reg._units)
+
+    rows = [reg.Quantity(14.5, 'psi'), reg.Quantity(101.325, 'kPa'),
+            reg.Quantity(760.0, 'mmHg'), reg.Quantity(np.array([1.0, 2.0]), 'bar')]
+    mixed = reg.stack(rows)
+    assert isinstance(mixed, MixedQuantity) and len(mixed) == 5
+    assert mixed.unit_at(4) is reg.parse_units('bar') and mixed[0].value == 14.5
+    kpa = mixed.to('kPa')
+    assert kpa.unit is reg.parse_units('kPa')
+    assert np.allclose(kpa.value, [99.974, 101.325, 101.325, 100, 200], rtol=1e-4)
+    assert np.allclose(mixed.to_base().to('Pa').value, kpa.value * 1000)
+    rows_of, group = mixed.groups()[reg.parse_units('bar')]
+    assert list(rows_of) == [3, 4] and list(group.value) == [1.0, 2.0]
+
+    temps = reg.stack([reg.Quantity(20.0, 'degC'), reg.Quantity(68.0, 'degF'), reg.Quantity(293.15, 'K')])
+    assert np.allclose(temps.to('degC').value, 20.0)
+    with pytest.raises(DimensionalityError):
+        reg.stack([reg.Quantity(1.0, 'm'), reg.Quantity(1.0, 's')]).to('m')
+
+
+def test_comparisons_and_hashing(reg):
+    assert reg.Quantity(1.0, 'km') > reg.Quantity(999.0, 'm')
+    assert reg.Quantity(1, 'km') == reg.Quantity(1000.0, 'm')
+    assert reg.Quantity(1.0, 'm') != reg.Quantity(1.0, 's')
+    assert reg.Quantity(-1.0, 'm') < 0
+    with pytest.raises(DimensionalityError):
+        reg.Quantity(1.0, 'm') < reg.Quantity(1.0, 's')
+
+    # Equal quantities hash alike whatever their unit
+    seen = {reg.Quantity(1, 'km'): 'a'}
+    assert seen[reg.Quantity(1000.0, 'm')] == 'a'
+    assert hash(reg.Quantity(0.1, 'km')) == hash(reg.Quantity(100, 'm'))
+    assert len({reg.Quantity(20.0, 'degC'), reg.Quantity(293.15, 'K')}) == 1
+    # Equal to a plain number only when dimensionless, and then hashed like it
+    assert reg.Quantity(0.0, 'm') != 0 and reg.Quantity(0.0, 'm') <= 0
+    assert reg.Quantity(0.5, '') == 0.5 and hash(reg.Quantity(0.5, '')) == hash(0.5)
+    ratio = reg.Quantity(1.0, 'm/km')
+    assert ratio == 0.001 and hash(ratio) == hash(0.001) and ratio < 0.5
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_array_comparisons_and_searching(reg):
+    q = reg.Quantity(np.array([300.0, 100.0, 700.0, 100.0]), 'm')
+    mask = q > reg.Quantity(0.2, 'km')
+    assert mask.dtype == bool and list(mask) == [True, False, True, False]
+    assert list(reg.Quantity(0.2, 'km') < q) == list(mask)
+    assert not (q == reg.Quantity(1.0, 's')).any()
+    with pytest.raises(TypeError):
+        hash(q)
+
+    order = q.argsort(kind='stable')
+    assert list(order) == [1, 3, 0, 2]
+    ordered = q[order]
+    lo, hi = ordered.searchsorted(reg.Quantity(0.1, 'km')), ordered.searchsorted(reg.Quantity(50000, 'cm'), side='right')
+    assert list(ordered[lo:hi].value) == [100.0, 100.0, 300.0]
+    values, counts = q.unique(return_counts=True)
+    assert values.unit is q.unit and list(values.value) == [100.0, 300.0, 700.0] and list(counts) == [2, 1, 1]
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_reductions_and_streaming_aggregators(reg):
+    from dimpy import RunningStats, MinMax, Histogram
+    data = np.random.default_rng(0).normal(20.0, 3.0, 10000)
+    q = reg.Quantity(data, 'm')
+    assert q.sum().unit is q.unit and math.isclose(q.sum().value, data.sum())
+    assert math.isclose(q.mean().value, data.mean()) and math.isclose(q.std().value, data.std())
+    assert q.var().unit is reg.parse_units('m^2') and math.isclose(q.var(ddof=1).value, data.var(ddof=1))
+    assert q.min().value == data.min() and q.max().value == data.max()
+    assert np.allclose(q.percentile([5, 95]).value, np.percentile(data, [5, 95]))
+
+    temps = reg.Quantity(data, 'degC')
+    assert temps.std().unit is reg.parse_units('delta_degC')
+    with pytest.raises(DimensionalityError):
+        temps.sum()
+    # The NumPy functions agree with the methods and operators
+    assert np.sum(q).unit is q.sum().unit and np.std(temps).unit is temps.std().unit
+    assert np.var(temps).unit is temps.var().unit and math.isclose(np.var(temps).value, temps.var().value)
+    assert np.ptp(temps).unit is np.diff(temps).unit is reg.parse_units('delta_degC')
+    for func in (np.sum, np.nansum, np.cumsum, np.add.reduce):
+        with pytest.raises(DimensionalityError):
+            func(temps)
+    with pytest.raises(DimensionalityError):
+        np.add(temps, temps)
+    assert np.subtract(temps, temps).unit is (temps - temps).unit
+    warmer = np.add(temps, reg.Quantity(1.8, 'delta_degF'))
+    assert warmer.unit is temps.unit and np.allclose(warmer.value, (temps + reg.Quantity(1.8, 'delta_degF')).value)
+
+    # Chunks in mixed units give the same answers as the whole array
+    stats, extremes = RunningStats(), MinMax()
+    hist = Histogram(low=reg.Quantity(10.0, 'degC'), high=reg.Quantity(86.0, 'degF'), bins=4)
+    for i, chunk in enumerate(np.array_split(data, 7)):
+        chunk = reg.Quantity(chunk, 'degC') if i % 2 else reg.Quantity(chunk * 1.8 + 32, 'degF')
+        for aggregator in (stats, extremes, hist):
+            aggregator.update(chunk)
+    assert stats.count == data.size and stats.mean.unit is reg.parse_units('degF')
+    assert math.isclose(stats.mean.to('degC').value, data.mean())
+    assert stats.std().unit is reg.parse_units('delta_degF')
+    assert math.isclose(stats.std().value, data.std() * 1.8)
+    assert math.isclose(extremes.max.to('degC').value, data.max())
+    assert list(hist.counts) == list(np.histogram(data, bins=4, range=(10, 30))[0])
+    assert hist.underflow == np.count_nonzero(data < 10)
+
+    a, b = RunningStats(), RunningStats()
+    a.update(reg.Quantity(data[:500], 'm'))
+    b.update(reg.Quantity(data[500:] * 100, 'cm'))
+    assert math.isclose(a.merge(b).mean.value, data.mean())
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="Numpy not installed")
+def test_quantity_table(reg):
+    from dimpy import QuantityTable
+    h = np.arange(10.0)
+    table = QuantityTable({'h': reg.Quantity(h, 'm'), 'rho': (np.full(10, 1000.0), 'kg/m^3'),
+                           'T': (np.linspace(0, 90, 10), 'degC')}, reg)
+    assert len(table) == 10 and table.names == ['h', 'rho', 'T']
+
+    # Slices are views, masks compose into one row index
+    sliced = table[2:8]
+    assert np.shares_memory(sliced['h'].value, h) and list(sliced['h'].value) == [2, 3, 4, 5, 6, 7]
+    deep = sliced[sliced['h'] > reg.Quantity(400, 'cm')]
+    assert deep._values['h'] is table._values['h']
+    assert list(deep['T'].value) == [50, 60, 70]
+    assert list(deep[np.array([True, False, True])]['h'].value) == [5, 7]
+    assert list(table[::-1][-3:]['h'].value) == [2, 1, 0]
+    assert len(table[::-1][10:]) == 0 and table[::-1][10:]['h'].value.size == 0
+
+    p = deep.with_column('p', 'rho * 9.81 * m/s^2 * h + 101.325 * kPa', unit='kPa')
+    assert p['p'].unit is reg.parse_units('kPa') and np.allclose(p['p'].value, 9.81 * deep['h'].value + 101.325)
+    with pytest.raises(DimensionalityError):
+        table.evaluate('h + rho')
+    with pytest.raises(ValueError):
+        table.evaluate('__import__("os")')
+    for constant in ('2 + 3', '9.81 * m/s^2'):
+        with pytest.raises(ValueError):
+            table.evaluate(constant)
+    with pytest.raises(DimensionalityError):
+        table.evaluate('T + T')
+    assert table.with_column('dT', 'T - T')['dT'].unit is reg.parse_units('delta_degC')
+
+    imperial = table.to_system({'length': 'ft', 'mass': 'lb', 'temperature': 'degF'})
+    assert imperial.units['rho'] is reg.parse_units('lb/ft^3') and imperial.units['T'] is reg.parse_units('degF')
+    assert np.allclose(imperial['T'].value, table['T'].to('degF').value)
+    assert np.allclose(table.to({'h': 'cm'})['h'].value, h * 100)